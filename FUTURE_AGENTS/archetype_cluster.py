@@ -11,7 +11,7 @@ User profiles are tracked as base-14 resonance vectors (13 archetypes + Phoenix)
 See AGENT_GUIDES/ARCHETYPE_PHOENIX.md for full documentation and protocols.
 """
 
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 
 ARCHETYPE_NAMES = [
     "Nurturer", "Creator", "Protector", "Scholar", "Visionary", "Healer", "Jester",
@@ -23,14 +23,25 @@ class ArchetypeAgent:
     def __init__(self, name: str):
         self.name = name
 
-    def analyze(self, input_data: Any, user_profile: Dict[str, float]) -> Dict[str, Any]:
+    def llm_request(self, input_data: Any) -> Dict[str, Any]:
+        """
+        Batch item for route_llm_batch asking the model for this archetype's perspective.
+        """
+        return {
+            "prompt": f"Input: {input_data}",
+            "system": (f"You are the {self.name} archetype of VERN's Archetype Cluster. In two or three sentences, "
+                       f"give your perspective on the input through the {self.name}'s psychological, cultural, "
+                       "and behavioral lens."),
+        }
+
+    def analyze(self, input_data: Any, user_profile: Dict[str, float], perspective: Optional[str] = None) -> Dict[str, Any]:
         """
         Analyze input through this archetype's lens.
         Returns a dict with resonance score, perspective, and key traits.
+        `perspective` is the model's answer to llm_request(); without one a placeholder is used.
         """
-        # Placeholder: In production, use prompt engineering, ML, and rule-based logic.
         resonance = user_profile.get(self.name, 0.5)
-        perspective = f"{self.name} perspective on input: {input_data}"
+        perspective = perspective or f"{self.name} perspective on input: {input_data}"
         traits = {"resonance": resonance}
         return {"archetype": self.name, "perspective": perspective, "traits": traits}
 
@@ -42,7 +53,9 @@ class PhoenixSynthesizer:
         """
         Integrate all archetype outputs, balancing perspectives and generating adaptive response.
         """
-        outputs = [agent.analyze(input_data, user_profile) for agent in self.archetype_agents]
+        perspectives = self.perspectives(input_data)
+        outputs = [agent.analyze(input_data, user_profile, perspective)
+                   for agent, perspective in zip(self.archetype_agents, perspectives)]
         # Example synthesis: weighted average resonance, summary of perspectives
         avg_resonance = sum([o["traits"]["resonance"] for o in outputs]) / len(outputs)
         summary = " | ".join([o["perspective"] for o in outputs])
@@ -54,6 +67,21 @@ class PhoenixSynthesizer:
         }
         return phoenix_output
 
+    def perspectives(self, input_data: Any) -> List[Optional[str]]:
+        """
+        Ask every archetype in one batch (real LLM calls): the 13 prompts run concurrently up to the
+        scheduler's budgets for the archetype_cluster agent and its backend (config/agent_backends.yaml),
+        so wall time is about ceil(13 / backend budget) calls rather than 13.
+        Items whose call failed (or all of them, if the router is unavailable) come back as None.
+        """
+        try:
+            from src.mvp.llm_router import route_llm_batch
+            results = route_llm_batch([agent.llm_request(input_data) for agent in self.archetype_agents],
+                                      agent_name="archetype_cluster")
+        except Exception:
+            return [None] * len(self.archetype_agents)
+        return [r if isinstance(r, str) and r else None for r in results]
+
 class ArchetypeCluster:
     def __init__(self):
         self.agents = [ArchetypeAgent(name) for name in ARCHETYPE_NAMES]
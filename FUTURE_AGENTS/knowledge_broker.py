@@ -9,8 +9,8 @@ class KnowledgeBroker:
     Enhanced KnowledgeBroker class with persona tuning, agent memory/context, and workflow support.
     """
     def lookup(self, query, context=None, agent_status=None, persona="default", memory=None):
-        from mvp.llm_router import route_llm_call
-        from mvp.prompt_utils import build_prompt
+        from src.mvp.llm_router import route_llm_call
+        from src.mvp.prompt_utils import build_prompt
         persona_descriptions = {
             "default": "Search context, documents, and knowledge bases, and provide a concise, actionable answer.",
             "researcher": "Provide deep, well-cited answers and suggest next steps.",
@@ -48,10 +48,10 @@ def knowledge_broker_context_lookup(query, context=None, agent_status=None, pers
             "memory": memory
         }, status="started")
 
-        from mvp.llm_router import route_llm_call
-        from mvp.prompt_utils import build_prompt
-        from mvp.llm_router import route_llm_call
-        from mvp.prompt_utils import build_prompt
+        from src.mvp.llm_router import route_llm_call
+        from src.mvp.prompt_utils import build_prompt
+        from src.mvp.llm_router import route_llm_call
+        from src.mvp.prompt_utils import build_prompt
         persona_descriptions = {
             "default": "Search context, documents, and knowledge bases, and provide a concise, actionable answer.",
             "researcher": "Provide deep, well-cited answers and suggest next steps.",
@@ -80,7 +80,7 @@ def knowledge_broker_context_lookup(query, context=None, agent_status=None, pers
         # Patch: If backend returns structured error, escalate to orchestrator for error handling
         if isinstance(response, dict) and "error" in response:
             try:
-                from mvp.orchestrator import orchestrator_respond
+                from src.mvp.orchestrator import orchestrator_respond
                 error_context = {
                     "query": query,
                     "context": context,
@@ -112,7 +112,7 @@ def knowledge_broker_context_lookup(query, context=None, agent_status=None, pers
         log_gotcha(agent_id, f"Exception in knowledge_broker_context_lookup: {str(e)}", severity="error")
         # Escalate to orchestrator for fallback handling
         try:
-            from mvp.orchestrator import orchestrator_respond
+            from src.mvp.orchestrator import orchestrator_respond
             fallback_context = {
                 "error": str(e),
                 "agent": agent_id,
@@ -135,8 +135,8 @@ def knowledge_broker_cross_cluster_query(req, context=None, agent_status=None, p
     """
     Handles cross-cluster query requests with persona/context adaptation and agent memory.
     """
-    from mvp.llm_router import route_llm_call
-    from mvp.prompt_utils import build_prompt
+    from src.mvp.llm_router import route_llm_call
+    from src.mvp.prompt_utils import build_prompt
     persona_descriptions = {
         "default": "Coordinate with relevant agent clusters, aggregate their responses, and provide a unified, actionable answer.",
         "cross_cluster": "Aggregate responses from multiple clusters and synthesize a unified answer."
@@ -4,7 +4,7 @@ VERN Learning/Education Agent (LLM-Powered)
 Handles personalized learning, skill mapping, and education questions using Ollama.
 """
 
-from mvp.ollama_llm import call_ollama
+from src.mvp.ollama_llm import call_ollama
 from db.logger import log_action, log_message, log_gotcha
 
 def learning_respond(user_input, context, agent_status=None, persona="default", user_id="default_user"):
@@ -48,7 +48,7 @@ def learning_respond(user_input, context, agent_status=None, persona="default",
             "persona": persona
         })
         log_gotcha(agent_id, f"Exception in learning_respond: {str(e)}", severity="error")
-        from mvp.orchestrator import orchestrator_respond
+        from src.mvp.orchestrator import orchestrator_respond
         error_context = {
             "user_input": user_input,
             "context": context,
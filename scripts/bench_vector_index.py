@@ -0,0 +1,94 @@
+"""
+Vector Index Benchmark for VERN
+
+Compares the IVF (approximate) mode of the built-in NumPy vector engine against brute force on a
+synthetic clustered corpus: build time, recall@k and queries per second for several nprobe values.
+
+Usage:
+    python scripts/bench_vector_index.py [--rows 200000] [--dim 384] [--queries 200] [--k 10]
+                                         [--clusters 1000] [--spread 1.0] [--nlist 0] [--nprobe 4,8,16,32]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from vern_backend.app.vector_index import ANN_DEFAULTS, NumpyVectorIndex, normalize
+
+
+class ArrayEmbedder:
+    """
+    Looks precomputed vectors up by text: "d<i>" is corpus row i, "q<j>" is query j.
+    """
+    def __init__(self, corpus: np.ndarray, queries: np.ndarray):
+        self.corpus, self.queries = corpus, queries
+        self.dim = corpus.shape[1]
+        self.name = f"bench-{self.dim}"
+
+    def __call__(self, texts):
+        return np.stack([(self.corpus if t[0] == "d" else self.queries)[int(t[1:])] for t in texts])
+
+
+def clustered(rows: int, dim: int, clusters: int, spread: float, rng) -> np.ndarray:
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, rows)
+    return normalize(centers[labels] + spread * rng.standard_normal((rows, dim)).astype(np.float32))
+
+
+def timed_search(index: NumpyVectorIndex, queries: int, k: int):
+    started = time.perf_counter()
+    results = [[doc_id for doc_id, _ in index.search(f"q{j}", k)] for j in range(queries)]
+    return results, queries / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=1000)
+    parser.add_argument("--spread", type=float, default=1.0, help="within-cluster noise (cluster centers have unit variance)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=0, help="0 = sqrt(rows)")
+    parser.add_argument("--nprobe", default="4,8,16,32")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    corpus = clustered(args.rows, args.dim, args.clusters, args.spread, rng)
+    # Queries: corpus vectors moved by noise of norm ~0.5
+    noise = rng.standard_normal((args.queries, args.dim)).astype(np.float32) * (0.5 / np.sqrt(args.dim))
+    queries = normalize(corpus[rng.integers(0, args.rows, args.queries)] + noise)
+    embedder = ArrayEmbedder(corpus, queries)
+    docs = [(f"d{i}", f"d{i}", None) for i in range(args.rows)]
+
+    exact = NumpyVectorIndex(embedder=embedder)
+    exact.upsert(docs)
+    truth, exact_qps = timed_search(exact, args.queries, args.k)
+    report = [{"mode": "brute_force", "recall@k": 1.0, "qps": round(exact_qps, 1)}]
+
+    ann = {**ANN_DEFAULTS, "nlist": args.nlist, "min_rows": args.rows + 1}
+    index = NumpyVectorIndex(embedder=embedder, ann=ann)
+    index.upsert(docs)
+    started = time.perf_counter()
+    index.rebuild(wait=True)
+    build_seconds = time.perf_counter() - started
+    for nprobe in (int(n) for n in args.nprobe.split(",")):
+        index.ann["nprobe"] = nprobe
+        found, qps = timed_search(index, args.queries, args.k)
+        recall = np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)])
+        report.append({"mode": f"ivf nlist={index.ivf.nlist} nprobe={nprobe}", "recall@k": round(float(recall), 4),
+                       "qps": round(qps, 1), "speedup": round(qps / exact_qps, 2)})
+
+    print(json.dumps({"rows": args.rows, "dim": args.dim, "k": args.k,
+                      "ivf_build_seconds": round(build_seconds, 2), "results": report}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+VERN Audit Log Query API
+
+Filtered, keyset-paginated reads over the `actions` and `logs` audit tables.
+Pages are ordered newest first by (timestamp, id) and served from the indexes added in
+migrations/0005_audit_indexes.sql. Cursors are opaque strings encoding the last (timestamp, id) seen.
+Payload blob references (src/db/blob_store.py) are expanded before rows are returned.
+"""
+
+import base64
+import json
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from src.db.blob_store import resolve_all
+from src.db.logger import get_conn
+
+MAX_PAGE_SIZE = 1000
+EXPORT_PAGE_SIZE = 500
+
+# Per-table column list and the filters each table supports (filter name -> column)
+AUDIT_TABLES: Dict[str, Dict[str, Any]] = {
+    "actions": {
+        "columns": ["id", "timestamp", "agent_id", "user_id", "action_type", "payload", "status", "gotcha_id", "tags"],
+        "json_columns": ["payload", "tags"],
+        "blob_columns": ["payload"],
+        "filters": {"agent_id": "agent_id", "user_id": "user_id", "action_type": "action_type", "status": "status"},
+    },
+    "logs": {
+        "columns": ["id", "timestamp", "agent_id", "message", "level", "context"],
+        "json_columns": ["context"],
+        "blob_columns": [],
+        "filters": {"agent_id": "agent_id", "level": "level"},
+    },
+}
+
+
+class AuditQueryError(ValueError):
+    """Raised for invalid tables, filters or cursors."""
+
+
+def encode_cursor(timestamp: str, row_id: int) -> str:
+    raw = json.dumps([timestamp, row_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        ts, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return str(ts), int(row_id)
+    except Exception:
+        raise AuditQueryError("Invalid cursor.")
+
+
+def _decode_json(value):
+    if value is None:
+        return None
+    try:
+        return json.loads(value)
+    except Exception:
+        return value
+
+
+def _build_query(table: str, filters: Dict[str, Any], since: Optional[str], until: Optional[str],
+                 cursor: Optional[str], limit: int) -> Tuple[str, list]:
+    spec = AUDIT_TABLES.get(table)
+    if spec is None:
+        raise AuditQueryError(f"Unknown audit table '{table}'. Expected one of: {', '.join(AUDIT_TABLES)}.")
+    where: List[str] = []
+    params: list = []
+    for name, value in (filters or {}).items():
+        if value is None:
+            continue
+        column = spec["filters"].get(name)
+        if column is None:
+            raise AuditQueryError(f"Filter '{name}' is not supported for table '{table}'.")
+        where.append(f"{column} = ?")
+        params.append(value)
+    if since:
+        where.append("timestamp >= ?")
+        params.append(since)
+    if until:
+        where.append("timestamp < ?")
+        params.append(until)
+    if cursor:
+        ts, row_id = decode_cursor(cursor)
+        where.append("(timestamp, id) < (?, ?)")
+        params.extend([ts, row_id])
+    sql = f"SELECT {', '.join(spec['columns'])} FROM {table}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+    params.append(limit)
+    return sql, params
+
+
+def query_audit(table: str = "actions", filters: Optional[Dict[str, Any]] = None, since: Optional[str] = None,
+                until: Optional[str] = None, cursor: Optional[str] = None, limit: int = 100) -> Dict[str, Any]:
+    """
+    Return one page: {"items": [...], "next_cursor": str | None}. next_cursor is None on the last page.
+    """
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    sql, params = _build_query(table, filters or {}, since, until, cursor, limit + 1)
+    spec = AUDIT_TABLES[table]
+    conn = get_conn()
+    rows = conn.execute(sql, params).fetchall()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    items = []
+    for row in rows:
+        item = dict(zip(spec["columns"], row))
+        for col in spec["json_columns"]:
+            item[col] = _decode_json(item[col])
+        items.append(item)
+    # Expand {"$blob": hash} refs with one blob lookup per page
+    for col in spec["blob_columns"]:
+        for item, value in zip(items, resolve_all(conn, [item[col] for item in items])):
+            item[col] = value
+    next_cursor = encode_cursor(items[-1]["timestamp"], items[-1]["id"]) if has_more and items else None
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def iter_audit(table: str = "actions", filters: Optional[Dict[str, Any]] = None, since: Optional[str] = None,
+               until: Optional[str] = None, page_size: int = EXPORT_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Yield every matching row, newest first, fetching one keyset page at a time so memory stays bounded.
+    Each page is an independent query, so the generator is safe to resume from another thread.
+    """
+    cursor = None
+    while True:
+        page = query_audit(table, filters, since, until, cursor, page_size)
+        for item in page["items"]:
+            yield item
+        cursor = page["next_cursor"]
+        if not cursor:
+            return
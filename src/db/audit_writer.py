@@ -0,0 +1,179 @@
+"""
+VERN Audit Log Writer (Background, Batched)
+
+Moves audit-log INSERTs off the request thread. Callers enqueue rows into a bounded
+queue; a daemon thread group-commits them with executemany when either the batch
+size or the flush interval is reached.
+
+Backpressure: when the queue is full, enqueue waits up to AUDIT_ENQUEUE_TIMEOUT_S
+seconds for space, then drops the row and counts it (0 = drop immediately).
+Pending rows are flushed on stop() (registered with atexit and the backend shutdown hook).
+"""
+
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+AUDIT_QUEUE_MAX = int(os.environ.get("AUDIT_QUEUE_MAX", "10000"))
+AUDIT_BATCH_SIZE = int(os.environ.get("AUDIT_BATCH_SIZE", "256"))
+AUDIT_FLUSH_INTERVAL_MS = int(os.environ.get("AUDIT_FLUSH_INTERVAL_MS", "50"))
+AUDIT_ENQUEUE_TIMEOUT_S = float(os.environ.get("AUDIT_ENQUEUE_TIMEOUT_S", "0.25"))
+
+Row = Tuple[str, tuple]  # (table, values)
+
+
+class AuditWriter:
+    """
+    Single background writer thread fed by a bounded queue.
+    write_batch receives a list of (table, values) rows and must persist them in one transaction.
+    """
+    def __init__(
+        self,
+        write_batch: Callable[[List[Row]], None],
+        max_queue: int = AUDIT_QUEUE_MAX,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        flush_interval_ms: int = AUDIT_FLUSH_INTERVAL_MS,
+        enqueue_timeout: float = AUDIT_ENQUEUE_TIMEOUT_S,
+    ):
+        self._write_batch = write_batch
+        self._queue: "queue.Queue[Optional[Row]]" = queue.Queue(maxsize=max(1, max_queue))
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(1, flush_interval_ms) / 1000.0
+        self.enqueue_timeout = max(0.0, enqueue_timeout)
+        self._lock = threading.Lock()
+        # Orders producers' _stopping check + put against stop()'s sentinel (no row lands behind it)
+        self._put_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._stopping = False
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.errors = 0
+
+    # --- Lifecycle ---
+
+    def _ensure_started(self):
+        # Restart after fork (worker processes inherit the object but not the thread)
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._stopping = False
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="vern-audit-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Flush pending rows and stop the writer thread.
+        """
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        with self._put_lock:
+            self._stopping = True
+            try:
+                # Sentinel wakes the thread; blocking put so it is never dropped
+                self._queue.put(None, timeout=timeout)
+            except queue.Full:
+                pass
+        thread.join(timeout)
+
+    # --- Producer side ---
+
+    def enqueue(self, table: str, values: tuple) -> bool:
+        """
+        Queue a row for writing. Returns False if it was dropped because the queue stayed full.
+        """
+        with self._put_lock:
+            if not self._stopping:
+                self._ensure_started()
+                try:
+                    if self.enqueue_timeout:
+                        self._queue.put((table, values), timeout=self.enqueue_timeout)
+                    else:
+                        self._queue.put_nowait((table, values))
+                except queue.Full:
+                    self.dropped += 1
+                    return False
+                self.enqueued += 1
+                return True
+        # Shutting down: write through so late rows are not lost
+        self._safe_write([(table, values)])
+        return True
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """
+        Block until every row queued so far has been written (or timeout). Returns True when drained.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return self._queue.unfinished_tasks == 0
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "queue_max": self._queue.maxsize,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "errors": self.errors,
+        }
+
+    # --- Consumer side ---
+
+    def _safe_write(self, batch: List[Row]):
+        try:
+            self._write_batch(batch)
+            self.written += len(batch)
+            self.batches += 1
+        except Exception as e:
+            self.errors += 1
+            print(f"[audit_writer][WARN] Failed to write {len(batch)} audit rows: {e}")
+
+    def _run(self):
+        batch: List[Row] = []
+        deadline: Optional[float] = None
+        done = False
+        while not done:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+                if item is None:
+                    done = True
+                else:
+                    batch.append(item)
+                    if deadline is None:
+                        deadline = time.monotonic() + self.flush_interval
+            except queue.Empty:
+                pass
+            # Drain whatever is already waiting without blocking
+            while not done and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    done = True
+                else:
+                    batch.append(item)
+            sentinel_taken = done
+            if batch and (done or len(batch) >= self.batch_size or time.monotonic() >= (deadline or 0)):
+                self._safe_write(batch)
+                for _ in batch:
+                    self._queue.task_done()
+                batch = []
+                deadline = None
+            if sentinel_taken:
+                self._queue.task_done()
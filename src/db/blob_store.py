@@ -0,0 +1,202 @@
+"""
+VERN Audit Payload Blob Store
+
+Content-addressed, compressed storage for large strings inside `actions.payload`.
+
+Agents log the same persona prompt, context and responses in both their `*_request` and
+`llm_response` actions, and repeat them across requests. log_action() replaces every string
+field of at least AUDIT_BLOB_MIN_BYTES characters with a reference {"$blob": "<sha256>"}; the text
+itself is stored once in `payload_blobs`, compressed with zstd when `zstandard` is installed,
+zlib otherwise. The audit query path and archive export resolve references transparently.
+
+`last_used` is refreshed at most every BLOB_TOUCH_INTERVAL_S per hash; retention deletes
+blobs not used since before the hot window (see src/db/retention.py).
+"""
+
+import hashlib
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+AUDIT_BLOB_MIN_BYTES = int(os.environ.get("AUDIT_BLOB_MIN_BYTES", "256"))
+BLOB_TOUCH_INTERVAL_S = int(os.environ.get("AUDIT_BLOB_TOUCH_INTERVAL_S", "3600"))
+BLOB_REF_KEY = "$blob"
+
+BLOB_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS payload_blobs (
+  hash TEXT PRIMARY KEY,
+  codec TEXT NOT NULL,
+  size INTEGER NOT NULL,
+  data BLOB NOT NULL,
+  created_at TEXT NOT NULL,
+  last_used TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_payload_blobs_last_used ON payload_blobs(last_used);
+"""
+
+# Upsert used by the audit writer: store once, then only bump last_used
+UPSERT_BLOB_SQL = (
+    "INSERT INTO payload_blobs (hash, codec, size, data, created_at, last_used) VALUES (?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(hash) DO UPDATE SET last_used = excluded.last_used"
+)
+
+
+# --- Codec ---
+
+def compress(text: str) -> Tuple[str, bytes]:
+    raw = text.encode("utf-8")
+    if ZSTD_AVAILABLE:
+        return "zstd", zstandard.ZstdCompressor(level=3).compress(raw)
+    return "zlib", zlib.compress(raw, 6)
+
+
+def decompress(codec: str, data: bytes) -> str:
+    if codec == "zstd":
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("Blob is zstd-compressed but zstandard is not installed.")
+        return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+    if codec == "zlib":
+        return zlib.decompress(data).decode("utf-8")
+    return bytes(data).decode("utf-8")
+
+
+def encode_row(blob_hash: str, text: str, ts: str) -> tuple:
+    """
+    Turn a queued (hash, text, ts) row into UPSERT_BLOB_SQL parameters. Runs on the writer thread.
+    """
+    codec, data = compress(text)
+    return (blob_hash, codec, len(text), data, ts, ts)
+
+
+# --- Write side ---
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def externalize(obj: Any, min_len: int = AUDIT_BLOB_MIN_BYTES) -> Tuple[Any, Dict[str, str]]:
+    """
+    Return (copy of obj with large strings replaced by blob refs, {hash: text}).
+    """
+    blobs: Dict[str, str] = {}
+
+    def walk(value):
+        if isinstance(value, str):
+            if len(value) >= min_len:
+                h = content_hash(value)
+                blobs[h] = value
+                return {BLOB_REF_KEY: h}
+            return value
+        if isinstance(value, dict):
+            return {k: walk(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [walk(v) for v in value]
+        return value
+
+    return walk(obj), blobs
+
+
+class RecentBlobs:
+    """
+    Bounded LRU of hashes queued recently, so repeated prompts are not re-sent to the writer.
+    A hash is due again once BLOB_TOUCH_INTERVAL_S has passed, which refreshes its last_used.
+    """
+    def __init__(self, capacity: int = 4096, touch_interval: int = BLOB_TOUCH_INTERVAL_S):
+        self.capacity = capacity
+        self.touch_interval = touch_interval
+        self._seen: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def due(self, blob_hash: str) -> bool:
+        with self._lock:
+            ts = self._seen.get(blob_hash)
+            return ts is None or time.monotonic() - ts >= self.touch_interval
+
+    def mark(self, blob_hash: str):
+        with self._lock:
+            self._seen[blob_hash] = time.monotonic()
+            self._seen.move_to_end(blob_hash)
+            while len(self._seen) > self.capacity:
+                self._seen.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._seen.clear()
+
+
+# --- Read side ---
+
+def collect_refs(obj: Any, out: Optional[Set[str]] = None) -> Set[str]:
+    out = set() if out is None else out
+    if isinstance(obj, dict):
+        ref = obj.get(BLOB_REF_KEY)
+        if len(obj) == 1 and isinstance(ref, str):
+            out.add(ref)
+        else:
+            for v in obj.values():
+                collect_refs(v, out)
+    elif isinstance(obj, list):
+        for v in obj:
+            collect_refs(v, out)
+    return out
+
+
+def load_blobs(conn, hashes: Iterable[str]) -> Dict[str, str]:
+    hashes = list(hashes)
+    found: Dict[str, str] = {}
+    # Stay well under SQLite's bound-parameter limit
+    for i in range(0, len(hashes), 500):
+        chunk = hashes[i:i + 500]
+        placeholders = ", ".join("?" for _ in chunk)
+        for h, codec, data in conn.execute(
+            f"SELECT hash, codec, data FROM payload_blobs WHERE hash IN ({placeholders})", chunk
+        ).fetchall():
+            found[h] = decompress(codec, data)
+    return found
+
+
+def resolve(obj: Any, blobs: Dict[str, str]) -> Any:
+    """
+    Replace blob refs with their text. Unknown refs are left in place.
+    """
+    if isinstance(obj, dict):
+        ref = obj.get(BLOB_REF_KEY)
+        if len(obj) == 1 and isinstance(ref, str):
+            return blobs.get(ref, obj)
+        return {k: resolve(v, blobs) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [resolve(v, blobs) for v in obj]
+    return obj
+
+
+def resolve_all(conn, objs: Iterable[Any]) -> list:
+    """
+    Resolve refs in many decoded payloads with a single blob lookup.
+    """
+    objs = list(objs)
+    refs: Set[str] = set()
+    for obj in objs:
+        collect_refs(obj, refs)
+    if not refs:
+        return objs
+    blobs = load_blobs(conn, refs)
+    return [resolve(obj, blobs) for obj in objs]
+
+
+def gc_blobs(conn, before: str) -> int:
+    """
+    Delete blobs whose last_used is older than `before` (ISO timestamp). Returns rows deleted.
+    """
+    with conn:
+        cur = conn.execute("DELETE FROM payload_blobs WHERE last_used < ?", (before,))
+    return cur.rowcount
@@ -0,0 +1,115 @@
+"""
+VERN DB Connection Manager
+
+Process-wide SQLite connection handling shared by the DB logger and the backend
+routers (feedback, users, agent registry).
+
+- One long-lived connection per (thread, DB path) instead of a connect per call.
+- WAL journal mode and tuned pragmas applied once when a connection is opened.
+- Schema scripts run once per (DB path, schema key) for the whole process.
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+# Journal mode can be overridden for filesystems without shared-memory support (e.g. some network mounts)
+JOURNAL_MODE = os.environ.get("SQLITE_JOURNAL_MODE", "wal").lower()
+BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+PRAGMAS = (
+    f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}",
+    "PRAGMA synchronous=NORMAL",     # safe with WAL; fsync on checkpoint instead of every commit
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",       # ~8 MB page cache per connection
+)
+
+_local = threading.local()
+_lock = threading.Lock()
+_all_conns: List[sqlite3.Connection] = []
+_schema_ready: Set[Tuple[str, str]] = set()
+# Bumped by close_all() so every thread drops its stale (closed) connections on next use
+_generation = 0
+
+
+def _ensure_parent_dir(path: str):
+    parent = os.path.dirname(path or "")
+    if parent and not os.path.exists(parent):
+        os.makedirs(parent, exist_ok=True)
+
+
+def _normalize(db_path: str) -> str:
+    if db_path == ":memory:":
+        return db_path
+    return os.path.abspath(db_path)
+
+
+def _open(db_path: str) -> sqlite3.Connection:
+    if db_path != ":memory:":
+        _ensure_parent_dir(db_path)
+    # Connections never leave their owning thread; check_same_thread=False only lets close_all() run at shutdown.
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_MS / 1000.0, check_same_thread=False)
+    # Only takes effect on a brand-new file; older DBs are converted by src/db/retention.py
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    try:
+        conn.execute(f"PRAGMA journal_mode={JOURNAL_MODE}")
+    except sqlite3.DatabaseError:
+        # Non-fatal: fall back to the default rollback journal
+        pass
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def get_connection(db_path: str) -> sqlite3.Connection:
+    """
+    Return the calling thread's pooled connection for db_path, opening it on first use.
+    Callers must not close the returned connection; use `with conn:` for transactions.
+    """
+    key = _normalize(db_path)
+    conns: Optional[Dict[str, sqlite3.Connection]] = getattr(_local, "conns", None)
+    if conns is None or getattr(_local, "generation", None) != _generation:
+        conns = _local.conns = {}
+        _local.generation = _generation
+    conn = conns.get(key)
+    if conn is None:
+        conn = _open(key)
+        conns[key] = conn
+        with _lock:
+            _all_conns.append(conn)
+    return conn
+
+
+def ensure_schema(db_path: str, schema_key: str, schema_sql: str) -> sqlite3.Connection:
+    """
+    Return the pooled connection for db_path, running schema_sql the first time
+    this (path, schema_key) pair is seen in the process.
+    """
+    conn = get_connection(db_path)
+    key = (_normalize(db_path), schema_key)
+    if key in _schema_ready:
+        return conn
+    with _lock:
+        if key not in _schema_ready:
+            conn.executescript(schema_sql)
+            conn.commit()
+            _schema_ready.add(key)
+    return conn
+
+
+def close_all():
+    """
+    Close every pooled connection (all threads) and forget schema state. Intended for shutdown and tests.
+    """
+    global _generation
+    with _lock:
+        conns = list(_all_conns)
+        _all_conns.clear()
+        _schema_ready.clear()
+        _generation += 1
+    for conn in conns:
+        try:
+            conn.close()
+        except Exception:
+            pass
@@ -3,13 +3,21 @@ VERN DB Logger API (MVP)
 
 Provides functions to log actions, handoffs, gotchas, and general logs to the SQLite database.
 This version uses the backend's canonical DB path resolver and auto-initializes schema.
+Connections are pooled per thread and the schema is initialized once per DB path (see src/db/connection.py).
+Rows are handed to a background writer that group-commits them (see src/db/audit_writer.py);
+call flush_logs() when a caller must read its own writes.
+Large payload strings are stored once, compressed, in payload_blobs (see src/db/blob_store.py).
 """
 
-import sqlite3
+import atexit
 import json
 import os
 from datetime import datetime, timezone
 
+from src.db.audit_writer import AuditWriter
+from src.db.blob_store import BLOB_SCHEMA_SQL, UPSERT_BLOB_SQL, RecentBlobs, encode_row as encode_blob_row, externalize
+from src.db.connection import ensure_schema
+
 # Align DB path with backend helper; fall back to env/default if unavailable
 try:
     from vern_backend.app.db_path import get_sqlite_path
@@ -58,52 +66,96 @@ CREATE TABLE IF NOT EXISTS logs (
   level TEXT,
   context TEXT
 );
-"""
+-- Audit query indexes (mirrors migrations/0005_audit_indexes.sql)
+CREATE INDEX IF NOT EXISTS idx_actions_ts ON actions(timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_actions_agent_ts ON actions(agent_id, timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_actions_user_ts ON actions(user_id, timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_actions_type_ts ON actions(action_type, timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_logs_ts ON logs(timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_logs_agent_ts ON logs(agent_id, timestamp, id);
+""" + BLOB_SCHEMA_SQL
 
-def _ensure_parent_dir(path: str):
-    parent = os.path.dirname(path or "")
-    if parent and not os.path.exists(parent):
-        os.makedirs(parent, exist_ok=True)
+INSERT_SQL = {
+    "actions": "INSERT INTO actions (timestamp, agent_id, user_id, action_type, payload, status, gotcha_id, tags) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+    "handoffs": "INSERT INTO handoffs (from_agent_id, to_agent_id, action_id, timestamp, notes, gotcha_id, context_snapshot) VALUES (?, ?, ?, ?, ?, ?, ?)",
+    "gotchas": "INSERT INTO gotchas (timestamp, agent_id, description, severity, resolved, resolution_notes, related_action_id, related_handoff_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+    "logs": "INSERT INTO logs (timestamp, agent_id, message, level, context) VALUES (?, ?, ?, ?, ?)",
+    "payload_blobs": UPSERT_BLOB_SQL,
+}
 
-def _init_schema(conn: sqlite3.Connection):
-    conn.executescript(SCHEMA_SQL)
-    conn.commit()
+# Background group-commit writer (set AUDIT_ASYNC=0 to write synchronously on the caller thread)
+AUDIT_ASYNC = os.environ.get("AUDIT_ASYNC", "1") == "1"
+# Deduplicate/compress large payload strings into payload_blobs (see src/db/blob_store.py)
+AUDIT_BLOBS = os.environ.get("AUDIT_BLOBS", "1") == "1"
+_recent_blobs = RecentBlobs()
 
 def get_conn():
-    _ensure_parent_dir(DB_PATH)
-    conn = sqlite3.connect(DB_PATH)
-    # Initialize schema on first connect
-    _init_schema(conn)
-    return conn
+    # Pooled per-thread connection; schema runs only on the first call for DB_PATH
+    return ensure_schema(DB_PATH, "logger", SCHEMA_SQL)
 
-def log_action(agent_id, user_id, action_type, payload, status="success", gotcha_id=None, tags=None):
+def _write_rows(rows):
+    """
+    Persist (table, values) rows in a single transaction, one executemany per table.
+    """
+    by_table = {}
+    for table, values in rows:
+        by_table.setdefault(table, []).append(values)
     with get_conn() as conn:
-        conn.execute(
-            "INSERT INTO actions (timestamp, agent_id, user_id, action_type, payload, status, gotcha_id, tags) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-            (datetime.now(timezone.utc).isoformat(), agent_id, user_id, action_type, json.dumps(payload), status, gotcha_id, json.dumps(tags) if tags else None)
-        )
-        conn.commit()
+        for table, values in by_table.items():
+            if table == "payload_blobs":
+                # Compression happens here, on the writer thread, not on the request thread
+                values = [encode_blob_row(*v) for v in values]
+            conn.executemany(INSERT_SQL[table], values)
+
+_writer = AuditWriter(_write_rows)
+atexit.register(_writer.stop)
+
+def _emit(table, values):
+    if AUDIT_ASYNC:
+        return _writer.enqueue(table, values)
+    _write_rows([(table, values)])
+    return True
+
+def _store_payload(payload, ts):
+    """
+    Swap large strings in payload for blob refs, queueing each blob that is new (or due a
+    last_used refresh). Falls back to the inline payload if a blob row could not be queued.
+    """
+    if not AUDIT_BLOBS:
+        return payload
+    stored, blobs = externalize(payload)
+    for blob_hash, text in blobs.items():
+        if not _recent_blobs.due(blob_hash):
+            continue
+        if not _emit("payload_blobs", (blob_hash, text, ts)):
+            return payload
+        _recent_blobs.mark(blob_hash)
+    return stored
+
+def flush_logs(timeout=5.0):
+    """
+    Wait until all queued audit rows are committed. Returns True when the queue is drained.
+    """
+    return _writer.flush(timeout)
+
+def shutdown_logger(timeout=5.0):
+    """
+    Flush pending rows and stop the background writer (called on backend shutdown).
+    """
+    _writer.stop(timeout)
+
+def writer_stats():
+    return _writer.stats()
+
+def log_action(agent_id, user_id, action_type, payload, status="success", gotcha_id=None, tags=None):
+    ts = datetime.now(timezone.utc).isoformat()
+    _emit("actions", (ts, agent_id, user_id, action_type, json.dumps(_store_payload(payload, ts)), status, gotcha_id, json.dumps(tags) if tags else None))
 
 def log_handoff(from_agent_id, to_agent_id, action_id, notes="", gotcha_id=None, context_snapshot=None):
-    with get_conn() as conn:
-        conn.execute(
-            "INSERT INTO handoffs (from_agent_id, to_agent_id, action_id, timestamp, notes, gotcha_id, context_snapshot) VALUES (?, ?, ?, ?, ?, ?, ?)",
-            (from_agent_id, to_agent_id, action_id, datetime.now(timezone.utc).isoformat(), notes, gotcha_id, json.dumps(context_snapshot) if context_snapshot else None)
-        )
-        conn.commit()
+    _emit("handoffs", (from_agent_id, to_agent_id, action_id, datetime.now(timezone.utc).isoformat(), notes, gotcha_id, json.dumps(context_snapshot) if context_snapshot else None))
 
 def log_gotcha(agent_id, description, severity="warning", resolved=False, resolution_notes=None, related_action_id=None, related_handoff_id=None):
-    with get_conn() as conn:
-        conn.execute(
-            "INSERT INTO gotchas (timestamp, agent_id, description, severity, resolved, resolution_notes, related_action_id, related_handoff_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-            (datetime.now(timezone.utc).isoformat(), agent_id, description, severity, int(resolved), resolution_notes, related_action_id, related_handoff_id)
-        )
-        conn.commit()
+    _emit("gotchas", (datetime.now(timezone.utc).isoformat(), agent_id, description, severity, int(resolved), resolution_notes, related_action_id, related_handoff_id))
 
 def log_message(agent_id, message, level="info", context=None):
-    with get_conn() as conn:
-        conn.execute(
-            "INSERT INTO logs (timestamp, agent_id, message, level, context) VALUES (?, ?, ?, ?, ?)",
-            (datetime.now(timezone.utc).isoformat(), agent_id, message, level, json.dumps(context) if context else None)
-        )
-        conn.commit()
+    _emit("logs", (datetime.now(timezone.utc).isoformat(), agent_id, message, level, json.dumps(context) if context else None))
@@ -1,6 +1,28 @@
+"""
+VERN SQLite migration runner.
+
+- Startup fast path: one query against schema_migrations plus a directory listing;
+  migration files are only read when something is pending or a legacy row (applied by
+  the previous runner) still lacks its checksum.
+- Pending migrations are applied in a single transaction (all or nothing). BEGIN/COMMIT
+  lines inside migration files are ignored so they can still be run by hand.
+- Each applied file is recorded with its numeric version and sha256 checksum; --status
+  flags applied files whose contents changed since they ran.
+
+CLI:
+    python -m src.db.migrate            apply pending migrations
+    python -m src.db.migrate --status   show applied/pending/changed migrations
+    python -m src.db.migrate --dry-run  run pending migrations in a rolled-back transaction
+"""
+
+import argparse
+import hashlib
 import os
+import re
 import sqlite3
-from typing import List
+from typing import Dict, List, Optional
+
+from src.db.connection import get_connection
 
 # Align DB path resolution with backend helper
 try:
@@ -12,14 +34,22 @@ except Exception:
 
 MIGRATIONS_DIR = os.environ.get("MIGRATIONS_DIR", os.path.join(os.path.dirname(__file__), "migrations"))
 
-def ensure_parent_dir(path: str):
-    parent = os.path.dirname(path or "")
-    if parent and not os.path.exists(parent):
-        os.makedirs(parent, exist_ok=True)
+SCHEMA_MIGRATIONS_SQL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    filename TEXT UNIQUE NOT NULL,
+    applied_at TEXT DEFAULT (datetime('now')),
+    version INTEGER,
+    checksum TEXT
+)
+"""
+
+_TRANSACTION_STMT = re.compile(r"^\s*(BEGIN|COMMIT|END)(\s+TRANSACTION)?\s*;\s*$", re.IGNORECASE)
+
+
+def get_conn(db_path: Optional[str] = None) -> sqlite3.Connection:
+    return get_connection(db_path or DB_PATH)
 
-def get_conn() -> sqlite3.Connection:
-    ensure_parent_dir(DB_PATH)
-    return sqlite3.connect(DB_PATH)
 
 def list_migration_files() -> List[str]:
     if not os.path.isdir(MIGRATIONS_DIR):
@@ -27,35 +57,171 @@ def list_migration_files() -> List[str]:
     files = sorted(f for f in os.listdir(MIGRATIONS_DIR) if f.endswith(".sql"))
     return [os.path.join(MIGRATIONS_DIR, f) for f in files]
 
-def applied_migrations(conn: sqlite3.Connection) -> set:
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS schema_migrations (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            filename TEXT UNIQUE NOT NULL,
-            applied_at TEXT DEFAULT (datetime('now'))
-        )
-    """)
-    rows = conn.execute("SELECT filename FROM schema_migrations").fetchall()
-    return {r[0] for r in rows}
+
+def file_version(filename: str) -> Optional[int]:
+    m = re.match(r"(\d+)", os.path.basename(filename))
+    return int(m.group(1)) if m else None
+
+
+def file_checksum(filepath: str) -> str:
+    with open(filepath, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def applied_migrations(conn: sqlite3.Connection) -> Dict[str, Optional[str]]:
+    """
+    Return {filename: checksum} for applied migrations (checksum is None for legacy rows).
+    A missing table means nothing has been applied yet.
+    """
+    try:
+        rows = conn.execute("SELECT filename, checksum FROM schema_migrations").fetchall()
+    except sqlite3.OperationalError as e:
+        if "no such column" in str(e):
+            rows = [(r[0], None) for r in conn.execute("SELECT filename FROM schema_migrations").fetchall()]
+        elif "no such table" in str(e):
+            return {}
+        else:
+            raise
+    return {name: checksum for name, checksum in rows}
+
+
+def pending_migrations(conn: sqlite3.Connection) -> List[str]:
+    done = applied_migrations(conn)
+    return [p for p in list_migration_files() if os.path.basename(p) not in done]
+
+
+def _ensure_table(conn: sqlite3.Connection):
+    conn.execute(SCHEMA_MIGRATIONS_SQL)
+    cols = {row[1] for row in conn.execute("PRAGMA table_info(schema_migrations)").fetchall()}
+    # Upgrade tables created by the previous runner (filename/applied_at only)
+    if "version" not in cols:
+        conn.execute("ALTER TABLE schema_migrations ADD COLUMN version INTEGER")
+    if "checksum" not in cols:
+        conn.execute("ALTER TABLE schema_migrations ADD COLUMN checksum TEXT")
+
+
+def _statements(sql: str) -> List[str]:
+    """
+    Split a migration script into statements, dropping its own transaction control.
+    """
+    statements, buf = [], ""
+    for line in sql.splitlines(keepends=True):
+        if not buf and (not line.strip() or line.lstrip().startswith("--")):
+            continue  # skip comments between statements
+        buf += line
+        if sqlite3.complete_statement(buf):
+            if not _TRANSACTION_STMT.match(buf):
+                statements.append(buf.strip())
+            buf = ""
+    if buf.strip():
+        statements.append(buf.strip())
+    return statements
+
 
 def apply_migration(conn: sqlite3.Connection, filepath: str):
-    with open(filepath, "r", encoding="utf-8") as f:
-        sql = f.read()
-    cur = conn.cursor()
-    cur.executescript(sql)
-    cur.execute("INSERT INTO schema_migrations (filename) VALUES (?)", (os.path.basename(filepath),))
-    conn.commit()
-
-def migrate():
-    with get_conn() as conn:
-        done = applied_migrations(conn)
-        files = list_migration_files()
-        for path in files:
-            name = os.path.basename(path)
-            if name in done:
-                continue
+    """
+    Execute one migration file and record it. Must run inside the caller's transaction.
+    """
+    # Hash the bytes on disk (as file_checksum does) so CRLF files do not show up as changed
+    with open(filepath, "rb") as f:
+        raw = f.read()
+    sql = raw.decode("utf-8")
+    for stmt in _statements(sql):
+        conn.execute(stmt)
+    name = os.path.basename(filepath)
+    conn.execute(
+        "INSERT INTO schema_migrations (filename, version, checksum) VALUES (?, ?, ?)",
+        (name, file_version(name), hashlib.sha256(raw).hexdigest()),
+    )
+
+
+def _backfill_checksums(conn: sqlite3.Connection, done: Dict[str, Optional[str]]):
+    for path in list_migration_files():
+        name = os.path.basename(path)
+        if name in done and done[name] is None:
+            conn.execute(
+                "UPDATE schema_migrations SET version = ?, checksum = ? WHERE filename = ?",
+                (file_version(name), file_checksum(path), name),
+            )
+
+
+def migrate(db_path: Optional[str] = None, dry_run: bool = False) -> List[str]:
+    """
+    Apply all pending migrations in one transaction. Returns the filenames applied
+    (or, with dry_run, the ones that would be applied; the transaction is rolled back).
+    Checksums missing from legacy rows are backfilled in the same transaction.
+    """
+    conn = get_conn(db_path)
+    done = applied_migrations(conn)
+    files = list_migration_files()
+    pending = [p for p in files if os.path.basename(p) not in done]
+    legacy = any(done.get(os.path.basename(p), "") is None for p in files)
+    if not pending and not legacy:
+        return []
+    names = [os.path.basename(p) for p in pending]
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        _ensure_table(conn)
+        _backfill_checksums(conn, done)
+        for path in pending:
             apply_migration(conn, path)
+        if dry_run:
+            conn.rollback()
+        else:
+            conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    if not dry_run:
+        for name in names:
             print(f"[migrate] Applied {name}")
+    return names
+
+
+def migration_status(db_path: Optional[str] = None) -> List[Dict[str, object]]:
+    """
+    Report every known migration as applied, pending or changed (checksum mismatch).
+    """
+    conn = get_conn(db_path)
+    done = applied_migrations(conn)
+    report = []
+    for path in list_migration_files():
+        name = os.path.basename(path)
+        checksum = file_checksum(path)
+        if name not in done:
+            state = "pending"
+        elif done[name] and done[name] != checksum:
+            state = "changed"
+        else:
+            state = "applied"
+        report.append({"filename": name, "version": file_version(name), "state": state, "checksum": checksum})
+    return report
+
+
+def table_exists(name: str, db_path: Optional[str] = None) -> bool:
+    row = get_conn(db_path).execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (name,)).fetchone()
+    return row is not None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply VERN SQLite migrations.")
+    parser.add_argument("--status", action="store_true", help="show applied/pending/changed migrations and exit")
+    parser.add_argument("--dry-run", action="store_true", help="run pending migrations in a transaction, then roll back")
+    parser.add_argument("--db", default=None, help="SQLite path (defaults to SQLITE_DB_PATH)")
+    args = parser.parse_args(argv)
+
+    if args.status:
+        for row in migration_status(args.db):
+            print(f"{row['state']:<8} {row['filename']}")
+        return 0
+    names = migrate(args.db, dry_run=args.dry_run)
+    if args.dry_run:
+        for name in names:
+            print(f"[migrate][dry-run] Would apply {name}")
+    if not names:
+        print("[migrate] Nothing to apply")
+    return 0
+
 
 if __name__ == "__main__":
-    migrate()
\ No newline at end of file
+    raise SystemExit(main())
@@ -0,0 +1,15 @@
+-- 0005_audit_indexes.sql
+-- Indexes backing the /admin/audit query API (idempotent).
+-- Each index ends in (timestamp, id) so filtered keyset pages are served in index order without a sort.
+
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS idx_actions_ts ON actions(timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_actions_agent_ts ON actions(agent_id, timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_actions_user_ts ON actions(user_id, timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_actions_type_ts ON actions(action_type, timestamp, id);
+
+CREATE INDEX IF NOT EXISTS idx_logs_ts ON logs(timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_logs_agent_ts ON logs(agent_id, timestamp, id);
+
+COMMIT;
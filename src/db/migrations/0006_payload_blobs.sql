@@ -0,0 +1,18 @@
+-- 0006_payload_blobs.sql
+-- Content-addressed, compressed store for large audit payload strings (idempotent).
+-- actions.payload references rows here as {"$blob": "<sha256>"}; see src/db/blob_store.py.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS payload_blobs (
+  hash TEXT PRIMARY KEY,
+  codec TEXT NOT NULL,
+  size INTEGER NOT NULL,
+  data BLOB NOT NULL,
+  created_at TEXT NOT NULL,
+  last_used TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_payload_blobs_last_used ON payload_blobs(last_used);
+
+COMMIT;
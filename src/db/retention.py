@@ -0,0 +1,225 @@
+"""
+VERN Audit Log Retention & Compaction
+
+Keeps the main SQLite DB small without slowing down hot-path inserts:
+
+- The audit tables (actions, logs, gotchas, handoffs) only hold a hot window of
+  AUDIT_HOT_DAYS days; the logger keeps appending to them exactly as before.
+- Older rows are rotated out in daily buckets (UTC date prefix of `timestamp`): each bucket is
+  streamed to AUDIT_ARCHIVE_DIR/<table>/<YYYY-MM-DD>.ndjson.gz, fsynced, then deleted in chunks.
+- Payload blob refs are inlined into archived rows, and blobs unused since before the
+  hot window are garbage-collected.
+- Archives older than AUDIT_ARCHIVE_RETENTION_DAYS are removed (0 keeps them forever).
+- Freed pages are returned to the filesystem with incremental VACUUM.
+
+Run once from the CLI (`python -m src.db.retention`) or in the background via AuditMaintenance,
+which the backend starts on startup. A crash between archiving and deleting a bucket can leave
+rows duplicated in the archive (gzip members are appended), never lost.
+"""
+
+import gzip
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from src.db.blob_store import BLOB_TOUCH_INTERVAL_S, gc_blobs, resolve_all
+from src.db.connection import ensure_schema, get_connection
+from src.db.logger import DB_PATH, SCHEMA_SQL
+
+AUDIT_HOT_DAYS = int(os.environ.get("AUDIT_HOT_DAYS", "7"))
+AUDIT_ARCHIVE_RETENTION_DAYS = int(os.environ.get("AUDIT_ARCHIVE_RETENTION_DAYS", "90"))
+AUDIT_ARCHIVE_DIR = os.environ.get("AUDIT_ARCHIVE_DIR") or os.path.join(os.path.dirname(DB_PATH), "audit_archive")
+AUDIT_MAINTENANCE_INTERVAL_S = int(os.environ.get("AUDIT_MAINTENANCE_INTERVAL_S", "3600"))
+AUDIT_VACUUM_PAGES = int(os.environ.get("AUDIT_VACUUM_PAGES", "2000"))
+
+AUDIT_TABLES = ("actions", "logs", "gotchas", "handoffs")
+DELETE_CHUNK = 5000
+FETCH_CHUNK = 1000
+
+
+def _cutoff_day(hot_days: int, now: Optional[datetime] = None) -> str:
+    now = now or datetime.now(timezone.utc)
+    return (now - timedelta(days=max(0, hot_days))).strftime("%Y-%m-%d")
+
+
+def _columns(conn, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()]
+
+
+def _archive_bucket(conn, table: str, day: str, archive_dir: str) -> int:
+    """
+    Append every row of `table` for UTC date `day` to <archive_dir>/<table>/<day>.ndjson.gz.
+    Returns the number of rows written. The file is fsynced before returning.
+    """
+    cols = _columns(conn, table)
+    start, end = day, (datetime.strptime(day, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+    target_dir = os.path.join(archive_dir, table)
+    os.makedirs(target_dir, exist_ok=True)
+    path = os.path.join(target_dir, f"{day}.ndjson.gz")
+    count = 0
+    cur = conn.execute(
+        f"SELECT {', '.join(cols)} FROM {table} WHERE timestamp >= ? AND timestamp < ? ORDER BY id",
+        (start, end),
+    )
+    with open(path, "ab") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="ab") as gz:
+            while True:
+                rows = cur.fetchmany(FETCH_CHUNK)
+                if not rows:
+                    break
+                records = [dict(zip(cols, row)) for row in rows]
+                if table == "actions":
+                    _expand_payloads(conn, records)
+                for record in records:
+                    gz.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+                count += len(rows)
+        raw.flush()
+        os.fsync(raw.fileno())
+    return count
+
+
+def _expand_payloads(conn, records: List[Dict[str, Any]]):
+    # Archives are self-contained: inline blob refs since the blobs themselves get GC'd
+    decoded = []
+    for record in records:
+        try:
+            decoded.append(json.loads(record["payload"]) if record.get("payload") else None)
+        except Exception:
+            decoded.append(None)
+    for record, original, payload in zip(records, decoded, resolve_all(conn, decoded)):
+        if original is not None:
+            record["payload"] = json.dumps(payload)
+
+
+def _delete_bucket(conn, table: str, day: str) -> int:
+    start, end = day, (datetime.strptime(day, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+    deleted = 0
+    while True:
+        # Small transactions so the background writer is never blocked for long
+        with conn:
+            cur = conn.execute(
+                f"DELETE FROM {table} WHERE id IN (SELECT id FROM {table} WHERE timestamp >= ? AND timestamp < ? LIMIT ?)",
+                (start, end, DELETE_CHUNK),
+            )
+        deleted += cur.rowcount
+        if cur.rowcount < DELETE_CHUNK:
+            return deleted
+
+
+def rotate_partitions(db_path: str = DB_PATH, hot_days: int = AUDIT_HOT_DAYS, archive_dir: str = AUDIT_ARCHIVE_DIR,
+                      now: Optional[datetime] = None) -> Dict[str, Dict[str, int]]:
+    """
+    Archive and delete every daily bucket older than the hot window. Returns {table: {day: rows}}.
+    """
+    conn = ensure_schema(db_path, "logger", SCHEMA_SQL)
+    cutoff = _cutoff_day(hot_days, now)
+    rotated: Dict[str, Dict[str, int]] = {}
+    for table in AUDIT_TABLES:
+        days = [r[0] for r in conn.execute(
+            f"SELECT DISTINCT substr(timestamp, 1, 10) FROM {table} WHERE timestamp < ? ORDER BY 1", (cutoff,)
+        ).fetchall() if r[0]]
+        for day in days:
+            archived = _archive_bucket(conn, table, day, archive_dir)
+            _delete_bucket(conn, table, day)
+            if archived:
+                rotated.setdefault(table, {})[day] = archived
+    # A remaining row's blob was touched at most BLOB_TOUCH_INTERVAL_S before the row was written,
+    # so blobs untouched since that long (at least a day) before the hot window are unreferenced
+    margin = max(timedelta(days=1), timedelta(seconds=BLOB_TOUCH_INTERVAL_S))
+    gc_before = (datetime.strptime(cutoff, "%Y-%m-%d") - margin).strftime("%Y-%m-%d")
+    gc_blobs(conn, gc_before)
+    return rotated
+
+
+def prune_archives(archive_dir: str = AUDIT_ARCHIVE_DIR, retention_days: int = AUDIT_ARCHIVE_RETENTION_DAYS,
+                   now: Optional[datetime] = None) -> List[str]:
+    """
+    Delete archive files whose day is older than the retention window. Returns removed paths.
+    """
+    if retention_days <= 0 or not os.path.isdir(archive_dir):
+        return []
+    cutoff = _cutoff_day(retention_days, now)
+    removed = []
+    for table in os.listdir(archive_dir):
+        table_dir = os.path.join(archive_dir, table)
+        if not os.path.isdir(table_dir):
+            continue
+        for name in os.listdir(table_dir):
+            if name.endswith(".ndjson.gz") and name[:10] < cutoff:
+                path = os.path.join(table_dir, name)
+                os.remove(path)
+                removed.append(path)
+    return removed
+
+
+def incremental_vacuum(db_path: str = DB_PATH, pages: int = AUDIT_VACUUM_PAGES) -> int:
+    """
+    Release up to `pages` free pages back to the filesystem. Databases created before
+    auto_vacuum=INCREMENTAL was enabled are converted once with a full VACUUM.
+    Returns the number of free pages reclaimed.
+    """
+    conn = get_connection(db_path)
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("VACUUM")
+    before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    conn.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+    after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    try:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+    except Exception:
+        pass
+    return before - after
+
+
+def run_retention(db_path: str = DB_PATH, hot_days: int = AUDIT_HOT_DAYS, archive_dir: str = AUDIT_ARCHIVE_DIR,
+                  retention_days: int = AUDIT_ARCHIVE_RETENTION_DAYS, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    One full maintenance pass: rotate old buckets, prune old archives, vacuum freed pages.
+    """
+    rotated = rotate_partitions(db_path, hot_days, archive_dir, now)
+    pruned = prune_archives(archive_dir, retention_days, now)
+    reclaimed = incremental_vacuum(db_path)
+    return {"rotated": rotated, "pruned_archives": pruned, "reclaimed_pages": reclaimed}
+
+
+class AuditMaintenance:
+    """
+    Daemon thread running run_retention() every `interval` seconds.
+    """
+    def __init__(self, interval: int = AUDIT_MAINTENANCE_INTERVAL_S, db_path: str = DB_PATH):
+        self.interval = max(1, interval)
+        self.db_path = db_path
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_result: Optional[Dict[str, Any]] = None
+        self.last_run: Optional[float] = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="vern-audit-maintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.last_result = run_retention(self.db_path)
+                self.last_run = time.time()
+            except Exception as e:
+                print(f"[retention][WARN] Audit maintenance failed: {e}")
+
+
+maintenance = AuditMaintenance()
+
+if __name__ == "__main__":
+    print(json.dumps(run_retention(), indent=2))
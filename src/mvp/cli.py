@@ -9,6 +9,7 @@ If orchestrator returns no response, fallback to direct LLM call for debugging.
 import sys
 from src.mvp.llm_router import get_llm_backend, route_llm_call
 from src.mvp.orchestrator import orchestrator_respond
+from src.mvp.prompt_utils import trim_history
 
 def main():
     print("Welcome to VERN CLI Chat!")
@@ -50,6 +51,8 @@ def main():
                     chat_history.append(("You", user_input))
                     chat_history.append(("VERN", response))
             context.append({"role": "vern", "content": response})
+            # Keep the running conversation within the history token budget
+            context[:] = trim_history(context)
         except KeyboardInterrupt:
             print("\nExiting VERN CLI. Goodbye!")
             break
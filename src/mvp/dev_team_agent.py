@@ -9,8 +9,8 @@ class DevTeam:
     Enhanced DevTeam class with persona tuning, agent memory/context, and workflow support.
     """
     def respond(self, user_input, context=None, agent_status=None, persona="default", memory=None):
-        from mvp.llm_router import route_llm_call
-        from mvp.prompt_utils import build_prompt
+        from src.mvp.llm_router import route_llm_call
+        from src.mvp.prompt_utils import build_prompt
         persona_descriptions = {
             "default": "Analyze requirements, generate a code plan, and provide a code snippet or actionable steps.",
             "architect": "Design scalable, maintainable solutions and explain tradeoffs.",
@@ -68,8 +68,8 @@ def dev_team_respond(user_input, context=None, agent_status=None, persona="defau
         except Exception:
             pass  # Ignore if memory API is not running
 
-        from mvp.llm_router import route_llm_call
-        from mvp.prompt_utils import build_prompt
+        from src.mvp.llm_router import route_llm_call
+        from src.mvp.prompt_utils import build_prompt
         persona_descriptions = {
             "default": "Analyze requirements, generate a code plan, and provide a code snippet or actionable steps.",
             "architect": "Design scalable, maintainable solutions and explain tradeoffs.",
@@ -97,7 +97,7 @@ def dev_team_respond(user_input, context=None, agent_status=None, persona="defau
             response = "".join(list(response))
         # Patch: If backend returns structured error, escalate to orchestrator for error handling
         if isinstance(response, dict) and "error" in response:
-            from mvp.orchestrator import orchestrator_respond
+            from src.mvp.orchestrator import orchestrator_respond
             error_context = {
                 "user_input": user_input,
                 "context": context,
@@ -18,10 +18,18 @@ TODO:
 
 from src.db.logger import log_action, log_message, log_gotcha
 
+PERSONA_PROMPTS = {
+    "default": "You are the VERN Insight Agent. Generate actionable insights and synthesize information.",
+    "analyst": "You are an analyst. Detect trends and provide recommendations.",
+    "synthesizer": "You are a synthesizer. Combine information from multiple sources.",
+    "advisor": "You are an advisor. Suggest next actions and connect to plugins."
+}
+
 def insight_respond(user_input, context=None, agent_status=None, persona="default", user_id="default_user", memory=None, workflow_steps=None):
     """
     Handles insight queries with persona/context adaptation, agent memory, plugin integration, and error handling.
-    Supports multi-step workflows and advanced capabilities.
+    Supports multi-step workflows and advanced capabilities. Each workflow step is answered by the LLM
+    (via the router); the steps are sent as one concurrent batch.
     """
     agent_id = "insight"
     try:
@@ -39,29 +47,33 @@ def insight_respond(user_input, context=None, agent_status=None, persona="defaul
         results = []
         from src.mvp.plugin_registry import get_all_mcp_tools
         plugins = get_all_mcp_tools()
-        persona_prompt = {
-            "default": "You are the VERN Insight Agent. Generate actionable insights and synthesize information.",
-            "analyst": "You are an analyst. Detect trends and provide recommendations.",
-            "synthesizer": "You are a synthesizer. Combine information from multiple sources.",
-            "advisor": "You are an advisor. Suggest next actions and connect to plugins."
-        }
-        for step in steps:
-            prompt = (
-                persona_prompt.get(persona, persona_prompt["default"]) + f"\nStep: {step}\n"
-                f"Query: {user_input}\n"
-                f"Context: {context}\n"
-                f"Agent Status: {agent_status}\n"
-                f"Persona: {persona}\n"
-                f"Memory: {memory}\n"
-            )
+        from src.mvp.llm_router import get_llm_backend, route_llm_batch
+        from src.mvp.prompt_utils import assemble_prompt
+        system = PERSONA_PROMPTS.get(persona, PERSONA_PROMPTS["default"])
+        model = get_llm_backend(agent_id)[1]
+        prompts = [
+            assemble_prompt({
+                "step": step,
+                "query": user_input,
+                "context": context,
+                "status": agent_status,
+                "persona": persona,
+                "memory": memory,
+            }, model=model)
+            for step in steps
+        ]
+        # Steps are independent: one concurrent batch instead of a call per step
+        responses = route_llm_batch(prompts, system=system, agent_name=agent_id)
+        for step, prompt, llm_response in zip(steps, prompts, responses):
             # Plugin integration (simulate analytics/synthesis plugin usage)
             plugin_result = None
             for plugin in plugins:
                 if "analytics" in plugin or "synth" in plugin or "trend" in plugin:
                     plugin_result = f"Plugin '{plugin}' applied for step '{step}'."
                     break
-            # Simulate LLM response
-            response = f"[{step}] {prompt}"
+            if isinstance(llm_response, dict):
+                llm_response = f"Error: {llm_response.get('error')}"
+            response = f"[{step}] {llm_response}"
             if plugin_result:
                 response += f"\n{plugin_result}"
             results.append(response)
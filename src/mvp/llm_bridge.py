@@ -0,0 +1,133 @@
+"""
+VERN Sync/Async LLM Bridge
+--------------------------
+One long-lived event loop on a daemon thread that synchronous callers (route_llm_call and the
+function-based agents) submit work to. Sync code thereby shares the async connection pool,
+single-flight table and scheduler with the rest of the router, with no nested or throwaway
+event loops.
+
+- run(coro): block until the coroutine finishes on the bridge loop; return its result.
+- submit(coro): fire-and-forget; returns a concurrent.futures.Future.
+- iterate(agen): sync iterator over an async generator; closing it early cancels the producer.
+- Context variables of the calling thread (e.g. llm_priority) are visible to the submitted work.
+- Fork-safe: a child process lazily starts its own loop thread.
+
+Calling into the bridge from its own loop thread raises RuntimeError (it would deadlock).
+"""
+
+import asyncio
+import concurrent.futures
+import os
+import queue
+import threading
+from typing import Any, AsyncIterator, Awaitable, Iterator, Optional
+
+_DONE = object()
+
+
+class _Raise:
+    __slots__ = ("error",)
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class LoopThread:
+    def __init__(self, name: str = "vern-llm-loop"):
+        self.name = name
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and self._pid == os.getpid()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """
+        The bridge loop, started on first use (and again after fork or stop()).
+        """
+        if self.running:
+            return self._loop
+        with self._lock:
+            if not self.running:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+                thread = threading.Thread(target=self._serve, args=(loop, ready), name=self.name, daemon=True)
+                thread.start()
+                ready.wait()
+                self._loop, self._thread, self._pid = loop, thread, os.getpid()
+        return self._loop
+
+    @staticmethod
+    def _serve(loop: asyncio.AbstractEventLoop, ready: threading.Event):
+        asyncio.set_event_loop(loop)
+        loop.call_soon(ready.set)
+        try:
+            loop.run_forever()
+            # stop(): cancel whatever is still running and let it unwind
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            loop.close()
+
+    def _check_caller(self, work: Any):
+        if self._thread is threading.current_thread():
+            if asyncio.iscoroutine(work):
+                work.close()  # never scheduled: avoid a "never awaited" warning
+            raise RuntimeError("Blocking LLM bridge call from the bridge loop itself; await the async API instead")
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        self._check_caller(coro)
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            # Timeout or interrupt in the caller: do not leave the work running
+            future.cancel()
+            raise
+
+    def submit(self, coro: Awaitable[Any]) -> "concurrent.futures.Future":
+        self._check_caller(coro)
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def iterate(self, agen: AsyncIterator[Any]) -> Iterator[Any]:
+        self._check_caller(agen)
+        items: "queue.Queue[Any]" = queue.Queue()
+
+        async def pump():
+            try:
+                async for item in agen:
+                    items.put(item)
+            except Exception as e:
+                items.put(_Raise(e))
+            finally:
+                items.put(_DONE)
+                aclose = getattr(agen, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+
+        future = asyncio.run_coroutine_threadsafe(pump(), self.loop)
+        try:
+            while True:
+                item = items.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, _Raise):
+                    raise item.error
+                yield item
+        finally:
+            future.cancel()
+
+    def stop(self, timeout: float = 5.0):
+        with self._lock:
+            if not self.running:
+                return
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout)
+            self._loop, self._thread, self._pid = None, None, None
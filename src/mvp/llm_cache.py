@@ -0,0 +1,278 @@
+"""
+VERN LLM Response Cache
+-----------------------
+Sits in front of route_llm_call_async (src/mvp/llm_router.py).
+
+- Exact level: key = sha256 of provider/model/prompt/options; in-memory LRU with TTL.
+- Persistent level: optional SQLite table `llm_cache` (same DB as the rest of VERN), consulted
+  on an in-memory miss and warmed back into memory on hit. aget()/aput() are the event-loop
+  variants: they run the SQLite reads/writes in a worker thread.
+- Semantic level (optional, off by default): reuses an answer whose prompt embedding has cosine
+  similarity >= threshold with a cached prompt for the same provider/model/options. The default
+  embedder is a bag-of-words vector; pass `embedder=` to plug in a real one.
+- Per-agent opt-out via config, per-call opt-out via cache=False.
+
+Configured by the `cache:` section of config/agent_backends.yaml; LLM_CACHE_ENABLED=0 disables it.
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from src.db.connection import ensure_schema
+
+try:
+    from vern_backend.app.db_path import get_sqlite_path
+    DB_PATH = get_sqlite_path()
+except Exception:
+    DB_PATH = os.environ.get("SQLITE_DB_PATH", "/app/data/vern.sqlite")
+
+CACHE_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+  key TEXT PRIMARY KEY,
+  provider TEXT,
+  model TEXT,
+  response TEXT NOT NULL,
+  created_at REAL NOT NULL,
+  expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_expires ON llm_cache(expires_at);
+"""
+
+Vector = Dict[str, float]
+
+
+def bag_of_words(text: str) -> Vector:
+    counts = Counter(re.findall(r"\w+", text.lower()))
+    norm = math.sqrt(sum(c * c for c in counts.values())) or 1.0
+    return {tok: c / norm for tok, c in counts.items()}
+
+
+def cosine(a: Vector, b: Vector) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(k, 0.0) for k, v in a.items())
+
+
+class _Entry:
+    __slots__ = ("response", "expires_at", "scope", "vector")
+
+    def __init__(self, response: str, expires_at: float, scope: str, vector: Optional[Vector]):
+        self.response = response
+        self.expires_at = expires_at
+        self.scope = scope
+        self.vector = vector
+
+
+class LLMCache:
+    """
+    Thread-safe response cache. get()/put() take the same (provider, model, prompt, options).
+    """
+    def __init__(self, enabled: bool = True, ttl_seconds: float = 3600, max_entries: int = 1024,
+                 persist: bool = True, db_path: str = DB_PATH, semantic: bool = False,
+                 semantic_threshold: float = 0.95, opt_out_agents: Iterable[str] = (),
+                 embedder: Callable[[str], Vector] = bag_of_words):
+        self.enabled = enabled
+        self.ttl = float(ttl_seconds)
+        self.max_entries = max(1, int(max_entries))
+        self.persist = persist
+        self.db_path = db_path
+        self.semantic = semantic
+        self.semantic_threshold = float(semantic_threshold)
+        self.opt_out_agents = set(opt_out_agents or ())
+        self.embedder = embedder
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = Counter()
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "LLMCache":
+        config = config or {}
+        enabled = bool(config.get("enabled", True)) and os.environ.get("LLM_CACHE_ENABLED", "1") == "1"
+        return cls(
+            enabled=enabled,
+            ttl_seconds=config.get("ttl_seconds", 3600),
+            max_entries=config.get("max_entries", 1024),
+            persist=bool(config.get("persist", True)),
+            semantic=bool(config.get("semantic", False)),
+            semantic_threshold=config.get("semantic_threshold", 0.95),
+            opt_out_agents=config.get("opt_out_agents") or (),
+        )
+
+    # --- Keys ---
+
+    @staticmethod
+    def scope_key(provider: str, model: str, options: Optional[Dict[str, Any]] = None) -> str:
+        return json.dumps([provider, model, options or {}], sort_keys=True, default=str)
+
+    @classmethod
+    def key(cls, provider: str, model: str, prompt: str, options: Optional[Dict[str, Any]] = None) -> str:
+        raw = cls.scope_key(provider, model, options) + "\x00" + prompt
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def applies_to(self, agent_name: Optional[str], requested: bool = True) -> bool:
+        return self.enabled and requested and agent_name not in self.opt_out_agents
+
+    # --- Lookup / store ---
+
+    def get(self, provider: str, model: str, prompt: str, options: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        key = self.key(provider, model, prompt, options)
+        now = time.time()
+        response = self._memory_hit(key, now)
+        if response is not None:
+            return response
+        return self._lookup_miss(key, provider, model, prompt, options, now)
+
+    async def aget(self, provider: str, model: str, prompt: str, options: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """
+        get() for async callers: an in-memory hit is answered inline, the SQLite tier is read in a thread.
+        """
+        key = self.key(provider, model, prompt, options)
+        now = time.time()
+        response = self._memory_hit(key, now)
+        if response is not None:
+            return response
+        if self.persist:
+            return await asyncio.to_thread(self._lookup_miss, key, provider, model, prompt, options, now)
+        return self._lookup_miss(key, provider, model, prompt, options, now)
+
+    def put(self, provider: str, model: str, prompt: str, response: str, options: Optional[Dict[str, Any]] = None):
+        key, now = self._store_memory(provider, model, prompt, response, options)
+        if self.persist:
+            self._persist(key, provider, model, response, now)
+
+    async def aput(self, provider: str, model: str, prompt: str, response: str, options: Optional[Dict[str, Any]] = None):
+        """
+        put() for async callers: the memory tier is filled inline, the SQLite write runs in a thread.
+        """
+        key, now = self._store_memory(provider, model, prompt, response, options)
+        if self.persist:
+            await asyncio.to_thread(self._persist, key, provider, model, response, now)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.persist:
+            with self._connect() as con:
+                con.execute("DELETE FROM llm_cache")
+
+    def purge_expired(self) -> int:
+        """
+        Drop expired rows from the persistent tier. Returns rows deleted.
+        """
+        if not self.persist:
+            return 0
+        with self._connect() as con:
+            return con.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),)).rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            size = len(self._entries)
+        hits = sum(v for k, v in stats.items() if k.startswith("hits_"))
+        lookups = hits + stats.get("misses", 0)
+        return {
+            "enabled": self.enabled,
+            "semantic": self.semantic,
+            "persist": self.persist,
+            "entries": size,
+            "max_entries": self.max_entries,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            **{k: stats.get(k, 0) for k in ("hits_exact", "hits_persistent", "hits_semantic", "misses",
+                                              "stores", "evictions", "expired", "persist_errors")},
+        }
+
+    # --- Internals ---
+
+    def _connect(self):
+        return ensure_schema(self.db_path, "llm_cache", CACHE_SCHEMA_SQL)
+
+    def _memory_hit(self, key: str, now: float) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at > now:
+                self._entries.move_to_end(key)
+                self._stats["hits_exact"] += 1
+                return entry.response
+            del self._entries[key]
+            self._stats["expired"] += 1
+        return None
+
+    def _lookup_miss(self, key: str, provider: str, model: str, prompt: str,
+                     options: Optional[Dict[str, Any]], now: float) -> Optional[str]:
+        response = self._load(key, now) if self.persist else None
+        if response is not None:
+            self._remember(key, response, now + self.ttl, self.scope_key(provider, model, options), prompt)
+            self._stats["hits_persistent"] += 1
+            return response
+        if self.semantic:
+            response = self._semantic_lookup(self.scope_key(provider, model, options), prompt, now)
+            if response is not None:
+                self._stats["hits_semantic"] += 1
+                return response
+        self._stats["misses"] += 1
+        return None
+
+    def _store_memory(self, provider: str, model: str, prompt: str, response: str,
+                      options: Optional[Dict[str, Any]]) -> Tuple[str, float]:
+        key = self.key(provider, model, prompt, options)
+        now = time.time()
+        self._remember(key, response, now + self.ttl, self.scope_key(provider, model, options), prompt)
+        self._stats["stores"] += 1
+        return key, now
+
+    def _persist(self, key: str, provider: str, model: str, response: str, now: float):
+        try:
+            with self._connect() as con:
+                con.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, provider, model, response, created_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, provider, model, response, now, now + self.ttl),
+                )
+        except Exception as e:
+            self._stats["persist_errors"] += 1
+            print(f"[llm_cache][WARN] Failed to persist cache entry: {e}")
+
+    def _load(self, key: str, now: float) -> Optional[str]:
+        try:
+            row = self._connect().execute(
+                "SELECT response FROM llm_cache WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+        except Exception as e:
+            self._stats["persist_errors"] += 1
+            print(f"[llm_cache][WARN] Persistent cache lookup failed: {e}")
+            return None
+        return row[0] if row else None
+
+    def _remember(self, key: str, response: str, expires_at: float, scope: str, prompt: str):
+        vector = self.embedder(prompt) if self.semantic else None
+        with self._lock:
+            self._entries[key] = _Entry(response, expires_at, scope, vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def _semantic_lookup(self, scope: str, prompt: str, now: float) -> Optional[str]:
+        query = self.embedder(prompt)
+        best: Tuple[float, Optional[str]] = (self.semantic_threshold, None)
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if entry.scope != scope or entry.vector is None or entry.expires_at <= now:
+                    continue
+                score = cosine(query, entry.vector)
+                if score >= best[0]:
+                    best = (score, key)
+            if best[1] is None:
+                return None
+            self._entries.move_to_end(best[1])
+            return self._entries[best[1]].response
@@ -0,0 +1,259 @@
+"""
+VERN LLM Backend Pools
+----------------------
+Load balancing and failover behind the backend keys of config/agent_backends.yaml
+(used by src/mvp/llm_router.py). A backend may list several endpoints (Ollama hosts/ports)
+and the backends to fall back to when none of them is usable:
+
+  ollama-qwen3:0.6b:
+    provider: ollama
+    model: qwen3:0.6b
+    endpoints: [http://localhost:11434, http://localhost:11435]
+    strategy: least_outstanding   # or: latency
+    fallback: [ollama-phi]
+
+- Selection: fewest outstanding requests (ties broken by latency), or latency-weighted
+  ((outstanding + 1) * EWMA time to first token).
+- Circuit breaker per endpoint: `failure_threshold` consecutive failures open it for
+  `cooldown_seconds`; then a single trial request is let through (half-open) and its
+  outcome closes or re-opens the circuit.
+- Active health checks (ollama_health_check.check_ollama_endpoint) run on a daemon thread
+  every `health_interval_seconds` and open/close circuits ahead of real traffic.
+
+Pool-wide settings live in the `pools:` section; a backend without `endpoints` uses OLLAMA_HOST.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from src.mvp.ollama_client import OLLAMA_HOST
+from src.mvp.ollama_health_check import check_ollama_endpoint
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+STRATEGIES = ("least_outstanding", "latency")
+LATENCY_ALPHA = 0.3  # weight of the newest sample in the latency EWMA
+
+
+class Endpoint:
+    __slots__ = ("url", "outstanding", "latency", "failures", "state", "opened_at", "trial",
+                 "requests", "errors", "last_check")
+
+    def __init__(self, url: Optional[str]):
+        self.url = url
+        self.outstanding = 0
+        self.latency: Optional[float] = None
+        self.failures = 0
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.trial = False
+        self.requests = 0
+        self.errors = 0
+        self.last_check: Optional[bool] = None
+
+    def usable(self, now: float, cooldown: float) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and now - self.opened_at < cooldown:
+            return False
+        return not self.trial
+
+    def score(self, strategy: str):
+        latency = self.latency or 0.0
+        if strategy == "latency":
+            return ((self.outstanding + 1) * latency, self.outstanding)
+        return (self.outstanding, latency)
+
+    def trip(self, now: float):
+        self.state = OPEN
+        self.opened_at = now
+        self.trial = False
+
+    def reset(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.trial = False
+
+
+class BackendPool:
+    """
+    The endpoints behind one backend key. acquire() picks an endpoint and counts it as busy;
+    every acquire() must be paired with release(endpoint, ok, latency).
+    """
+    def __init__(self, key: str, provider: str, model: str, endpoints: List[Optional[str]],
+                 strategy: str = "least_outstanding", fallback: Optional[List[str]] = None,
+                 failure_threshold: int = 3, cooldown_seconds: float = 30.0):
+        self.key = key
+        self.provider = provider
+        self.model = model
+        self.endpoints = [Endpoint(url) for url in (endpoints or [None])]
+        self.strategy = strategy if strategy in STRATEGIES else "least_outstanding"
+        self.fallback = list(fallback or [])
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.cooldown = float(cooldown_seconds)
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            return any(ep.usable(now, self.cooldown) for ep in self.endpoints)
+
+    def acquire(self, exclude=()) -> Optional[Endpoint]:
+        """
+        Best usable endpoint, skipping those in `exclude` (e.g. already tried for this request).
+        """
+        now = time.monotonic()
+        with self._lock:
+            candidates = [ep for ep in self.endpoints if ep not in exclude and ep.usable(now, self.cooldown)]
+            if not candidates:
+                return None
+            endpoint = min(candidates, key=lambda ep: ep.score(self.strategy))
+            if endpoint.state != CLOSED:
+                # Cooldown over: this request is the half-open trial
+                endpoint.state = HALF_OPEN
+                endpoint.trial = True
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+            return endpoint
+
+    def release(self, endpoint: Endpoint, ok: Optional[bool], latency: Optional[float] = None):
+        """
+        ok=None means no verdict (e.g. the caller went away): only the busy count is returned.
+        """
+        with self._lock:
+            endpoint.outstanding -= 1
+            if ok is None:
+                endpoint.trial = False
+                return
+            if ok:
+                endpoint.reset()
+                if latency is not None:
+                    endpoint.latency = latency if endpoint.latency is None else (
+                        LATENCY_ALPHA * latency + (1 - LATENCY_ALPHA) * endpoint.latency)
+                return
+            endpoint.errors += 1
+            endpoint.failures += 1
+            if endpoint.state == HALF_OPEN or endpoint.failures >= self.failure_threshold:
+                endpoint.trip(time.monotonic())
+
+    def record_health(self, endpoint: Endpoint, healthy: bool):
+        with self._lock:
+            endpoint.last_check = healthy
+            if healthy and endpoint.state == OPEN:
+                endpoint.reset()
+            elif not healthy and endpoint.state == CLOSED:
+                endpoint.trip(time.monotonic())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "provider": self.provider,
+                "model": self.model,
+                "strategy": self.strategy,
+                "fallback": list(self.fallback),
+                "endpoints": [{
+                    "url": ep.url or "default",
+                    "state": ep.state,
+                    "outstanding": ep.outstanding,
+                    "latency_ms": round(ep.latency * 1000, 1) if ep.latency is not None else None,
+                    "requests": ep.requests,
+                    "errors": ep.errors,
+                    "healthy": ep.last_check,
+                } for ep in self.endpoints],
+            }
+
+
+class LLMPools:
+    """
+    All backend pools, the failover chain between them and the background health checker.
+    """
+    def __init__(self, pools: Dict[str, BackendPool], fallback: Optional[List[str]] = None,
+                 health_interval: float = 15.0, checker: Callable[..., bool] = check_ollama_endpoint):
+        self.pools = pools
+        self.fallback = list(fallback or [])
+        self.health_interval = float(health_interval)
+        self.checker = checker
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(cls, llm_config: Dict[str, Any], **kwargs) -> "LLMPools":
+        conf = llm_config.get("pools") or {}
+        pools = {}
+        for key, backend in (llm_config.get("backends") or {}).items():
+            if not isinstance(backend, dict):
+                continue
+            provider = backend.get("provider", "ollama")
+            endpoints = backend.get("endpoints") or [OLLAMA_HOST if provider == "ollama" else None]
+            pools[key] = BackendPool(
+                key, provider, backend.get("model", "qwen3:0.6b"), endpoints,
+                strategy=backend.get("strategy", conf.get("strategy", "least_outstanding")),
+                fallback=backend.get("fallback"),
+                failure_threshold=conf.get("failure_threshold", 3),
+                cooldown_seconds=conf.get("cooldown_seconds", 30),
+            )
+        return cls(pools, fallback=conf.get("fallback"), health_interval=conf.get("health_interval_seconds", 15), **kwargs)
+
+    def get(self, key: str) -> Optional[BackendPool]:
+        return self.pools.get(key)
+
+    def chain(self, key: str) -> List[str]:
+        """
+        Backends to try for `key`, in order: itself, its own fallbacks, then the global ones.
+        An unknown key has no chain (no silent rerouting of misconfigured agents).
+        """
+        if key not in self.pools:
+            return []
+        chain = []
+        for k in [key, *self.pools[key].fallback, *self.fallback]:
+            if k in self.pools and k not in chain:
+                chain.append(k)
+        return chain
+
+    def select(self, key: str) -> Optional[str]:
+        """
+        First backend in the chain with a usable endpoint (the primary if all are down).
+        """
+        chain = self.chain(key)
+        for k in chain:
+            if self.pools[k].available():
+                return k
+        return chain[0] if chain else None
+
+    # --- Health checks ---
+
+    def check_health(self) -> int:
+        """
+        Probe every Ollama endpoint once. Returns the number of healthy endpoints.
+        """
+        healthy = 0
+        for pool in self.pools.values():
+            if pool.provider != "ollama":
+                continue
+            for endpoint in pool.endpoints:
+                ok = bool(self.checker(endpoint.url or OLLAMA_HOST, pool.model))
+                pool.record_health(endpoint, ok)
+                healthy += ok
+        return healthy
+
+    def start(self):
+        if self.health_interval <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="vern-llm-health", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.wait(self.health_interval):
+            try:
+                self.check_health()
+            except Exception as e:
+                print(f"[llm_pool][WARN] Health check failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {key: pool.stats() for key, pool in self.pools.items()}
@@ -0,0 +1,94 @@
+"""
+VERN Model Residency & Prompt-Prefix Warmup
+-------------------------------------------
+Keeps hot models loaded in Ollama and their agents' persona prefixes warm.
+
+- keep_alive: every Ollama request carries the backend's `keep_alive` (or the `residency:`
+  default), so models stay resident between calls instead of being unloaded after 5 minutes.
+- Stable prefixes: agents send their persona as the `system` field rather than splicing it into
+  the prompt. The templated prompt then starts with the same tokens on every call, and Ollama
+  reuses the evaluated prefix (KV cache) of the resident model instead of re-reading it.
+- Warmup: at startup, load each configured model (empty prompt) on every endpoint of its pool and
+  prime the default persona of each agent in `residency.warmup_agents` with a one-token generation.
+
+Ollama's `context` token arrays are not replayed: they encode a whole previous turn (prompt and
+answer), so reusing one for a persona would leak that turn into unrelated requests.
+"""
+
+import importlib
+import time
+from typing import Any, Dict, List, Optional
+
+from src.mvp.ollama_client import OLLAMA_HOST, agenerate
+
+DEFAULT_KEEP_ALIVE = "30m"
+PRIME_PROMPT = "Ready?"
+
+last_warmup: Dict[str, Any] = {}
+
+
+def keep_alive_for(llm_config: Dict[str, Any], backend_key: str) -> Optional[Any]:
+    backend = (llm_config.get("backends") or {}).get(backend_key) or {}
+    if "keep_alive" in backend:
+        return backend["keep_alive"]
+    return (llm_config.get("residency") or {}).get("keep_alive", DEFAULT_KEEP_ALIVE)
+
+
+def persona_prefix(module_path: str, persona: str = "default") -> Optional[str]:
+    """
+    The persona system prompt an agent module declares in PERSONA_PROMPTS (None if unavailable).
+    """
+    try:
+        prompts = importlib.import_module(module_path).PERSONA_PROMPTS
+    except Exception as e:
+        print(f"[llm_residency][WARN] No persona prompts in {module_path}: {e}")
+        return None
+    return prompts.get(persona) or prompts.get("default")
+
+
+def warmup_plan(llm_config: Dict[str, Any]) -> Dict[str, List[str]]:
+    """
+    backend key -> persona prefixes to prime (the default backend is always loaded).
+    """
+    conf = llm_config.get("residency") or {}
+    default = llm_config.get("default", "ollama-qwen3:0.6b")
+    agents = llm_config.get("agents") or {}
+    plan: Dict[str, List[str]] = {default: []}
+    for key in conf.get("warmup_backends") or []:
+        plan.setdefault(key, [])
+    for agent, module_path in (conf.get("warmup_agents") or {}).items():
+        prefix = persona_prefix(module_path)
+        prefixes = plan.setdefault(agents.get(agent, default), [])
+        if prefix and prefix not in prefixes:
+            prefixes.append(prefix)
+    return plan
+
+
+async def warmup(llm_config: Dict[str, Any], pools) -> Dict[str, Any]:
+    """
+    Load every planned Ollama model on each endpoint of its pool and prime its persona prefixes.
+    Returns (and keeps in `last_warmup`) a per-endpoint summary; failures are reported, not raised.
+    """
+    results: Dict[str, Any] = {}
+    for key, prefixes in warmup_plan(llm_config).items():
+        pool = pools.get(key)
+        if pool is None or pool.provider != "ollama":
+            continue
+        keep_alive = keep_alive_for(llm_config, key)
+        for endpoint in pool.endpoints:
+            host = endpoint.url or OLLAMA_HOST
+            started = time.monotonic()
+            try:
+                # An empty prompt only loads the model
+                await agenerate("", pool.model, host=host, keep_alive=keep_alive)
+                for system in prefixes:
+                    await agenerate(PRIME_PROMPT, pool.model, host=host, keep_alive=keep_alive, system=system,
+                                    options={"num_predict": 1})
+                results[f"{key}@{host}"] = {"ok": True, "primed": len(prefixes),
+                                            "ms": round((time.monotonic() - started) * 1000, 1)}
+            except Exception as e:
+                results[f"{key}@{host}"] = {"ok": False, "error": str(e)}
+                print(f"[llm_residency][WARN] Warmup of {key} at {host} failed: {e}")
+    last_warmup.clear()
+    last_warmup.update({"at": time.time(), "results": results})
+    return results
@@ -4,6 +4,14 @@ VERN LLM Router (Config-Driven, Robust Error Handling)
 Routes agent LLM calls to the selected provider/model based on config/agent_backends.yaml.
 Supports modular, extensible backend selection for future GUI/provider/model switching.
 Now includes robust error handling and streaming support.
+Ollama calls are native async (shared keep-alive pool, token-by-token streaming).
+Responses are cached (exact, optional semantic, SQLite-backed) by src/mvp/llm_cache.py.
+Concurrent identical requests share one generation (src/mvp/llm_singleflight.py).
+Generations are admitted by a priority scheduler with per-agent/backend budgets (src/mvp/llm_scheduler.py).
+Backends may be pools of endpoints with load balancing, circuit breakers and failover (src/mvp/llm_pool.py).
+Sync callers go through one background event loop (src/mvp/llm_bridge.py).
+Models are kept resident (keep_alive) and warmed at startup (src/mvp/llm_residency.py).
+Independent prompts fan out concurrently with route_llm_batch / route_llm_batch_async.
 """
 
 import yaml
@@ -16,87 +24,212 @@ def load_llm_config():
 
 LLM_CONFIG = load_llm_config()
 
-def get_llm_backend(agent_name=None):
+from src.mvp.llm_bridge import LoopThread
+from src.mvp.llm_cache import LLMCache
+from src.mvp.llm_pool import LLMPools
+from src.mvp.llm_residency import keep_alive_for
+from src.mvp.llm_scheduler import PRIORITIES, LLMScheduler, llm_priority
+from src.mvp.llm_singleflight import SingleFlight
+llm_cache = LLMCache.from_config(LLM_CONFIG.get('cache'))
+llm_flights = SingleFlight()
+llm_scheduler = LLMScheduler.from_config(LLM_CONFIG)
+llm_pools = LLMPools.from_config(LLM_CONFIG)
+llm_bridge = LoopThread()
+
+# Call kwargs that change the generated text (part of the cache key)
+GENERATION_OPTION_KEYS = ("options", "system")
+
+def get_llm_backend_key(agent_name=None):
     if agent_name and 'agents' in LLM_CONFIG and agent_name in LLM_CONFIG['agents']:
-        backend_key = LLM_CONFIG['agents'][agent_name]
-    else:
-        backend_key = LLM_CONFIG.get('default', 'ollama-qwen3:0.6b')
+        return LLM_CONFIG['agents'][agent_name]
+    return LLM_CONFIG.get('default', 'ollama-qwen3:0.6b')
+
+def get_llm_backend(agent_name=None):
+    # Fails over to the next configured backend when every endpoint of the agent's one is down
+    backend_key = llm_pools.select(get_llm_backend_key(agent_name))
     backend = LLM_CONFIG['backends'].get(backend_key)
     if backend is None:
         return None, None
     return backend.get('provider', 'ollama'), backend.get('model', 'qwen3:0.6b')
 
 import asyncio
+import time
+
+def _is_error(chunk):
+    return isinstance(chunk, dict) or (isinstance(chunk, str) and chunk.startswith("[Ollama error"))
+
+async def _dispatch_async(provider, model, prompt, stream, kwargs):
+    if provider == 'ollama':
+        # Native async over the shared connection pool (src/mvp/ollama_client.py)
+        from src.mvp.ollama_llm import call_ollama_async, stream_ollama_async
+        options = {k: kwargs[k] for k in ("timeout", "host", "keep_alive", *GENERATION_OPTION_KEYS) if k in kwargs}
+        if stream:
+            async for token in stream_ollama_async(prompt, model=model, **options):
+                yield token
+        else:
+            yield await call_ollama_async(prompt, model=model, **options)
+    elif provider == 'openai':
+        yield {"error": "OpenAI backend not implemented yet", "code": "OPENAI_NOT_IMPLEMENTED"}
+    else:
+        yield {"error": "No backend configured", "code": "NO_BACKEND_CONFIGURED"}
+
+async def _generate_with_failover(backend_key, agent_name, priority, prompt, stream, kwargs):
+    """
+    Run one generation on the best endpoint of `backend_key`, moving on to its other endpoints
+    and then to its fallback backends while attempts fail before producing any output; each
+    endpoint is tried at most once per call. A failure after output was streamed is passed
+    through (it cannot be retried transparently).
+    """
+    chain = llm_pools.chain(backend_key)
+    if chain:
+        error = {"error": "All configured backends are unavailable", "code": "BACKEND_UNAVAILABLE"}
+    else:
+        error = {"error": "No backend configured", "code": "NO_BACKEND_CONFIGURED"}
+    for key in chain:
+        pool = llm_pools.get(key)
+        if not pool.available():
+            continue
+        # Wait for a slot; cancelled (and dequeued) if every subscriber goes away
+        async with llm_scheduler.slot(key, agent_name, priority):
+            tried = set()
+            while True:
+                endpoint = pool.acquire(exclude=tried)
+                if endpoint is None:
+                    break
+                tried.add(endpoint)
+                ok, latency, sent = None, None, False
+                started = time.monotonic()
+                try:
+                    async for chunk in _dispatch_async(pool.provider, pool.model, prompt, stream, {
+                        "keep_alive": keep_alive_for(LLM_CONFIG, key), **kwargs, "host": endpoint.url}):
+                        if isinstance(chunk, dict):
+                            # Provider-level error (e.g. not implemented): not the endpoint's fault
+                            sent = True
+                            yield chunk
+                            break
+                        if _is_error(chunk):
+                            ok = False
+                            if not sent:
+                                error = chunk
+                                break
+                        elif latency is None:
+                            latency = time.monotonic() - started
+                        sent = True
+                        yield chunk
+                    else:
+                        ok = ok is not False
+                finally:
+                    pool.release(endpoint, ok, latency)
+                if ok or sent:
+                    return
+    yield error
 
 async def route_llm_call_async(prompt, **kwargs):
     """
     Async version: Routes the prompt to the selected LLM backend/model.
     Returns a string or a generator (for streaming).
     Includes robust error handling.
+    Cached answers are served without calling the model (pass cache=False to bypass);
+    on a streamed cache hit the whole answer arrives as one chunk.
+    Identical concurrent requests attach to the in-flight generation and receive its chunks.
+    priority= ('interactive' | 'workflow' | 'background') overrides the scheduler class.
     """
     provider, model = get_llm_backend(kwargs.get("agent_name"))
     stream = kwargs.get("stream", False)
     # Ensure model is always a string
     if not model:
         model = "qwen3:0.6b"
+    use_cache = llm_cache.applies_to(kwargs.get("agent_name"), kwargs.get("cache", True))
+    cache_opts = {k: kwargs[k] for k in GENERATION_OPTION_KEYS if kwargs.get(k) is not None}
     try:
-        if provider == 'ollama':
-            from mvp.ollama_llm import call_ollama
-            if asyncio.iscoroutinefunction(call_ollama):
-                response = await call_ollama(prompt, model=model, **kwargs)
-            else:
-                loop = asyncio.get_event_loop()
-                # Only pass prompt and model as positional args, rest as kwargs
-                response = await loop.run_in_executor(None, lambda: call_ollama(prompt, model=model, **kwargs))
-            if stream and hasattr(response, "__iter__") and not isinstance(response, str):
-                for token in response:
-                    yield token
-            else:
-                # If not streaming, join tokens if response is iterable, else return string
-                if hasattr(response, "__iter__") and not isinstance(response, str):
-                    result = "".join(str(token) for token in response)
-                    yield result
-                else:
-                    yield response
-        elif provider == 'openai':
-            yield {"error": "OpenAI backend not implemented yet", "code": "OPENAI_NOT_IMPLEMENTED"}
+        if use_cache:
+            cached = await llm_cache.aget(provider, model, prompt, cache_opts)
+            if cached is not None:
+                yield cached
+                return
+
+        async def store(chunks):
+            text = "".join(str(c) for c in chunks)
+            if use_cache and text and not any(_is_error(c) for c in chunks):
+                await llm_cache.aput(provider, model, prompt, text, cache_opts)
+
+        agent_name = kwargs.get("agent_name")
+        backend_key = get_llm_backend_key(agent_name)
+        # Resolve now: the producer task below may not see this request's context
+        priority = PRIORITIES[llm_scheduler.resolve_priority(kwargs.get("priority"), agent_name)]
+
+        def generate():
+            return _generate_with_failover(backend_key, agent_name, priority, prompt, stream, kwargs)
+
+        key = LLMCache.key(provider, model, prompt, cache_opts)
+        flight = llm_flights.run(key, generate, store)
+        if stream:
+            async for chunk in flight:
+                yield chunk
         else:
-            yield {"error": "No backend configured", "code": "NO_BACKEND_CONFIGURED"}
+            # A follower may have joined a streaming flight: hand back one string
+            chunks = [chunk async for chunk in flight]
+            errors = [c for c in chunks if isinstance(c, dict)]
+            yield errors[0] if errors else "".join(str(c) for c in chunks)
     except Exception as e:
         yield {"error": str(e), "code": "LLM_ERROR"}
 
+async def _first(agen):
+    try:
+        async for item in agen:
+            return item
+        return ""
+    finally:
+        await agen.aclose()
+
 def route_llm_call(prompt, **kwargs):
     """
-    Sync wrapper for backward compatibility.
-    Returns a string if stream=False, else returns an iterator.
+    Sync wrapper for backward compatibility (function-based agents, CLI).
+    Runs route_llm_call_async on the shared background loop (src/mvp/llm_bridge.py), so sync callers
+    use the same connection pool, cache, single-flight table and scheduler as async ones.
+    Returns the full string (or an error dict) if stream=False, else a sync iterator of chunks;
+    closing the iterator early cancels the generation.
+    Blocks the calling thread: async code should await route_llm_call_async instead.
     """
-    stream = kwargs.get("stream", False)
-    coro = route_llm_call_async(prompt, **kwargs)
+    if kwargs.get("stream", False):
+        return llm_bridge.iterate(route_llm_call_async(prompt, **kwargs))
     try:
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            # If already in an event loop, just return the coroutine (caller must await)
-            return coro
-        else:
-            if stream:
-                # Consume async generator and yield tokens synchronously
-                async def consume():
-                    result = []
-                    async for token in coro:
-                        result.append(token)
-                    return result
-                # Await the coroutine to get the async generator, then iterate
-                async_gen = loop.run_until_complete(coro)
-                for token in async_gen:
-                    yield token
-            else:
-                # Await the coroutine and concatenate all results into a string
-                async def get_full_string():
-                    gen = await coro
-                    result = ""
-                    for chunk in gen:
-                        result += str(chunk)
-                    return result
-                return loop.run_until_complete(get_full_string())
+        return llm_bridge.run(_first(route_llm_call_async(prompt, **kwargs)))
     except Exception as e:
         return {"error": str(e), "code": "LLM_ERROR"}
+
+async def route_llm_batch_async(prompts, **kwargs):
+    """
+    Run independent prompts concurrently and return their results in input order.
+    Items are prompt strings or dicts of per-item call kwargs ({"prompt": ..., "system": ...}) layered over
+    the shared kwargs. Each item goes through route_llm_call_async (cache, single-flight, failover), so
+    concurrency is bounded by the scheduler's backend/agent budgets rather than by len(prompts).
+    Every result is the response string or an error dict ({"error", "code"}) for that item alone.
+    """
+    async def one(item):
+        call = dict(kwargs)
+        if isinstance(item, dict):
+            call.update(item)
+            prompt = call.pop("prompt", "")
+        else:
+            prompt = item
+        call["stream"] = False
+        try:
+            result = await _first(route_llm_call_async(prompt, **call))
+        except Exception as e:
+            return {"error": str(e), "code": "LLM_ERROR"}
+        if isinstance(result, str) and _is_error(result):
+            return {"error": result, "code": "LLM_ERROR"}
+        return result
+
+    return list(await asyncio.gather(*(one(item) for item in prompts)))
+
+def route_llm_batch(prompts, **kwargs):
+    """
+    Sync counterpart of route_llm_batch_async (runs on the shared LLM bridge loop).
+    """
+    prompts = list(prompts)
+    try:
+        return llm_bridge.run(route_llm_batch_async(prompts, **kwargs))
+    except Exception as e:
+        return [{"error": str(e), "code": "LLM_ERROR"} for _ in prompts]
@@ -0,0 +1,209 @@
+"""
+VERN LLM Request Scheduler
+--------------------------
+Admission control in front of the model backends (used by src/mvp/llm_router.py).
+
+- Priority classes: interactive > workflow > background. Waiting requests age one class up
+  every `aging_seconds`, so background work is delayed but never starved.
+- Concurrency budgets per backend key and per agent (scheduler: section of agent_backends.yaml).
+- Fair queuing: within a class, agents are served round-robin, so one agent flooding the queue
+  does not block the others.
+- Cancellation: a request whose task is cancelled (client disconnect, single-flight with no
+  subscribers left) leaves the queue, or gives its slot back if it was already granted.
+
+The scheduler is thread-safe and loop-agnostic: waiters are resolved on their own event loop.
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Dict, List, Optional
+
+PRIORITIES = ("interactive", "workflow", "background")
+
+_current_priority: contextvars.ContextVar = contextvars.ContextVar("llm_priority", default=None)
+
+
+@contextmanager
+def llm_priority(name: str):
+    """
+    Set the default priority class for LLM calls made in this context (e.g. an API request).
+    """
+    token = _current_priority.set(name)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+class _Waiter:
+    __slots__ = ("loop", "future", "backend", "agent", "priority", "enqueued_at", "granted")
+
+    def __init__(self, backend: str, agent: str, priority: int):
+        self.loop = asyncio.get_running_loop()
+        self.future = self.loop.create_future()
+        self.backend = backend
+        self.agent = agent
+        self.priority = priority
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(True)
+
+
+class LLMScheduler:
+    def __init__(self, backend_limits: Optional[Dict[str, int]] = None, agent_limits: Optional[Dict[str, int]] = None,
+                 default_backend_limit: int = 2, default_agent_limit: int = 2, aging_seconds: float = 30.0,
+                 agent_priority: Optional[Dict[str, str]] = None, default_priority: str = "workflow"):
+        self.backend_limits = dict(backend_limits or {})
+        self.agent_limits = dict(agent_limits or {})
+        self.default_backend_limit = max(1, int(default_backend_limit))
+        self.default_agent_limit = max(1, int(default_agent_limit))
+        self.aging_seconds = max(0.001, float(aging_seconds))
+        self.agent_priority = dict(agent_priority or {})
+        self.default_priority = default_priority if default_priority in PRIORITIES else "workflow"
+        self._lock = threading.Lock()
+        self._running_backend: Counter = Counter()
+        self._running_agent: Counter = Counter()
+        # One queue per class: agent -> FIFO of waiters (OrderedDict order = round-robin order)
+        self._queues: List["OrderedDict[str, deque]"] = [OrderedDict() for _ in PRIORITIES]
+        self._stats: Counter = Counter()
+        self._wait_total = [0.0] * len(PRIORITIES)
+        self._wait_max = [0.0] * len(PRIORITIES)
+
+    @classmethod
+    def from_config(cls, llm_config: Dict[str, Any]) -> "LLMScheduler":
+        conf = llm_config.get("scheduler") or {}
+        backend_limits = dict(conf.get("backend_concurrency") or {})
+        # A backend entry may also carry its own max_concurrent
+        for key, backend in (llm_config.get("backends") or {}).items():
+            if isinstance(backend, dict) and "max_concurrent" in backend:
+                backend_limits.setdefault(key, backend["max_concurrent"])
+        return cls(
+            backend_limits=backend_limits,
+            agent_limits=conf.get("agent_concurrency"),
+            default_backend_limit=conf.get("default_backend_concurrency", 2),
+            default_agent_limit=conf.get("default_agent_concurrency", 2),
+            aging_seconds=conf.get("aging_seconds", 30),
+            agent_priority=conf.get("agent_priority"),
+            default_priority=conf.get("default_priority", "workflow"),
+        )
+
+    # --- Priorities / limits ---
+
+    def resolve_priority(self, priority: Optional[str] = None, agent: Optional[str] = None) -> int:
+        name = priority or _current_priority.get() or self.agent_priority.get(agent or "") or self.default_priority
+        return PRIORITIES.index(name) if name in PRIORITIES else PRIORITIES.index(self.default_priority)
+
+    def _has_capacity(self, backend: str, agent: str) -> bool:
+        return (self._running_backend[backend] < self.backend_limits.get(backend, self.default_backend_limit)
+                and self._running_agent[agent] < self.agent_limits.get(agent, self.default_agent_limit))
+
+    def _take(self, backend: str, agent: str):
+        self._running_backend[backend] += 1
+        self._running_agent[agent] += 1
+
+    # --- Acquire / release ---
+
+    @asynccontextmanager
+    async def slot(self, backend: str, agent: Optional[str] = None, priority: Optional[str] = None):
+        """
+        Hold one generation slot for `backend` on behalf of `agent` for the duration of the block.
+        """
+        agent = agent or "default"
+        cls = self.resolve_priority(priority, agent)
+        waiter = None
+        with self._lock:
+            # Queued waiters are always capacity-blocked (every release re-dispatches), so a
+            # request with free capacity does not overtake anyone it competes with
+            if self._has_capacity(backend, agent):
+                self._take(backend, agent)
+                self._stats["immediate"] += 1
+                self._stats["granted"] += 1
+            else:
+                waiter = _Waiter(backend, agent, cls)
+                self._queues[cls].setdefault(agent, deque()).append(waiter)
+                self._stats["queued"] += 1
+        if waiter is not None:
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                with self._lock:
+                    if waiter.granted:
+                        self._release_locked(backend, agent)
+                    else:
+                        self._discard(waiter)
+                    self._stats["cancelled"] += 1
+                raise
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._release_locked(backend, agent)
+
+    def _discard(self, waiter: _Waiter):
+        queue = self._queues[waiter.priority].get(waiter.agent)
+        if queue is None:
+            return
+        try:
+            queue.remove(waiter)
+        except ValueError:
+            return
+        if not queue:
+            del self._queues[waiter.priority][waiter.agent]
+
+    def _release_locked(self, backend: str, agent: str):
+        self._running_backend[backend] -= 1
+        self._running_agent[agent] -= 1
+        self._dispatch_locked()
+
+    def _dispatch_locked(self):
+        now = time.monotonic()
+        while True:
+            best = None
+            for cls, queues in enumerate(self._queues):
+                for agent, queue in queues.items():
+                    head = queue[0]
+                    if not self._has_capacity(head.backend, agent):
+                        continue
+                    effective = max(0, cls - int((now - head.enqueued_at) / self.aging_seconds))
+                    if best is None or effective < best[0]:
+                        best = (effective, head)
+                    break  # round-robin: first eligible agent per class
+            if best is None:
+                return
+            waiter = best[1]
+            queue = self._queues[waiter.priority][waiter.agent]
+            queue.popleft()
+            # Served agent moves to the back of its class for fairness
+            del self._queues[waiter.priority][waiter.agent]
+            if queue:
+                self._queues[waiter.priority][waiter.agent] = queue
+            self._take(waiter.backend, waiter.agent)
+            waiter.granted = True
+            self._stats["granted"] += 1
+            waited = now - waiter.enqueued_at
+            self._wait_total[waiter.priority] += waited
+            self._wait_max[waiter.priority] = max(self._wait_max[waiter.priority], waited)
+            waiter.loop.call_soon_threadsafe(_resolve, waiter.future)
+
+    # --- Metrics ---
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            depth = {name: sum(len(q) for q in self._queues[i].values()) for i, name in enumerate(PRIORITIES)}
+            counters = dict(self._stats)
+            return {
+                "queue_depth": depth,
+                "running_by_backend": {k: v for k, v in self._running_backend.items() if v},
+                "running_by_agent": {k: v for k, v in self._running_agent.items() if v},
+                "max_wait_ms": {name: round(self._wait_max[i] * 1000, 1) for i, name in enumerate(PRIORITIES)},
+                "total_wait_ms": {name: round(self._wait_total[i] * 1000, 1) for i, name in enumerate(PRIORITIES)},
+                **{k: counters.get(k, 0) for k in ("immediate", "queued", "granted", "cancelled")},
+            }
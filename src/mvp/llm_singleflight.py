@@ -0,0 +1,111 @@
+"""
+VERN LLM Request Coalescing (Single-Flight)
+-------------------------------------------
+Concurrent identical LLM requests (same provider/model/options/prompt) share one generation.
+The first caller starts a producer task; later callers attach to it and receive every chunk
+produced so far followed by the live tail, so streamed tokens fan out to all subscribers.
+
+The producer runs as its own task: one subscriber disconnecting does not cancel the others,
+and the generation is cancelled only when the last subscriber leaves. Flights are tracked per
+event loop (asyncio primitives are loop-bound).
+"""
+
+import asyncio
+import inspect
+import threading
+import weakref
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+
+class _Flight:
+    __slots__ = ("chunks", "done", "changed", "task", "subscribers")
+
+    def __init__(self):
+        self.chunks: List[Any] = []
+        self.done = False
+        self.changed = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.subscribers = 0
+
+    def publish(self, chunk: Any = None, done: bool = False):
+        if not done:
+            self.chunks.append(chunk)
+        self.done = self.done or done
+        # Wake everyone waiting on the current event, then arm a fresh one
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+
+class SingleFlight:
+    """
+    run(key, factory) returns an async iterator over the shared generation for `key`.
+    `factory()` must return an async iterator of chunks; `on_complete(chunks)` (optional, plain or
+    async) runs once in the producer after a successful generation (e.g. to fill the response cache).
+    """
+    def __init__(self):
+        self._flights: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, _Flight]]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.started = 0
+        self.coalesced = 0
+
+    def _table(self) -> Dict[str, _Flight]:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            return self._flights.setdefault(loop, {})
+
+    async def run(self, key: str, factory: Callable[[], AsyncIterator[Any]],
+                  on_complete: Optional[Callable[[List[Any]], Any]] = None) -> AsyncIterator[Any]:
+        table = self._table()
+        flight = table.get(key)
+        if flight is None:
+            flight = table[key] = _Flight()
+            flight.task = asyncio.get_running_loop().create_task(self._produce(table, key, flight, factory, on_complete))
+            self.started += 1
+        else:
+            self.coalesced += 1
+        flight.subscribers += 1
+        try:
+            i = 0
+            while True:
+                if i < len(flight.chunks):
+                    yield flight.chunks[i]
+                    i += 1
+                elif flight.done:
+                    return
+                else:
+                    await flight.changed.wait()
+        finally:
+            flight.subscribers -= 1
+            if flight.subscribers == 0 and not flight.done and flight.task is not None:
+                # Nobody is listening anymore: stop the generation
+                flight.task.cancel()
+                if table.get(key) is flight:
+                    del table[key]
+
+    async def _produce(self, table: Dict[str, _Flight], key: str, flight: _Flight,
+                       factory: Callable[[], AsyncIterator[Any]], on_complete):
+        try:
+            async for chunk in factory():
+                flight.publish(chunk)
+            # Runs before the flight is unregistered so followers find the cached answer
+            if on_complete is not None:
+                try:
+                    result = on_complete(flight.chunks)
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception as e:
+                    print(f"[llm_singleflight][WARN] on_complete failed: {e}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            flight.publish({"error": str(e), "code": "LLM_ERROR"})
+        finally:
+            # New requests after this point start a fresh generation (or hit the cache)
+            if table.get(key) is flight:
+                del table[key]
+            flight.publish(done=True)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            inflight = sum(len(t) for t in self._flights.values())
+        return {"inflight": inflight, "started": self.started, "coalesced": self.coalesced}
@@ -0,0 +1,185 @@
+"""
+Shared HTTP clients for the Ollama provider
+-------------------------------------------
+One keep-alive connection pool per process (sync) and per event loop (async) instead of a
+fresh TCP connection per LLM call. Requests to a host are capped by a per-host semaphore
+(OLLAMA_MAX_CONCURRENCY) on top of the pool limits, and streaming is read line by line
+with httpx's async iterator so the event loop never blocks on model I/O.
+
+Config (env):
+- OLLAMA_HOST (default http://localhost:11434)
+- OLLAMA_MAX_CONNECTIONS / OLLAMA_MAX_KEEPALIVE: pool size / idle connections kept open
+- OLLAMA_MAX_CONCURRENCY: in-flight requests per host
+- OLLAMA_CONNECT_TIMEOUT / OLLAMA_READ_TIMEOUT (seconds)
+"""
+
+import asyncio
+import json
+import os
+import threading
+import weakref
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+
+import httpx
+
+OLLAMA_HOST = os.environ.get("OLLAMA_HOST", "http://localhost:11434").rstrip("/")
+if "://" not in OLLAMA_HOST:
+    OLLAMA_HOST = f"http://{OLLAMA_HOST}"
+MAX_CONNECTIONS = int(os.environ.get("OLLAMA_MAX_CONNECTIONS", "16"))
+MAX_KEEPALIVE = int(os.environ.get("OLLAMA_MAX_KEEPALIVE", "8"))
+MAX_CONCURRENCY = int(os.environ.get("OLLAMA_MAX_CONCURRENCY", "4"))
+CONNECT_TIMEOUT = float(os.environ.get("OLLAMA_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.environ.get("OLLAMA_READ_TIMEOUT", "600"))
+DEBUG_OLLAMA = os.environ.get("DEBUG_OLLAMA", "0") == "1"
+
+
+def _timeout(read: Optional[float] = None) -> httpx.Timeout:
+    return httpx.Timeout(read or READ_TIMEOUT, connect=CONNECT_TIMEOUT)
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_KEEPALIVE)
+
+
+# --- Sync client (thread-safe, shared by the whole process) ---
+
+_sync_lock = threading.Lock()
+_sync_client: Optional[httpx.Client] = None
+_sync_pid: Optional[int] = None
+_sync_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+
+
+def get_sync_client() -> httpx.Client:
+    global _sync_client, _sync_pid
+    # Recreate after fork: pooled sockets must not be shared between processes
+    if _sync_client is not None and _sync_pid == os.getpid():
+        return _sync_client
+    with _sync_lock:
+        if _sync_client is None or _sync_pid != os.getpid():
+            _sync_client = httpx.Client(limits=_limits(), timeout=_timeout())
+            _sync_pid = os.getpid()
+        return _sync_client
+
+
+def _sync_slot(host: str) -> threading.BoundedSemaphore:
+    sem = _sync_semaphores.get(host)
+    if sem is None:
+        with _sync_lock:
+            sem = _sync_semaphores.setdefault(host, threading.BoundedSemaphore(max(1, MAX_CONCURRENCY)))
+    return sem
+
+
+# --- Async clients (one per event loop; httpx async pools are loop-bound) ---
+
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+_async_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+
+
+def get_async_client() -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(limits=_limits(), timeout=_timeout())
+        _async_clients[loop] = client
+    return client
+
+
+def _async_slot(host: str) -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    per_loop = _async_semaphores.setdefault(loop, {})
+    sem = per_loop.get(host)
+    if sem is None:
+        sem = per_loop[host] = asyncio.Semaphore(max(1, MAX_CONCURRENCY))
+    return sem
+
+
+async def aclose_client():
+    """
+    Close the current loop's client (e.g. on application shutdown).
+    """
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def close_sync_client():
+    global _sync_client
+    with _sync_lock:
+        if _sync_client is not None:
+            _sync_client.close()
+            _sync_client = None
+
+
+# --- /api/generate helpers ---
+
+def generate_payload(prompt: str, model: str, stream: bool, **fields: Any) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {"model": model, "prompt": prompt, "stream": stream}
+    payload.update({k: v for k, v in fields.items() if v is not None})
+    return payload
+
+
+def _token(line: str) -> str:
+    if DEBUG_OLLAMA:
+        print("[Ollama DEBUG] Raw line:", line)
+    try:
+        return json.loads(line).get("response", "")
+    except ValueError as e:
+        if DEBUG_OLLAMA:
+            print(f"[Ollama DEBUG] Exception parsing line: {e} | Raw: {line}")
+        return ""
+
+
+def generate(prompt: str, model: str, timeout: Optional[float] = None, host: str = OLLAMA_HOST, **fields: Any) -> Dict[str, Any]:
+    """
+    Blocking, non-streaming /api/generate over the shared pool. Returns Ollama's JSON body.
+    """
+    with _sync_slot(host):
+        resp = get_sync_client().post(f"{host}/api/generate", json=generate_payload(prompt, model, False, **fields),
+                                      timeout=_timeout(timeout))
+        resp.raise_for_status()
+        return resp.json()
+
+
+def stream_generate(prompt: str, model: str, timeout: Optional[float] = None, host: str = OLLAMA_HOST,
+                    **fields: Any) -> Iterator[str]:
+    """
+    Blocking token iterator over the shared pool.
+    """
+    with _sync_slot(host):
+        with get_sync_client().stream("POST", f"{host}/api/generate", json=generate_payload(prompt, model, True, **fields),
+                                      timeout=_timeout(timeout)) as resp:
+            resp.raise_for_status()
+            for line in resp.iter_lines():
+                if line:
+                    token = _token(line)
+                    if token:
+                        yield token
+
+
+async def agenerate(prompt: str, model: str, timeout: Optional[float] = None, host: str = OLLAMA_HOST,
+                    **fields: Any) -> Dict[str, Any]:
+    """
+    Async, non-streaming /api/generate. Returns Ollama's JSON body.
+    """
+    async with _async_slot(host):
+        resp = await get_async_client().post(f"{host}/api/generate", json=generate_payload(prompt, model, False, **fields),
+                                             timeout=_timeout(timeout))
+        resp.raise_for_status()
+        return resp.json()
+
+
+async def astream_generate(prompt: str, model: str, timeout: Optional[float] = None, host: str = OLLAMA_HOST,
+                           **fields: Any) -> AsyncIterator[str]:
+    """
+    Async token iterator: yields each `response` fragment as Ollama emits it.
+    """
+    async with _async_slot(host):
+        async with get_async_client().stream("POST", f"{host}/api/generate",
+                                             json=generate_payload(prompt, model, True, **fields),
+                                             timeout=_timeout(timeout)) as resp:
+            resp.raise_for_status()
+            async for line in resp.aiter_lines():
+                if line:
+                    token = _token(line)
+                    if token:
+                        yield token
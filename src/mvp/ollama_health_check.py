@@ -2,11 +2,15 @@
 Ollama Health Check Script for VERN
 
 Checks if the Ollama service is running and if the configured model is available.
+check_ollama_endpoint() does the same over HTTP for any host (used by the backend pools
+in src/mvp/llm_pool.py).
 """
 
 import subprocess
 import sys
 
+import httpx
+
 OLLAMA_MODEL = "qwen3:0.6b"
 
 def check_ollama_service():
@@ -32,6 +36,21 @@ def check_model_available(model_name):
         print(f"Error checking model: {e}")
         return False
 
+def check_ollama_endpoint(host, model_name=None, timeout=3.0):
+    """
+    Returns True if the Ollama server at `host` answers /api/tags and (if given) serves `model_name`.
+    Silent on failure: meant for periodic background probes.
+    """
+    try:
+        resp = httpx.get(f"{host.rstrip('/')}/api/tags", timeout=timeout)
+        resp.raise_for_status()
+        if model_name is None:
+            return True
+        names = {m.get("name") for m in resp.json().get("models", [])}
+        return model_name in names or f"{model_name}:latest" in names
+    except Exception:
+        return False
+
 if __name__ == "__main__":
     print("Checking Ollama service...")
     if not check_ollama_service():
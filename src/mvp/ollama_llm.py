@@ -3,58 +3,69 @@ Ollama LLM Backend for VERN (Debug Streaming, Toggleable)
 ---------------------------------------------------------
 Calls the local Ollama server for real LLM responses.
 Debug output for every streamed line is now toggleable via DEBUG_OLLAMA environment variable.
+Requests go through the shared keep-alive pools in ollama_client.py; the *_async variants
+are native asyncio (no executor threads).
 """
 
-import requests
-import os
+import httpx
+
+from src.mvp.ollama_client import DEBUG_OLLAMA, OLLAMA_HOST, agenerate, astream_generate, generate, stream_generate
+
+# /api/generate fields callers may pass through (persona `system` prompt, sampling `options`, model residency)
+GENERATE_FIELDS = ("system", "options", "keep_alive")
+
+
+def _fields(kwargs) -> dict:
+    return {k: kwargs[k] for k in GENERATE_FIELDS if kwargs.get(k) is not None}
+
+
+def _error(e: Exception, timeout) -> str:
+    if isinstance(e, httpx.TimeoutException):
+        return f"[Ollama error: Timeout after {timeout}s]"
+    return f"[Ollama error: {e}]"
 
-DEBUG_OLLAMA = os.environ.get("DEBUG_OLLAMA", "0") == "1"
 
 def call_ollama(prompt, model="qwen3:0.6b", timeout=600, stream=False, **kwargs):
     """
     Calls the local Ollama server for a real LLM response.
     Timeout is now configurable (default 600s = 10min).
-    If stream=True, returns tokens as they arrive (generator).
+    If stream=True, returns tokens as they arrive (generator); otherwise returns the full string.
     Prints every line received for debugging if DEBUG_OLLAMA=1.
     """
-    url = "http://localhost:11434/api/generate"
-    payload = {
-        "model": model,
-        "prompt": prompt,
-        "stream": stream
-    }
+    if stream:
+        return _stream_ollama(prompt, model, timeout, _fields(kwargs))
+    try:
+        return generate(prompt, model, timeout=timeout, **_fields(kwargs)).get("response", "").strip()
+    except Exception as e:
+        return _error(e, timeout)
+
+
+def _stream_ollama(prompt, model, timeout, fields):
+    try:
+        for token in stream_generate(prompt, model, timeout=timeout, **fields):
+            yield token
+    except Exception as e:
+        yield _error(e, timeout)
+
+
+async def call_ollama_async(prompt, model="qwen3:0.6b", timeout=600, host=None, **kwargs):
+    """
+    Async, non-streaming call. Returns the full response string (or an "[Ollama error: ...]" string).
+    host= targets a specific Ollama server (default OLLAMA_HOST); system/options/keep_alive are forwarded.
+    """
+    try:
+        data = await agenerate(prompt, model, timeout=timeout, host=host or OLLAMA_HOST, **_fields(kwargs))
+        return data.get("response", "").strip()
+    except Exception as e:
+        return _error(e, timeout)
+
+
+async def stream_ollama_async(prompt, model="qwen3:0.6b", timeout=600, host=None, **kwargs):
+    """
+    Async token stream; errors are yielded as a final "[Ollama error: ...]" token.
+    """
     try:
-        if stream:
-            with requests.post(url, json=payload, timeout=timeout, stream=True) as response:
-                response.raise_for_status()
-                for line in response.iter_lines():
-                    if line:
-                        try:
-                            data = line.decode("utf-8")
-                            if DEBUG_OLLAMA:
-                                print("[Ollama DEBUG] Raw line:", data)
-                            import json
-                            token = json.loads(data).get("response", "")
-                            if token:
-                                yield token
-                            else:
-                                if DEBUG_OLLAMA:
-                                    yield f"[Ollama DEBUG] No 'response' field: {data}"
-                        except Exception as e:
-                            if DEBUG_OLLAMA:
-                                yield f"[Ollama DEBUG] Exception parsing line: {e} | Raw: {line}"
-        else:
-            response = requests.post(url, json=payload, timeout=timeout)
-            response.raise_for_status()
-            data = response.json()
-            return data.get("response", "").strip()
-    except requests.exceptions.Timeout:
-        if stream:
-            yield f"[Ollama error: Timeout after {timeout}s]"
-        else:
-            return f"[Ollama error: Timeout after {timeout}s]"
+        async for token in astream_generate(prompt, model, timeout=timeout, host=host or OLLAMA_HOST, **_fields(kwargs)):
+            yield token
     except Exception as e:
-        if stream:
-            yield f"[Ollama error: {e}]"
-        else:
-            return f"[Ollama error: {e}]"
+        yield _error(e, timeout)
@@ -6,6 +6,8 @@ processes and refines context data, adjusts agent parameters based on
 aggregated feedback, and aggregates multi-agent workflows.
 """
 
+import asyncio
+
 from src.db.logger import log_action, log_message, log_gotcha
 
 def process_context(context):
@@ -26,6 +28,10 @@ def process_context(context):
 
 import requests
 
+# Seconds to wait for the backend to record an adaptation event; it is posted to the same server
+# that may be handling the request, so it must never block indefinitely.
+ADAPTATION_EVENT_TIMEOUT = 5
+
 def log_adaptation_event(user_id, event_type, event_data, triggered_by="orchestrator"):
     # Log adaptation event to backend
     try:
@@ -36,7 +42,7 @@ def log_adaptation_event(user_id, event_type, event_data, triggered_by="orchestr
             "triggered_by": triggered_by
         }
         # TODO: Use backend URL from config/environment
-        requests.post("http://localhost:8000/adaptation_event", json=payload)
+        requests.post("http://localhost:8000/adaptation_event", json=payload, timeout=ADAPTATION_EVENT_TIMEOUT)
     except Exception as e:
         print(f"Failed to log adaptation event: {e}")
 
@@ -112,6 +118,78 @@ def orchestrator_respond(user_input, context=None, agent_status=None, user_id="d
         log_gotcha(agent_id, error_msg, severity="critical")
         return error_msg
 
+ORCHESTRATOR_PROMPT = (
+    "You are the VERN Orchestrator. Answer the user directly and concisely, "
+    "drawing on the context and pointing to specialist agents where relevant."
+)
+
+async def orchestrator_respond_stream(user_input, context=None, agent_status=None, user_id="default_user"):
+    """
+    LLM-generated orchestrator answer as an async generator of text fragments. Unlike
+    orchestrator_respond (a rule-based summary, no LLM call), the reply comes from the model:
+    tokens are yielded as the LLM router produces them (interactive priority), followed by the
+    same upstream-error / parameter-recommendation notes; the full text is logged at the end.
+    Logging and parameter adjustment run in worker threads so they never block the event loop.
+    """
+    agent_id = "orchestrator"
+    parts = []
+    try:
+        from src.mvp.llm_router import get_llm_backend, route_llm_call_async
+        from src.mvp.prompt_utils import assemble_prompt
+        refined_context = process_context(context)
+        await asyncio.to_thread(log_action, agent_id, user_id, "orchestrator_request", {
+            "user_input": user_input,
+            "context": refined_context,
+            "agent_status": agent_status,
+            "stream": True
+        }, status="started")
+
+        # recent_events is budgeted as history (newest kept), the rest of the context separately
+        context_rest = dict(refined_context) if isinstance(refined_context, dict) else refined_context
+        events = context_rest.pop("recent_events", None) if isinstance(context_rest, dict) else None
+        prompt = assemble_prompt({
+            "query": user_input,
+            "status": agent_status,
+            "context": context_rest,
+            "recent_events": list(reversed(events)) if events else None,
+        }, model=get_llm_backend(agent_id)[1])
+        async for chunk in route_llm_call_async(prompt, system=ORCHESTRATOR_PROMPT, stream=True,
+                                                agent_name=agent_id, priority="interactive"):
+            if isinstance(chunk, dict):
+                chunk = f"[LLM error: {chunk.get('error')}]"
+            parts.append(chunk)
+            yield chunk
+
+        notes = []
+        if refined_context and isinstance(refined_context, dict) and refined_context.get("error"):
+            error_detail = refined_context.get("error")
+            await asyncio.to_thread(log_message, agent_id, f"Detected error in upstream agent: {error_detail}",
+                                    level="warning")
+            notes.append(f"\nWarning: Upstream error detected - {error_detail}")
+        if refined_context and isinstance(refined_context, dict) and "feedback" in refined_context:
+            recommendation = await asyncio.to_thread(adjust_agent_parameters, refined_context["feedback"],
+                                                     user_id=user_id)
+            notes.append(f"\nParameter Recommendation: {recommendation}")
+        for note in notes:
+            parts.append(note)
+            yield note
+
+        await asyncio.to_thread(log_action, agent_id, user_id, "orchestrator_response", {
+            "response": "".join(parts),
+            "context": refined_context,
+            "stream": True
+        })
+
+    except Exception as e:
+        error_msg = f"Orchestrator encountered an error: {str(e)}"
+        await asyncio.to_thread(log_message, agent_id, error_msg, level="error", context={
+            "user_input": user_input,
+            "context": context,
+            "agent_status": agent_status
+        })
+        await asyncio.to_thread(log_gotcha, agent_id, error_msg, severity="critical")
+        yield error_msg
+
 # Additional orchestration functions (e.g., workflow aggregation, agent chaining) can be added here.
 
 # TODO: Fetch user profile and feedback from backend for richer context.
@@ -20,7 +20,8 @@ Audit Log Schema & Process:
 - Uses the 'actions' table in SQLite (see src/db/logger.py).
 - Fields: id, timestamp, agent_id, user_id, action_type, payload, status, gotcha_id, tags.
 - All plugin registration, execution, and admin actions are logged via log_action().
-- TODO: Add log rotation, search, and export capabilities for audit logs.
+- Search and NDJSON export via GET /admin/audit (src/db/audit_query.py).
+- Daily rotation to compressed NDJSON archives with retention (src/db/retention.py).
 
 Admin Review Workflow:
 - Plugins must be submitted for admin review before being enabled.
@@ -6,24 +6,220 @@ All agents should use these functions for prompt assembly to ensure consistency
 
 Functions:
     - build_prompt(agent_name, task, context, persona=None, tools=None): Returns a standardized prompt string.
+    - assemble_prompt(sections, model=None): Token-budgeted prompt from labelled sections (query, context,
+      memory, history, ...), so prompt size stays bounded however long the session gets.
+    - count_tokens(text, model=None): Token count for a model (registered tokenizer or estimate).
+    - truncate_to_tokens(text, max_tokens, model=None, keep="head"): Cut text to a token budget.
+    - fit_items(items, max_tokens, model=None, keep="tail"): Keep the list items that fit a budget.
+    - trim_history(items, max_tokens, model=None): Drop the oldest entries of a running log beyond a budget.
     - sanitize_prompt(prompt): Cleans and formats prompt text.
     - add_tool_descriptions(prompt, tools): Appends tool descriptions to the prompt.
 
+Budgets: each section has a kind with its own token budget (DEFAULT_BUDGETS); kinds are fitted in
+priority order (persona, query, tools, context, memory, history) under an overall cap derived from
+the model's context window (PROMPT_MAX_TOKENS overrides it). Over-budget text is cut with a marker;
+over-budget lists (history, events) keep their newest entries and note how many were omitted.
+
 Unit tests for these functions should be added in tests/test_prompt_utils.py.
 """
 
-from typing import Optional, List, Dict
+import json
+import os
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+# Section name -> (label, budget kind)
+SECTIONS = {
+    "agent": ("Agent", "persona"),
+    "persona": ("Persona", "persona"),
+    "query": ("Query", "query"),
+    "task": ("Task", "query"),
+    "step": ("Step", "query"),
+    "status": ("Agent Status", "query"),
+    "tools": ("Available Tools", "tools"),
+    "context": ("Context", "context"),
+    "memory": ("Memory", "memory"),
+    "history": ("History", "history"),
+    "recent_events": ("Recent Events", "history"),
+}
+# Kinds in priority order: earlier kinds are fitted first and keep their budget under pressure
+PRIORITY = ("persona", "query", "tools", "context", "memory", "history")
+DEFAULT_BUDGETS = {"persona": 256, "query": 512, "tools": 256, "context": 512, "memory": 512, "history": 768}
+# History is chronological: keep the newest end
+KEEP_TAIL = {"history"}
+
+# Context window (tokens) per model family; half of it is left for the answer
+MODEL_CONTEXT_TOKENS = {"qwen3": 4096, "qwen": 4096, "phi": 2048, "llama": 4096, "mistral": 4096, "gpt": 8192}
+DEFAULT_CONTEXT_TOKENS = 2048
+PROMPT_MAX_TOKENS = int(os.environ.get("PROMPT_MAX_TOKENS", "0"))  # 0 = derive from the model
+
+_PIECE = re.compile(r"\s*\S+")
+_WORD = re.compile(r"\w+|[^\w\s]")
+_TOKENIZERS: Dict[str, Callable[[str], int]] = {}
+
+
+def register_tokenizer(model_prefix: str, counter: Callable[[str], int]):
+    """
+    Use `counter(text) -> int` for models whose name starts with `model_prefix` (e.g. a HF tokenizer).
+    """
+    _TOKENIZERS[model_prefix] = counter
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Tokenizer-free estimate for BPE models: one token per short word or symbol, ~4 chars per token beyond.
+    """
+    return sum(1 + (len(w) - 1) // 4 for w in _WORD.findall(text))
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    if model:
+        for prefix in sorted(_TOKENIZERS, key=len, reverse=True):
+            if model.startswith(prefix):
+                return _TOKENIZERS[prefix](text)
+    return estimate_tokens(text)
+
+
+def prompt_token_limit(model: Optional[str] = None) -> int:
+    if PROMPT_MAX_TOKENS > 0:
+        return PROMPT_MAX_TOKENS
+    family = re.split(r"[:\-]", (model or "").lower())[0]
+    window = (MODEL_CONTEXT_TOKENS.get(family) or MODEL_CONTEXT_TOKENS.get(family.rstrip("0123456789."))
+              or DEFAULT_CONTEXT_TOKENS)
+    return window // 2
+
+
+def render_value(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    if value is None:
+        return "None"
+    try:
+        return json.dumps(value, ensure_ascii=False, default=str)
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: Optional[str] = None, keep: str = "head") -> str:
+    """
+    Longest head (or tail) of `text` within `max_tokens`, marked with how much was cut.
+    """
+    if max_tokens <= 0:
+        return ""
+    total = count_tokens(text, model)
+    if total <= max_tokens:
+        return text
+    pieces = _PIECE.findall(text)
+    # Room for the truncation marker (its count can only be smaller than `total`)
+    marker_budget = max_tokens - count_tokens(f" …[+{total} tokens truncated]", model)
+    # Binary search on the number of whole pieces kept (exact for any registered tokenizer)
+    lo, hi = 0, len(pieces)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        part = pieces[:mid] if keep == "head" else pieces[len(pieces) - mid:]
+        if count_tokens("".join(part), model) <= marker_budget:
+            lo = mid
+        else:
+            hi = mid - 1
+    if lo == 0:
+        # Not even one whole piece fits (e.g. a huge unbroken token): fall back to characters
+        chars = max(0, marker_budget) * 4
+        pieces = [text[:chars]] if keep == "head" else [text[len(text) - chars:]] if chars else []
+        lo = len(pieces)
+    if keep == "head":
+        kept = "".join(pieces[:lo]).rstrip()
+        return f"{kept} …[+{total - count_tokens(kept, model)} tokens truncated]"
+    kept = "".join(pieces[len(pieces) - lo:]).lstrip()
+    return f"[{total - count_tokens(kept, model)} tokens truncated]… {kept}"
+
+
+def fit_items(items: List[Any], max_tokens: int, model: Optional[str] = None, keep: str = "tail") -> List[str]:
+    """
+    Render list items (one per line) and keep as many whole items as fit, newest (tail) or first (head).
+    Dropped items are replaced by a single "[N ... omitted]" line.
+    """
+    rendered = [render_value(item) for item in items]
+    order = reversed(range(len(rendered))) if keep == "tail" else range(len(rendered))
+    kept: List[int] = []
+    used = 8  # the omission line
+    for i in order:
+        cost = count_tokens(rendered[i], model) + 1
+        if used + cost > max_tokens:
+            if not kept:
+                # A single oversized item: keep a truncated copy rather than nothing
+                rendered[i] = truncate_to_tokens(rendered[i], max_tokens - used, model, keep="head")
+                kept.append(i)
+            break
+        used += cost
+        kept.append(i)
+    kept.sort()
+    lines = [rendered[i] for i in kept if rendered[i]]
+    omitted = len(rendered) - len(kept)
+    if omitted:
+        note = f"[{omitted} {'earlier' if keep == 'tail' else 'more'} entries omitted]"
+        lines = [note] + lines if keep == "tail" else lines + [note]
+    return lines
+
+
+def trim_history(items: List[Any], max_tokens: int = DEFAULT_BUDGETS["history"], model: Optional[str] = None) -> List[Any]:
+    """
+    The newest items (unchanged) whose rendered size fits `max_tokens`; for callers that keep a running log.
+    """
+    used = 0
+    start = len(items)
+    while start > 0:
+        cost = count_tokens(render_value(items[start - 1]), model) + 1
+        if used + cost > max_tokens:
+            break
+        used += cost
+        start -= 1
+    return list(items[start:])
+
+
+def assemble_prompt(sections: Dict[str, Any], model: Optional[str] = None, budgets: Optional[Dict[str, int]] = None,
+                    max_tokens: Optional[int] = None) -> str:
+    """
+    Build "Label: value" lines from `sections` (in the given order), each fitted to its kind's budget
+    and all together to `max_tokens` (default: prompt_token_limit(model)). Kinds are fitted in PRIORITY
+    order, so under pressure the overall cap is spent on persona/query first; None values are skipped.
+    """
+    budgets = {**DEFAULT_BUDGETS, **(budgets or {})}
+    remaining_total = max_tokens or prompt_token_limit(model)
+    remaining_kind = dict(budgets)
+    fitted: Dict[str, str] = {}
+    names = [n for n, v in sections.items() if v is not None]
+    kind_of = {n: SECTIONS.get(n, (n.replace("_", " ").title(), "context"))[1] for n in names}
+    for kind in PRIORITY:
+        for name in (n for n in names if kind_of[n] == kind):
+            label = SECTIONS.get(name, (name.replace("_", " ").title(), kind))[0]
+            allowed = min(remaining_kind[kind], remaining_total) - count_tokens(f"{label}: ", model)
+            value = sections[name]
+            keep = "tail" if kind in KEEP_TAIL else "head"
+            if allowed <= 8:
+                line = f"{label}: [omitted]"
+            elif isinstance(value, (list, tuple)) and value:
+                line = f"{label}:\n" + "\n".join(fit_items(list(value), allowed, model, keep=keep))
+            else:
+                line = f"{label}: " + truncate_to_tokens(render_value(value), allowed, model, keep=keep)
+            cost = count_tokens(line, model)
+            remaining_kind[kind] -= cost
+            remaining_total -= cost
+            fitted[name] = line
+    return sanitize_prompt("\n".join(fitted[n] for n in names))
+
 
-def build_prompt(agent_name: str, task: str, context: Dict, persona: Optional[str] = None, tools: Optional[List[str]] = None) -> str:
+def build_prompt(agent_name: str, task: str, context: Dict, persona: Optional[str] = None, tools: Optional[List[str]] = None,
+                 model: Optional[str] = None) -> str:
     """
-    Assemble a standardized prompt for an agent.
+    Assemble a standardized prompt for an agent (token-budgeted, see assemble_prompt).
     """
-    prompt = f"Agent: {agent_name}\nTask: {task}\nContext: {context}\n"
-    if persona:
-        prompt += f"Persona: {persona}\n"
-    if tools:
-        prompt += f"Available Tools: {', '.join(tools)}\n"
-    return sanitize_prompt(prompt)
+    return assemble_prompt({
+        "agent": agent_name,
+        "task": task,
+        "context": context,
+        "persona": persona or None,
+        "tools": ", ".join(tools) if tools else None,
+    }, model=model)
 
 def sanitize_prompt(prompt: str) -> str:
     """
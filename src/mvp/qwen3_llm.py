@@ -2,32 +2,23 @@
 Qwen3 LLM Integration for VERN
 ------------------------------
 Provides a simple interface to call Qwen3-0.6B via Ollama for agent reasoning.
+Uses the shared keep-alive pool from ollama_client.py.
 """
 
-import requests
+from src.mvp.ollama_client import generate
 
-OLLAMA_URL = "http://localhost:11434/api/generate"
 MODEL = "qwen3:0.6b"
 
 def call_qwen3(prompt, system_prompt=None, temperature=0.2, max_tokens=512):
     """
     Calls Qwen3-0.6B via Ollama and returns the generated response.
     """
-    payload = {
-        "model": MODEL,
-        "prompt": prompt,
-        "stream": False,
-        "options": {
-            "temperature": temperature,
-            "max_tokens": max_tokens,
-        }
+    options = {
+        "temperature": temperature,
+        "max_tokens": max_tokens,
     }
-    if system_prompt:
-        payload["system"] = system_prompt
     try:
-        response = requests.post(OLLAMA_URL, json=payload, timeout=180)
-        response.raise_for_status()
-        data = response.json()
+        data = generate(prompt, MODEL, timeout=180, options=options, system=system_prompt or None)
         return data.get("response", "").strip()
     except Exception as e:
         return f"[Qwen3 LLM error: {e}]"
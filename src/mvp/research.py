@@ -6,6 +6,16 @@ Handles research, academic, and market queries for the MVP.
 
 from src.db.logger import log_action, log_message, log_gotcha
 
+# Persona system prompts; sent as the `system` field so the prefix stays identical across calls
+# and Ollama can reuse it (see src/mvp/llm_residency.py)
+PERSONA_PROMPTS = {
+    "default": "You are the VERN Research Agent. Conduct research, analyze sources, and provide a concise, actionable summary.",
+    "academic": "You are an academic researcher. Provide deep, well-cited answers and suggest further reading.",
+    "market": "You are a market analyst. Summarize trends, risks, and opportunities.",
+    "summarizer": "You are a summarizer. Boil down complex information into clear, digestible points.",
+    "advisor": "You are an advisor. Recommend actions and connect the user to relevant agents or plugins."
+}
+
 def research_respond(user_input, context=None, agent_status=None, persona="default", user_id="default_user", memory=None):
     """
     Handles research queries with persona/context adaptation, agent memory, and error handling.
@@ -20,24 +30,20 @@ def research_respond(user_input, context=None, agent_status=None, persona="defau
             "memory": memory
         }, status="started")
 
-        from src.mvp.llm_router import route_llm_call
-        persona_prompt = {
-            "default": "You are the VERN Research Agent. Conduct research, analyze sources, and provide a concise, actionable summary.",
-            "academic": "You are an academic researcher. Provide deep, well-cited answers and suggest further reading.",
-            "market": "You are a market analyst. Summarize trends, risks, and opportunities.",
-            "summarizer": "You are a summarizer. Boil down complex information into clear, digestible points.",
-            "advisor": "You are an advisor. Recommend actions and connect the user to relevant agents or plugins."
-        }
-        prompt = (
-            persona_prompt.get(persona, persona_prompt["default"]) + "\n"
-            f"Query: {user_input}\n"
-            f"Context: {context}\n"
-            f"Agent Status: {agent_status}\n"
-            f"Persona: {persona}\n"
-            f"Memory: {memory}\n"
-        )
-        response = route_llm_call(prompt, context=context, agent_status=agent_status)
+        from src.mvp.llm_router import get_llm_backend, route_llm_call
+        from src.mvp.prompt_utils import assemble_prompt
+        system = PERSONA_PROMPTS.get(persona, PERSONA_PROMPTS["default"])
+        # Token-budgeted: context/memory are trimmed to fit the model instead of growing the prompt unbounded
+        prompt = assemble_prompt({
+            "query": user_input,
+            "context": context,
+            "status": agent_status,
+            "persona": persona,
+            "memory": memory,
+        }, model=get_llm_backend(agent_id)[1])
+        response = route_llm_call(prompt, system=system, context=context, agent_status=agent_status, agent_name=agent_id)
         log_action(agent_id, user_id, "llm_response", {
+            "system": system,
             "prompt": prompt,
             "response": str(response),
             "persona": persona,
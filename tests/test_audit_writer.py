@@ -0,0 +1,59 @@
+import threading
+
+from src.db.audit_writer import AuditWriter
+
+
+def test_rows_are_group_committed_and_flushed():
+    batches = []
+    writer = AuditWriter(batches.append, batch_size=50, flush_interval_ms=20)
+    for i in range(120):
+        assert writer.enqueue("actions", (i,))
+    assert writer.flush(timeout=5)
+    rows = [r for b in batches for r in b]
+    assert [v[0] for _, v in rows] == list(range(120))
+    # Far fewer commits than rows
+    assert len(batches) < 120
+    writer.stop()
+    assert writer.stats()["written"] == 120
+
+
+def test_full_queue_drops_and_counts():
+    gate = threading.Event()
+    writer = AuditWriter(lambda batch: gate.wait(5), max_queue=2, batch_size=1, enqueue_timeout=0)
+    results = [writer.enqueue("logs", (i,)) for i in range(10)]
+    assert False in results
+    assert writer.stats()["dropped"] == results.count(False)
+    gate.set()
+    writer.stop()
+
+
+def test_stop_flushes_pending_rows():
+    written = []
+    writer = AuditWriter(written.extend, batch_size=1000, flush_interval_ms=10000)
+    for i in range(5):
+        writer.enqueue("gotchas", (i,))
+    writer.stop()
+    assert len(written) == 5
+
+
+
+def test_row_enqueued_while_stopping_is_not_lost():
+    written = []
+    writer = AuditWriter(written.extend, batch_size=10, flush_interval_ms=5, enqueue_timeout=0)
+    writer.enqueue("logs", (0,))
+    in_put = threading.Event()
+    put_nowait = writer._queue.put_nowait
+
+    def slow_put(item):
+        # The producer has passed the _stopping check; stop() runs before its row is queued
+        in_put.set()
+        threading.Event().wait(0.1)
+        put_nowait(item)
+
+    writer._queue.put_nowait = slow_put
+    producer = threading.Thread(target=writer.enqueue, args=("logs", (1,)))
+    producer.start()
+    in_put.wait(5)
+    writer.stop()
+    producer.join()
+    assert [v[0] for _, v in written] == [0, 1]
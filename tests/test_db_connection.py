@@ -0,0 +1,28 @@
+import threading
+
+from src.db.connection import close_all, ensure_schema, get_connection
+
+
+def test_connection_is_pooled_per_thread(tmp_path):
+    db = str(tmp_path / "pool.sqlite")
+    assert get_connection(db) is get_connection(db)
+    other = []
+    t = threading.Thread(target=lambda: other.append(get_connection(db)))
+    t.start()
+    t.join()
+    assert other[0] is not get_connection(db)
+    close_all()
+
+
+def test_wal_mode_and_schema_runs_once(tmp_path):
+    db = str(tmp_path / "schema.sqlite")
+    conn = ensure_schema(db, "t", "CREATE TABLE t (x INTEGER);")
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    # A second run would fail (no IF NOT EXISTS) if the script were re-executed
+    ensure_schema(db, "t", "CREATE TABLE t (x INTEGER);")
+    close_all()
+    # close_all forgets schema state and hands out fresh connections
+    conn2 = get_connection(db)
+    assert conn2 is not conn
+    assert conn2.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+    close_all()
@@ -0,0 +1,55 @@
+import asyncio
+import time
+
+from src.mvp import llm_router
+from src.mvp.llm_cache import LLMCache
+from src.mvp.llm_scheduler import LLMScheduler
+from src.mvp.llm_singleflight import SingleFlight
+
+
+def _setup(monkeypatch, delay=0.2):
+    calls = []
+
+    async def fake_dispatch(provider, model, prompt, stream, kwargs):
+        calls.append((prompt, kwargs.get("system")))
+        await asyncio.sleep(delay)
+        if prompt == "bad":
+            yield {"error": "bad prompt", "code": "LLM_ERROR"}
+            return
+        yield f"answer to {prompt}"
+
+    monkeypatch.setattr(llm_router, "_dispatch_async", fake_dispatch)
+    monkeypatch.setattr(llm_router, "llm_flights", SingleFlight())
+    monkeypatch.setattr(llm_router, "llm_cache", LLMCache(enabled=False, persist=False))
+    monkeypatch.setattr(llm_router, "llm_scheduler", LLMScheduler(default_backend_limit=8, default_agent_limit=8))
+    return calls
+
+
+def test_batch_runs_concurrently_in_order(monkeypatch):
+    calls = _setup(monkeypatch)
+    started = time.monotonic()
+    results = asyncio.run(llm_router.route_llm_batch_async(["a", "b", "c", "d"], agent_name="insight"))
+    elapsed = time.monotonic() - started
+    assert results == ["answer to a", "answer to b", "answer to c", "answer to d"]
+    assert len(calls) == 4
+    # Four 0.2s generations overlap instead of taking 0.8s back to back
+    assert elapsed < 0.6
+
+
+def test_batch_isolates_errors_and_applies_item_kwargs(monkeypatch):
+    calls = _setup(monkeypatch, delay=0.01)
+    results = llm_router.route_llm_batch(
+        ["a", "bad", {"prompt": "c", "system": "persona C"}], system="shared persona")
+    assert results[0] == "answer to a" and results[2] == "answer to c"
+    assert results[1]["code"] == "LLM_ERROR"
+    assert sorted(calls) == [("a", "shared persona"), ("bad", "shared persona"), ("c", "persona C")]
+
+
+def test_batch_respects_scheduler_budget(monkeypatch):
+    _setup(monkeypatch, delay=0.1)
+    monkeypatch.setattr(llm_router, "llm_scheduler", LLMScheduler(default_backend_limit=2, default_agent_limit=8))
+    started = time.monotonic()
+    results = llm_router.route_llm_batch(["a", "b", "c", "d"])
+    # Two at a time: two rounds
+    assert time.monotonic() - started >= 0.19
+    assert results == [f"answer to {p}" for p in "abcd"]
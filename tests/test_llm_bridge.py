@@ -0,0 +1,78 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.mvp import llm_router
+from src.mvp.llm_bridge import LoopThread
+from src.mvp.llm_cache import LLMCache
+from src.mvp.llm_scheduler import _current_priority, llm_priority
+from src.mvp.llm_singleflight import SingleFlight
+
+
+def test_run_uses_one_background_loop_and_caller_context():
+    bridge = LoopThread(name="test-bridge")
+
+    async def where():
+        return threading.current_thread().name, id(asyncio.get_running_loop()), _current_priority.get()
+
+    with llm_priority("background"):
+        first = bridge.run(where())
+    second = bridge.run(where())
+    assert first[0] == "test-bridge" and first[1] == second[1]
+    assert (first[2], second[2]) == ("background", None)
+
+    async def reenter():
+        return bridge.run(where())
+
+    with pytest.raises(RuntimeError):
+        bridge.run(reenter())
+    bridge.stop()
+    assert not bridge.running
+
+
+def test_iterate_streams_and_cancels_on_early_close():
+    bridge = LoopThread(name="test-bridge")
+    closed = threading.Event()
+
+    async def tokens():
+        try:
+            for i in range(1000):
+                yield i
+                await asyncio.sleep(0.001)
+        finally:
+            closed.set()
+
+    it = bridge.iterate(tokens())
+    assert [next(it) for _ in range(3)] == [0, 1, 2]
+    it.close()
+    assert closed.wait(2)
+
+    async def failing():
+        yield "a"
+        raise ValueError("boom")
+
+    it = bridge.iterate(failing())
+    assert next(it) == "a"
+    with pytest.raises(ValueError):
+        next(it)
+    bridge.stop()
+
+
+def test_route_llm_call_has_stable_return_types(monkeypatch):
+    async def fake_dispatch(provider, model, prompt, stream, kwargs):
+        for token in ["to", "ken"] if stream else ["full answer"]:
+            yield token
+
+    monkeypatch.setattr(llm_router, "_dispatch_async", fake_dispatch)
+    monkeypatch.setattr(llm_router, "llm_flights", SingleFlight())
+    monkeypatch.setattr(llm_router, "llm_cache", LLMCache(enabled=False, persist=False))
+
+    assert llm_router.route_llm_call("q", agent_name="research") == "full answer"
+    assert list(llm_router.route_llm_call("q", stream=True)) == ["to", "ken"]
+
+    async def from_running_loop():
+        # Sync agents called inside a running loop no longer get a bare coroutine back
+        return llm_router.route_llm_call("q")
+
+    assert asyncio.run(from_running_loop()) == "full answer"
@@ -0,0 +1,81 @@
+import asyncio
+
+from src.db.connection import close_all
+from src.mvp import llm_router
+from src.mvp.llm_cache import LLMCache
+
+
+def test_exact_ttl_lru_and_persistent_tier(tmp_path, monkeypatch):
+    db = str(tmp_path / "cache.sqlite")
+    clock = [1000.0]
+    monkeypatch.setattr("src.mvp.llm_cache.time.time", lambda: clock[0])
+    cache = LLMCache(ttl_seconds=60, max_entries=2, db_path=db)
+    cache.put("ollama", "m", "p1", "a1")
+    cache.put("ollama", "m", "p2", "a2")
+    assert cache.get("ollama", "m", "p1") == "a1"
+    assert cache.get("ollama", "other", "p1") is None
+    cache.put("ollama", "m", "p3", "a3")  # evicts p2 (least recently used) from memory
+    assert cache.stats()["evictions"] == 1
+
+    # Evicted entries come back from SQLite; a fresh process sees them too
+    assert cache.get("ollama", "m", "p2") == "a2"
+    assert LLMCache(ttl_seconds=60, db_path=db).get("ollama", "m", "p3") == "a3"
+    stats = cache.stats()
+    assert (stats["hits_exact"], stats["hits_persistent"], stats["misses"]) == (1, 1, 1)
+
+    clock[0] = 1061.0
+    assert cache.get("ollama", "m", "p1") is None
+    assert cache.purge_expired() == 3
+    close_all()
+
+
+def test_semantic_level_and_opt_out(tmp_path):
+    cache = LLMCache(persist=False, semantic=True, semantic_threshold=0.9, opt_out_agents=["health"])
+    cache.put("ollama", "m", "You are the research agent. Query: what is RAG?", "answer")
+    assert cache.get("ollama", "m", "you are the research agent query what is rag") == "answer"
+    assert cache.get("ollama", "m", "You are the research agent. Query: explain vector databases") is None
+    assert cache.stats()["hits_semantic"] == 1
+    assert cache.applies_to("research") and not cache.applies_to("health")
+    assert not cache.applies_to("research", requested=False)
+
+
+def test_router_serves_repeat_prompts_from_cache(monkeypatch):
+    calls = []
+
+    async def fake_dispatch(provider, model, prompt, stream, kwargs):
+        calls.append(prompt)
+        yield f"answer to {prompt}"
+
+    monkeypatch.setattr(llm_router, "_dispatch_async", fake_dispatch)
+    monkeypatch.setattr(llm_router, "llm_cache", LLMCache(persist=False))
+
+    async def ask(prompt, **kwargs):
+        return [c async for c in llm_router.route_llm_call_async(prompt, **kwargs)]
+
+    assert asyncio.run(ask("q")) == ["answer to q"]
+    assert asyncio.run(ask("q", stream=True)) == ["answer to q"]
+    assert asyncio.run(ask("q", cache=False)) == ["answer to q"]
+    assert calls == ["q", "q"]
+
+
+def test_async_paths_use_sqlite_off_the_event_loop(tmp_path):
+    import threading
+
+    cache = LLMCache(ttl_seconds=60, max_entries=1, db_path=str(tmp_path / "cache.sqlite"))
+    connect, threads = cache._connect, []
+
+    def tracking_connect():
+        threads.append(threading.current_thread())
+        return connect()
+
+    cache._connect = tracking_connect
+
+    async def run():
+        await cache.aput("ollama", "m", "p1", "a1")
+        await cache.aput("ollama", "m", "p2", "a2")  # evicts p1 from memory
+        return await cache.aget("ollama", "m", "p2"), await cache.aget("ollama", "m", "p1")
+
+    assert asyncio.run(run()) == ("a2", "a1")
+    assert len(threads) == 3 and threading.main_thread() not in threads
+    assert cache.stats()["hits_exact"] == 1 and cache.stats()["hits_persistent"] == 1
+    close_all()
@@ -0,0 +1,99 @@
+import asyncio
+import json
+import time
+
+import httpx
+
+from src.mvp import llm_router, ollama_client
+from src.mvp.llm_pool import OPEN, BackendPool, LLMPools
+from src.mvp.llm_scheduler import LLMScheduler
+
+
+def test_least_outstanding_selection_and_circuit_breaker():
+    pool = BackendPool("b", "ollama", "m", ["http://a", "http://b"], failure_threshold=2, cooldown_seconds=0.05)
+    a, b = pool.endpoints
+    assert (pool.acquire(), pool.acquire()) == (a, b)  # a busy endpoint is not picked twice
+    pool.release(b, True, 0.01)
+    pool.release(a, True, 0.5)
+    for _ in range(2):
+        assert pool.acquire() is b  # idle tie broken by latency
+        pool.release(b, False)
+    assert b.state == OPEN  # second consecutive failure opens the circuit
+    for _ in range(3):
+        ep = pool.acquire()
+        assert ep is a
+        pool.release(ep, True)
+    time.sleep(0.06)
+    assert pool.acquire() is b and pool.acquire() is a  # one half-open trial at a time
+    pool.release(a, True)
+    pool.release(b, True)
+    assert b.state == "closed" and pool.stats()["endpoints"][1]["errors"] == 2
+
+
+def test_health_checks_open_and_close_circuits():
+    results = {"http://a": False, "http://b": True}
+    pools = LLMPools({"b": BackendPool("b", "ollama", "m", ["http://a", "http://b"])},
+                     checker=lambda host, model: results[host])
+    assert pools.check_health() == 1
+    assert [ep.state for ep in pools.get("b").endpoints] == ["open", "closed"]
+    results["http://a"] = True
+    assert pools.check_health() == 2
+    assert pools.stats()["b"]["endpoints"][0]["state"] == "closed"
+
+
+def test_router_fails_over_to_next_endpoint_and_backend(monkeypatch):
+    def handler(request):
+        if request.url.host == "down":
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(200, json={"response": f"{request.url.host}:{json.loads(request.content)['model']}"})
+
+    monkeypatch.setattr(ollama_client, "get_async_client", lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    config = {
+        "pools": {"failure_threshold": 1, "cooldown_seconds": 60},
+        "backends": {
+            "primary": {"provider": "ollama", "model": "m1", "endpoints": ["http://down"], "fallback": ["spare"]},
+            "spare": {"provider": "ollama", "model": "m2", "endpoints": ["http://down", "http://up"]},
+        },
+    }
+    pools = LLMPools.from_config(config)
+    monkeypatch.setattr(llm_router, "llm_pools", pools)
+    monkeypatch.setattr(llm_router, "llm_scheduler", LLMScheduler())
+    monkeypatch.setattr(llm_router, "get_llm_backend_key", lambda agent_name=None: "primary")
+    monkeypatch.setitem(llm_router.LLM_CONFIG["backends"], "spare", config["backends"]["spare"])
+
+    async def call():
+        return [c async for c in llm_router.route_llm_call_async("hi", cache=False)]
+
+    assert asyncio.run(call()) == ["up:m2"]
+    assert pools.get("primary").endpoints[0].state == OPEN
+    # Primary's circuit is open: get_llm_backend reports the fallback directly
+    assert llm_router.get_llm_backend() == ("ollama", "m2")
+    assert asyncio.run(call()) == ["up:m2"]
+
+
+def test_router_tries_each_endpoint_once_per_request(monkeypatch):
+    hosts = []
+
+    def handler(request):
+        hosts.append(request.url.host)
+        raise httpx.ConnectError("refused", request=request)
+
+    monkeypatch.setattr(ollama_client, "get_async_client", lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    config = {
+        # Circuits stay closed after one failure, so only the per-request exclusion prevents retrying an endpoint
+        "pools": {"failure_threshold": 5},
+        "backends": {"primary": {"provider": "ollama", "model": "m1", "endpoints": ["http://a", "http://b"]}},
+    }
+    pools = LLMPools.from_config(config)
+    monkeypatch.setattr(llm_router, "llm_pools", pools)
+    monkeypatch.setattr(llm_router, "llm_scheduler", LLMScheduler())
+    monkeypatch.setattr(llm_router, "get_llm_backend_key", lambda agent_name=None: "primary")
+    monkeypatch.setitem(llm_router.LLM_CONFIG["backends"], "primary", config["backends"]["primary"])
+
+    async def call():
+        return [c async for c in llm_router.route_llm_call_async("hi", cache=False)]
+
+    result = asyncio.run(call())
+    assert sorted(hosts) == ["a", "b"]
+    assert len(result) == 1 and "refused" in str(result[0])
+    assert all(ep.outstanding == 0 for ep in pools.get("primary").endpoints)
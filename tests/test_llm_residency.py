@@ -0,0 +1,58 @@
+import asyncio
+import json
+
+import httpx
+
+from src.mvp import llm_router, ollama_client
+from src.mvp.llm_pool import LLMPools
+from src.mvp.llm_residency import keep_alive_for, last_warmup, warmup
+from src.mvp.research import PERSONA_PROMPTS
+
+
+def _capture(monkeypatch):
+    payloads = []
+
+    def handler(request):
+        body = json.loads(request.content)
+        payloads.append((request.url.host, body))
+        return httpx.Response(200, json={"response": "ok", "context": [1, 2, 3]})
+
+    monkeypatch.setattr(ollama_client, "get_async_client", lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    return payloads
+
+
+CONFIG = {
+    "default": "small",
+    "backends": {
+        "small": {"provider": "ollama", "model": "m1", "endpoints": ["http://a", "http://b"]},
+        "big": {"provider": "ollama", "model": "m2", "keep_alive": -1},
+    },
+    "agents": {"research": "small"},
+    "residency": {"keep_alive": "10m", "warmup_agents": {"research": "src.mvp.research", "ghost": "src.mvp.nope"}},
+}
+
+
+def test_warmup_loads_models_on_every_endpoint_and_primes_personas(monkeypatch):
+    payloads = _capture(monkeypatch)
+    results = asyncio.run(warmup(CONFIG, LLMPools.from_config(CONFIG)))
+    assert set(results) == {"small@http://a", "small@http://b"} and all(r["ok"] for r in results.values())
+    assert results["small@http://a"]["primed"] == 1
+    for host in ("a", "b"):
+        load, prime = [body for h, body in payloads if h == host]
+        assert load["prompt"] == "" and load["keep_alive"] == "10m"
+        assert prime["system"] == PERSONA_PROMPTS["default"] and prime["options"] == {"num_predict": 1}
+    assert last_warmup["results"] == results
+    assert keep_alive_for(CONFIG, "big") == -1
+
+
+def test_router_sends_system_prefix_and_keep_alive(monkeypatch):
+    payloads = _capture(monkeypatch)
+    monkeypatch.setattr(llm_router, "llm_pools", LLMPools.from_config(CONFIG))
+    monkeypatch.setattr(llm_router, "LLM_CONFIG", CONFIG)
+
+    async def call():
+        return [c async for c in llm_router.route_llm_call_async("Query: hi", system="persona", agent_name="research", cache=False)]
+
+    assert asyncio.run(call()) == ["ok"]
+    body = payloads[0][1]
+    assert (body["system"], body["prompt"], body["keep_alive"], body["model"]) == ("persona", "Query: hi", "10m", "m1")
@@ -0,0 +1,65 @@
+import asyncio
+
+from src.mvp.llm_scheduler import LLMScheduler, llm_priority
+
+
+def test_priority_order_and_round_robin_fairness():
+    sched = LLMScheduler(default_backend_limit=1, default_agent_limit=5, aging_seconds=3600)
+    order = []
+
+    async def job(agent, priority, tag):
+        async with sched.slot("ollama", agent, priority):
+            order.append(tag)
+            await asyncio.sleep(0.01)
+
+    async def main():
+        blocker = asyncio.create_task(job("x", "workflow", "first"))
+        await asyncio.sleep(0)
+        tasks = [
+            asyncio.create_task(job("a", "background", "bg")),
+            asyncio.create_task(job("a", "workflow", "a1")),
+            asyncio.create_task(job("a", "workflow", "a2")),
+            asyncio.create_task(job("b", "workflow", "b1")),
+            asyncio.create_task(job("c", None, "chat")),
+        ]
+        await asyncio.sleep(0)
+        stats = sched.stats()
+        await asyncio.gather(blocker, *tasks)
+        return stats
+
+    with llm_priority("interactive"):
+        stats = asyncio.run(main())
+    # Context priority applies to calls without an explicit class; agents a/b alternate
+    assert order == ["first", "chat", "a1", "b1", "a2", "bg"]
+    assert stats["queue_depth"] == {"interactive": 1, "workflow": 3, "background": 1}
+    assert sched.stats()["running_by_backend"] == {}
+
+
+def test_per_agent_budget_and_cancellation():
+    sched = LLMScheduler(default_backend_limit=4, agent_limits={"research": 1})
+    release = asyncio.Event
+
+    async def main():
+        gate = release()
+        running = []
+
+        async def job(agent):
+            async with sched.slot("ollama", agent):
+                running.append(agent)
+                await gate.wait()
+
+        t1 = asyncio.create_task(job("research"))
+        t2 = asyncio.create_task(job("research"))
+        t3 = asyncio.create_task(job("admin"))
+        await asyncio.sleep(0.01)
+        assert sorted(running) == ["admin", "research"]  # second research call waits for its budget
+        t2.cancel()
+        await asyncio.sleep(0.01)
+        depth = sched.stats()["queue_depth"]["workflow"]
+        gate.set()
+        await asyncio.gather(t1, t3)
+        return depth
+
+    assert asyncio.run(main()) == 0
+    stats = sched.stats()
+    assert stats["cancelled"] == 1 and stats["running_by_agent"] == {}
@@ -0,0 +1,59 @@
+import asyncio
+
+from src.mvp import llm_router
+from src.mvp.llm_cache import LLMCache
+from src.mvp.llm_singleflight import SingleFlight
+
+
+def test_concurrent_identical_streams_share_one_generation(monkeypatch):
+    calls = []
+
+    async def fake_dispatch(provider, model, prompt, stream, kwargs):
+        calls.append(prompt)
+        for token in ["a", "b", "c"]:
+            await asyncio.sleep(0.01)
+            yield token
+
+    monkeypatch.setattr(llm_router, "_dispatch_async", fake_dispatch)
+    monkeypatch.setattr(llm_router, "llm_cache", LLMCache(persist=False))
+    monkeypatch.setattr(llm_router, "llm_flights", SingleFlight())
+
+    async def ask(stream, delay=0.0):
+        await asyncio.sleep(delay)
+        return [c async for c in llm_router.route_llm_call_async("same", stream=stream)]
+
+    async def main():
+        # The late joiner attaches mid-stream and still gets the tokens produced before it arrived
+        return await asyncio.gather(ask(True), ask(True), ask(False), ask(True, delay=0.015))
+
+    results = asyncio.run(main())
+    assert results == [["a", "b", "c"], ["a", "b", "c"], ["abc"], ["a", "b", "c"]]
+    assert calls == ["same"]
+    assert llm_router.llm_flights.stats() == {"inflight": 0, "started": 1, "coalesced": 3}
+    # Completed flight filled the cache, so the next call does not start a generation
+    assert asyncio.run(ask(True)) == ["abc"]
+    assert calls == ["same"]
+
+
+def test_generation_cancelled_when_last_subscriber_leaves():
+    flights = SingleFlight()
+    state = {"cancelled": False}
+
+    async def slow():
+        try:
+            yield "first"
+            await asyncio.sleep(10)
+            yield "never"
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            raise
+
+    async def main():
+        agen = flights.run("k", slow)
+        assert await agen.__anext__() == "first"
+        await agen.aclose()
+        await asyncio.sleep(0.01)
+        return flights.stats()["inflight"]
+
+    assert asyncio.run(main()) == 0
+    assert state["cancelled"]
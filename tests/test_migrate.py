@@ -0,0 +1,94 @@
+import sqlite3
+
+import pytest
+
+from src.db import migrate as migrate_mod
+from src.db.connection import close_all
+
+
+def _write(d, name, sql):
+    (d / name).write_text(sql, encoding="utf-8")
+
+
+def test_pending_migrations_apply_in_one_transaction(tmp_path, monkeypatch):
+    mdir = tmp_path / "migrations"
+    mdir.mkdir()
+    db = str(tmp_path / "m.sqlite")
+    monkeypatch.setattr(migrate_mod, "MIGRATIONS_DIR", str(mdir))
+    _write(mdir, "0001_a.sql", "BEGIN;\nCREATE TABLE a (id INTEGER);\nCOMMIT;\n")
+    _write(mdir, "0002_b.sql", "CREATE TABLE b (id INTEGER);\nINSERT INTO missing VALUES (1);\n")
+
+    # 0002 fails, so 0001 must not be applied either
+    with pytest.raises(sqlite3.OperationalError):
+        migrate_mod.migrate(db)
+    conn = migrate_mod.get_conn(db)
+    assert conn.execute("SELECT name FROM sqlite_master WHERE name IN ('a', 'b')").fetchall() == []
+
+    _write(mdir, "0002_b.sql", "CREATE TABLE b (id INTEGER);\n")
+    assert migrate_mod.migrate(db, dry_run=True) == ["0001_a.sql", "0002_b.sql"]
+    assert migrate_mod.applied_migrations(conn) == {}
+
+    assert migrate_mod.migrate(db) == ["0001_a.sql", "0002_b.sql"]
+    assert migrate_mod.migrate(db) == []
+    rows = conn.execute("SELECT filename, version, checksum FROM schema_migrations ORDER BY id").fetchall()
+    assert [(r[0], r[1]) for r in rows] == [("0001_a.sql", 1), ("0002_b.sql", 2)]
+    assert all(len(r[2]) == 64 for r in rows)
+
+    _write(mdir, "0001_a.sql", "CREATE TABLE a (id INTEGER, extra TEXT);\n")
+    states = {r["filename"]: r["state"] for r in migrate_mod.migration_status(db)}
+    assert states == {"0001_a.sql": "changed", "0002_b.sql": "applied"}
+    close_all()
+
+
+def test_legacy_schema_migrations_table_is_upgraded(tmp_path, monkeypatch):
+    mdir = tmp_path / "migrations"
+    mdir.mkdir()
+    db = str(tmp_path / "legacy.sqlite")
+    monkeypatch.setattr(migrate_mod, "MIGRATIONS_DIR", str(mdir))
+    _write(mdir, "0001_a.sql", "CREATE TABLE a (id INTEGER);\n")
+    _write(mdir, "0002_b.sql", "CREATE TABLE b (id INTEGER);\n")
+    with sqlite3.connect(db) as legacy:
+        legacy.executescript(
+            "CREATE TABLE schema_migrations (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "filename TEXT UNIQUE NOT NULL, applied_at TEXT DEFAULT (datetime('now')));"
+            "CREATE TABLE a (id INTEGER);"
+            "INSERT INTO schema_migrations (filename) VALUES ('0001_a.sql');"
+        )
+
+    assert migrate_mod.migrate(db) == ["0002_b.sql"]
+    conn = migrate_mod.get_conn(db)
+    assert conn.execute("SELECT MAX(version) FROM schema_migrations").fetchone()[0] == 2
+    assert all(state["state"] == "applied" for state in migrate_mod.migration_status(db))
+    close_all()
+
+
+def test_legacy_checksums_are_backfilled_with_nothing_pending(tmp_path, monkeypatch):
+    mdir = tmp_path / "migrations"
+    mdir.mkdir()
+    db = str(tmp_path / "legacy.sqlite")
+    monkeypatch.setattr(migrate_mod, "MIGRATIONS_DIR", str(mdir))
+    _write(mdir, "0001_a.sql", "CREATE TABLE a (id INTEGER);\n")
+    with sqlite3.connect(db) as legacy:
+        legacy.executescript(
+            "CREATE TABLE schema_migrations (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "filename TEXT UNIQUE NOT NULL, applied_at TEXT DEFAULT (datetime('now')));"
+            "CREATE TABLE a (id INTEGER);"
+            "INSERT INTO schema_migrations (filename) VALUES ('0001_a.sql');"
+        )
+
+    assert migrate_mod.migrate(db) == []
+    assert migrate_mod.applied_migrations(migrate_mod.get_conn(db))["0001_a.sql"] == migrate_mod.file_checksum(
+        str(mdir / "0001_a.sql"))
+    close_all()
+
+
+def test_crlf_migration_is_not_reported_as_changed(tmp_path, monkeypatch):
+    mdir = tmp_path / "migrations"
+    mdir.mkdir()
+    db = str(tmp_path / "crlf.sqlite")
+    monkeypatch.setattr(migrate_mod, "MIGRATIONS_DIR", str(mdir))
+    (mdir / "0001_a.sql").write_bytes(b"BEGIN;\r\nCREATE TABLE a (id INTEGER);\r\nCOMMIT;\r\n")
+
+    assert migrate_mod.migrate(db) == ["0001_a.sql"]
+    assert [r["state"] for r in migrate_mod.migration_status(db)] == ["applied"]
+    close_all()
@@ -0,0 +1,61 @@
+import asyncio
+import json
+
+import httpx
+
+from src.mvp import ollama_client
+from src.mvp.llm_router import route_llm_call_async
+from src.mvp.ollama_llm import call_ollama
+
+
+def _handler(request: httpx.Request) -> httpx.Response:
+    body = json.loads(request.content)
+    if body["stream"]:
+        lines = "".join(json.dumps({"response": t}) + "\n" for t in ["Hel", "lo", ""]) + json.dumps({"done": True}) + "\n"
+        return httpx.Response(200, text=lines)
+    return httpx.Response(200, json={"response": f" echo:{body['prompt']} ", "model": body["model"]})
+
+
+def _patch_clients(monkeypatch, handler=_handler):
+    transport = httpx.MockTransport(handler)
+    sync_client = httpx.Client(transport=transport)
+    monkeypatch.setattr(ollama_client, "get_sync_client", lambda: sync_client)
+    clients = {}
+
+    def get_async_client():
+        loop = asyncio.get_running_loop()
+        if loop not in clients:
+            clients[loop] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return clients[loop]
+
+    monkeypatch.setattr(ollama_client, "get_async_client", get_async_client)
+
+
+def test_sync_calls_share_pool_and_return_strings(monkeypatch):
+    _patch_clients(monkeypatch)
+    assert call_ollama("hi", model="m") == "echo:hi"
+    assert list(call_ollama("hi", model="m", stream=True)) == ["Hel", "lo"]
+
+
+def test_async_router_streams_tokens(monkeypatch):
+    _patch_clients(monkeypatch)
+
+    async def collect(**kwargs):
+        return [t async for t in route_llm_call_async("hi", cache=False, **kwargs)]
+
+    assert asyncio.run(collect(stream=True)) == ["Hel", "lo"]
+    assert asyncio.run(collect(agent_name="research")) == ["echo:hi"]
+
+
+def test_errors_become_error_strings(monkeypatch):
+    def boom(request):
+        raise httpx.ConnectError("refused", request=request)
+
+    _patch_clients(monkeypatch, boom)
+    assert call_ollama("hi").startswith("[Ollama error:")
+    assert asyncio.run(_first(route_llm_call_async("hi", stream=True, cache=False))).startswith("[Ollama error:")
+
+
+async def _first(agen):
+    async for item in agen:
+        return item
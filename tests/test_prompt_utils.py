@@ -0,0 +1,66 @@
+from src.mvp.prompt_utils import (
+    assemble_prompt,
+    build_prompt,
+    count_tokens,
+    fit_items,
+    prompt_token_limit,
+    register_tokenizer,
+    trim_history,
+    truncate_to_tokens,
+)
+
+
+def test_build_prompt_keeps_standard_layout():
+    prompt = build_prompt("dev_team", "add login", {"repo": "vern"}, persona="mentor", tools=["git", "pytest"])
+    assert prompt.splitlines() == [
+        "Agent: dev_team",
+        "Task: add login",
+        'Context: {"repo": "vern"}',
+        "Persona: mentor",
+        "Available Tools: git, pytest",
+    ]
+
+
+def test_truncation_respects_budget_and_direction():
+    text = " ".join(f"word{i}" for i in range(500))
+    head = truncate_to_tokens(text, 50)
+    tail = truncate_to_tokens(text, 50, keep="tail")
+    assert count_tokens(head) <= 50 and head.startswith("word0 ") and "tokens truncated]" in head
+    assert count_tokens(tail) <= 50 and tail.endswith("word499")
+    assert truncate_to_tokens("short", 50) == "short"
+
+
+def test_history_keeps_newest_entries_and_reports_omissions():
+    events = [{"turn": i, "text": "lorem ipsum " * 10} for i in range(100)]
+    lines = fit_items(events, 200)
+    assert lines[0].startswith("[") and "earlier entries omitted" in lines[0]
+    assert '"turn": 99' in lines[-1]
+    kept = trim_history(events, 200)
+    assert kept == events[-len(kept):] and 0 < len(kept) < 100
+
+
+def test_prompt_size_is_bounded_regardless_of_session_length():
+    sizes = []
+    for n in (10, 1000, 10000):
+        prompt = assemble_prompt({
+            "query": "What should I do next?",
+            "context": {"notes": "x " * n},
+            "memory": ["fact"] * n,
+            "recent_events": [{"type": "user_input", "n": i} for i in range(n)],
+        }, model="qwen3:0.6b")
+        sizes.append(count_tokens(prompt))
+        assert prompt.startswith("Query: What should I do next?")
+    assert max(sizes) <= prompt_token_limit("qwen3:0.6b")
+    assert abs(sizes[2] - sizes[1]) <= 2  # saturated: more session costs nothing (bar marker digits)
+
+
+def test_query_wins_over_history_under_a_tight_cap():
+    prompt = assemble_prompt({"recent_events": ["old turn"] * 500, "query": "keep me"}, max_tokens=60)
+    assert prompt.splitlines()[0].startswith("Recent Events:")
+    assert "Query: keep me" in prompt and count_tokens(prompt) <= 60
+
+
+def test_registered_tokenizer_is_used_for_matching_models():
+    register_tokenizer("char-model", len)
+    assert count_tokens("abcd", model="char-model:1b") == 4
+    assert count_tokens("abcd", model="qwen3:0.6b") == 1
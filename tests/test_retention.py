@@ -0,0 +1,55 @@
+import gzip
+import json
+import os
+from datetime import datetime, timezone
+
+from src.db.connection import close_all, ensure_schema
+from src.db.logger import INSERT_SQL, SCHEMA_SQL
+from src.db.retention import run_retention
+
+
+def test_old_buckets_are_archived_deleted_and_pruned(tmp_path):
+    db = str(tmp_path / "audit.sqlite")
+    archive = str(tmp_path / "archive")
+    conn = ensure_schema(db, "logger", SCHEMA_SQL)
+    rows = [
+        ("2026-01-01T10:00:00+00:00", "research", "u1", "llm_response", json.dumps({"n": 1}), "success", None, None),
+        ("2026-01-01T23:59:59+00:00", "research", "u1", "llm_response", json.dumps({"n": 2}), "success", None, None),
+        ("2026-03-01T08:00:00+00:00", "admin", "u2", "admin_request", json.dumps({"n": 3}), "success", None, None),
+        ("2026-03-09T08:00:00+00:00", "admin", "u2", "admin_request", json.dumps({"n": 4}), "success", None, None),
+    ]
+    with conn:
+        conn.executemany(INSERT_SQL["actions"], rows)
+    now = datetime(2026, 3, 10, tzinfo=timezone.utc)
+
+    result = run_retention(db, hot_days=7, archive_dir=archive, retention_days=30, now=now)
+
+    assert result["rotated"]["actions"] == {"2026-01-01": 2, "2026-03-01": 1}
+    # Only the hot window stays in SQLite
+    remaining = conn.execute("SELECT payload FROM actions").fetchall()
+    assert [json.loads(r[0])["n"] for r in remaining] == [4]
+    # January is past archive retention; March is kept and readable
+    assert not os.path.exists(os.path.join(archive, "actions", "2026-01-01.ndjson.gz"))
+    with gzip.open(os.path.join(archive, "actions", "2026-03-01.ndjson.gz"), "rt") as f:
+        archived = [json.loads(line) for line in f]
+    assert archived[0]["agent_id"] == "admin"
+    assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    close_all()
+
+
+def test_blob_gc_margin_covers_the_touch_interval(tmp_path, monkeypatch):
+    from src.db import retention
+
+    db = str(tmp_path / "audit.sqlite")
+    conn = ensure_schema(db, "logger", SCHEMA_SQL)
+    with conn:
+        conn.executemany(
+            "INSERT INTO payload_blobs (hash, codec, size, data, created_at, last_used) VALUES (?, 'raw', 1, x'00', ?, ?)",
+            [("recent", "2026-02-28T12:00:00+00:00", "2026-02-28T12:00:00+00:00"),
+             ("old", "2026-02-20T12:00:00+00:00", "2026-02-20T12:00:00+00:00")])
+    # Hot window starts 2026-03-03; a 3-day touch interval keeps blobs touched since 2026-02-28
+    monkeypatch.setattr(retention, "BLOB_TOUCH_INTERVAL_S", 3 * 86400)
+    retention.rotate_partitions(db, hot_days=7, archive_dir=str(tmp_path / "archive"),
+                                now=datetime(2026, 3, 10, tzinfo=timezone.utc))
+    assert [r[0] for r in conn.execute("SELECT hash FROM payload_blobs")] == ["recent"]
+    close_all()
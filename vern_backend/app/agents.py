@@ -1,6 +1,8 @@
-from fastapi import APIRouter, Body, Request
+import asyncio
+import os
+from fastapi import APIRouter, Body, Query, Request
 from pydantic import BaseModel
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from vern_backend.app.memory import MemoryGraph
 from vern_backend.app.vector_memory import VectorMemory
 from vern_backend.app.registry_service import registry, AgentRecord
@@ -88,20 +90,10 @@ def _extract_requested_action(ctx: dict) -> str:
         return intent
     return ""
 
-@router.post("/orchestrator/respond")
-def orchestrator_respond_api(req: OrchestratorRequest = Body(...)):
+def _prepare_orchestrator_request(req: OrchestratorRequest):
     """
-    NOTE: When privacy consent is required, this endpoint SHORT-CIRCUITS and returns ONLY:
-    {
-      "policy_required": true,
-      "action": "<file.read|file.write|web.fetch|email.send>",
-      "reason": "string",
-      "request_id": "uuid",
-      "suggested_scope": { ... },
-      "expires_at": <number|null>,
-      "user_id": "<user>"
-    }
-    Otherwise, returns {"response": "..."}.
+    Shared front half of the orchestrator endpoints: input validation, history context and the
+    privacy check. Returns (user_input, context) to proceed, or a dict to return to the client as-is.
     """
     # Input validation: sanitize user_input
     user_input = (req.user_input or "").strip()
@@ -143,6 +135,36 @@ def orchestrator_respond_api(req: OrchestratorRequest = Body(...)):
         except Exception as _e:
             # if privacy check fails unexpectedly, proceed but annotate context
             context_with_history["privacy_check_failed"] = str(_e)
+    return user_input, context_with_history
+
+def _persist_exchange(user_id: str, user_input: str, response: str, **extra):
+    # Persist user input and response as events in memory graph (shim-safe)
+    try:
+        memory.add_event(user_id, "user_input", properties={"input": user_input})
+        memory.add_event(user_id, "agent_response", properties={"response": response, **extra})
+    except Exception as _e:
+        print(f"[WARN] Failed to persist events: {_e}")
+
+@router.post("/orchestrator/respond")
+def orchestrator_respond_api(req: OrchestratorRequest = Body(...)):
+    """
+    NOTE: When privacy consent is required, this endpoint SHORT-CIRCUITS and returns ONLY:
+    {
+      "policy_required": true,
+      "action": "<file.read|file.write|web.fetch|email.send>",
+      "reason": "string",
+      "request_id": "uuid",
+      "suggested_scope": { ... },
+      "expires_at": <number|null>,
+      "user_id": "<user>"
+    }
+    Otherwise, returns {"response": "..."} from the rule-based orchestrator (no LLM call).
+    /orchestrator/respond/stream instead streams an LLM-generated answer.
+    """
+    prepared = _prepare_orchestrator_request(req)
+    if isinstance(prepared, dict):
+        return prepared
+    user_input, context_with_history = prepared
 
     # Wire to real orchestrator logic
     try:
@@ -184,12 +206,7 @@ def orchestrator_respond_api(req: OrchestratorRequest = Body(...)):
             response = "".join(list(response_stream))
         else:
             response = str(response_stream)
-        # Persist user input and response as events in memory graph (shim-safe)
-        try:
-            memory.add_event(req.user_id, "user_input", properties={"input": user_input})
-            memory.add_event(req.user_id, "agent_response", properties={"response": response})
-        except Exception as _e:
-            print(f"[WARN] Failed to persist events: {_e}")
+        _persist_exchange(req.user_id, user_input, response)
         return {"response": response}
     except Exception as e:
         print(f"[ERROR] Orchestrator API error: {str(e)}")
@@ -396,9 +413,10 @@ class AgentRegistryResponse(BaseModel):
 
 @router.get("/status")
 def agent_cluster_status():
-    recs = registry.list()
+    # Pre-decoded payloads from the registry snapshot (no per-request JSON parsing)
+    payloads = registry.status_payloads()
     # Fallback: if empty, provide the previous minimal defaults
-    if not recs:
+    if not payloads:
         status_list = [
             {"name": "admin", "cluster": "Admin", "status": "online"},
             {"name": "research", "cluster": "Research", "status": "online"},
@@ -406,7 +424,99 @@ def agent_cluster_status():
             {"name": "health", "cluster": "Health", "status": "online"},
         ]
         return JSONResponse(content=status_list)
-    return JSONResponse(content=[AgentRegistryResponse.from_record(r) for r in recs])
+    return JSONResponse(content=payloads)
+
+@router.get("/find")
+def find_agents(request: Request, capability: str | None = None, cluster: str | None = None, status_: str | None = Query(None, alias="status")):
+    """
+    Discover agents via the registry's capability/cluster indexes, e.g. /agents/find?capability=search&status=online.
+    """
+    if status_ is not None and status_ not in ("online", "stale", "offline"):
+        return error_response("VALIDATION_ERROR", status.HTTP_400_BAD_REQUEST, "status must be one of: online, stale, offline", request)
+    items = registry.find_payloads(capability=capability, cluster=cluster, status=status_)
+    return {"ok": True, "count": len(items), "items": items}
+
+STREAM_POLL_S = float(os.environ.get("AGENT_STREAM_POLL_S", "0.5"))
+STREAM_KEEPALIVE_S = float(os.environ.get("AGENT_STREAM_KEEPALIVE_S", "15"))
+
+def _sse(event: str, seq: int, data: dict) -> str:
+    return f"id: {seq}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.get("/stream")
+async def agent_stream(request: Request, since: int | None = None):
+    """
+    Server-Sent Events feed of registry changes (join/update/status/leave), replacing /agents/status polling.
+    Without `since` (or a Last-Event-ID header) the stream starts with a full `snapshot` event; every event id
+    is a sequence number to resume from. A `snapshot` is re-sent if the requested seq is no longer buffered.
+    """
+    last_event_id = request.headers.get("last-event-id")
+    if since is None and last_event_id and last_event_id.isdigit():
+        since = int(last_event_id)
+
+    async def event_source():
+        cursor = since
+        idle = 0.0
+        while not await request.is_disconnected():
+            if cursor is None:
+                seq, agents = registry.snapshot()
+                yield _sse("snapshot", seq, {"seq": seq, "agents": agents})
+                cursor = seq
+            events, latest, reset = registry.changes(cursor)
+            if reset:
+                cursor = None
+                continue
+            for ev in events:
+                yield _sse(ev["type"], ev["seq"], ev)
+            cursor = latest
+            idle = 0.0 if events else idle + STREAM_POLL_S
+            if idle >= STREAM_KEEPALIVE_S:
+                idle = 0.0
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(STREAM_POLL_S)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.post("/orchestrator/respond/stream")
+async def orchestrator_respond_stream_api(req: OrchestratorRequest = Body(...)):
+    """
+    LLM-generated orchestrator answer as Server-Sent Events (unlike /orchestrator/respond, which returns
+    the rule-based summary): a `token` event ({"text"}) per fragment as the model generates it, then `done` with the full {"response"}. The exchange is persisted
+    to memory events once the stream ends (marked `truncated` if the client disconnected early).
+    Validation errors and privacy-consent payloads are returned as plain JSON, exactly as by /orchestrator/respond.
+    """
+    prepared = _prepare_orchestrator_request(req)
+    if isinstance(prepared, dict):
+        return prepared
+    user_input, context_with_history = prepared
+    from src.mvp.orchestrator import orchestrator_respond_stream
+
+    async def event_source():
+        parts = []
+        complete = False
+        try:
+            async for text in orchestrator_respond_stream(user_input, context_with_history, req.agent_status, req.user_id):
+                parts.append(text)
+                yield _sse("token", len(parts), {"text": text})
+            complete = True
+            yield _sse("done", len(parts) + 1, {"response": "".join(parts)})
+        except Exception as e:
+            print(f"[ERROR] Orchestrator stream error: {str(e)}")
+            yield _sse("error", len(parts) + 1, {"message": f"Error: {str(e)}"})
+        finally:
+            if complete:
+                _persist_exchange(req.user_id, user_input, "".join(parts))
+            else:
+                _persist_exchange(req.user_id, user_input, "".join(parts), truncated=True)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @router.delete("/{name}")
 def delete_agent(name: str, request: Request):
@@ -0,0 +1,97 @@
+"""
+VERN Backend - Audit Log API
+----------------------------
+Search and export for the SQLite audit log (`actions` / `logs` tables written by src/db/logger.py).
+
+- GET /admin/audit          one keyset page: { ok, items, next_cursor }
+- GET /admin/audit/export   NDJSON stream of every matching row (paged internally, constant memory)
+- POST /admin/audit/maintenance  run one retention pass now (rotate, prune archives, VACUUM)
+
+Queries cover the hot window kept in SQLite; older days live in compressed NDJSON archives (src/db/retention.py).
+"""
+
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Query, Request, status
+from fastapi.responses import StreamingResponse
+
+from vern_backend.app.errors import error_response
+from src.db.audit_query import AuditQueryError, iter_audit, query_audit
+
+router = APIRouter(prefix="/admin/audit", tags=["admin"])
+
+
+def _filters(agent_id, user_id, action_type, status_, level):
+    return {"agent_id": agent_id, "user_id": user_id, "action_type": action_type, "status": status_, "level": level}
+
+
+@router.get("")
+def search_audit_log(
+    request: Request,
+    table: str = "actions",
+    agent_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+    action_type: Optional[str] = None,
+    status_: Optional[str] = Query(None, alias="status"),
+    level: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+):
+    """
+    Filter by agent/user/action type/status (actions) or agent/level (logs) and an ISO-8601
+    [since, until) time range. Pass next_cursor back as `cursor` to fetch the following page.
+    """
+    try:
+        page = query_audit(table, _filters(agent_id, user_id, action_type, status_, level), since, until, cursor, limit)
+    except AuditQueryError as e:
+        return error_response("VALIDATION_ERROR", status.HTTP_400_BAD_REQUEST, str(e), request)
+    return {"ok": True, "table": table, **page}
+
+
+@router.get("/export")
+def export_audit_log(
+    request: Request,
+    table: str = "actions",
+    agent_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+    action_type: Optional[str] = None,
+    status_: Optional[str] = Query(None, alias="status"),
+    level: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+):
+    filters = _filters(agent_id, user_id, action_type, status_, level)
+    rows = iter_audit(table, filters, since, until)
+    try:
+        # Pull the first row eagerly so validation errors become an envelope, not a broken stream
+        first = next(rows, None)
+    except AuditQueryError as e:
+        return error_response("VALIDATION_ERROR", status.HTTP_400_BAD_REQUEST, str(e), request)
+
+    def ndjson():
+        if first is None:
+            return
+        yield json.dumps(first, ensure_ascii=False) + "\n"
+        for row in rows:
+            yield json.dumps(row, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(
+        ndjson(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="audit_{table}.ndjson"'},
+    )
+
+
+@router.post("/maintenance")
+def run_audit_maintenance(request: Request):
+    from src.db.logger import flush_logs
+    from src.db.retention import run_retention
+    try:
+        flush_logs()
+        result = run_retention()
+    except Exception as e:
+        return error_response("DB_UNAVAILABLE", status.HTTP_503_SERVICE_UNAVAILABLE, "Audit maintenance failed.", request, {"error": str(e)})
+    return {"ok": True, **result}
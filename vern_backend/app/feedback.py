@@ -10,6 +10,7 @@ import sqlite3
 import os
 
 from vern_backend.app.errors import error_response
+from src.db.connection import get_connection
 
 try:
     from vern_backend.app.db_path import get_sqlite_path
@@ -31,10 +32,12 @@ class AdaptationEvent(BaseModel):
     triggered_by: str = ""
 
 def get_db_conn():
-    return sqlite3.connect(DB_PATH)
+    # Pooled per-thread connection (do not close); see src/db/connection.py
+    return get_connection(DB_PATH)
 
 @router.post("/feedback")
 async def submit_feedback(feedback: Feedback, request: Request):
+    conn = None
     try:
         conn = get_db_conn()
         cur = conn.cursor()
@@ -43,10 +46,12 @@ async def submit_feedback(feedback: Feedback, request: Request):
             (feedback.user_id, feedback.feedback_type, feedback.feedback_content)
         )
         conn.commit()
-        conn.close()
         print(f"Feedback received from {feedback.user_id}: {feedback.feedback_content}")
         return {"status": "success", "message": "Feedback received"}
     except Exception as e:
+        if conn is not None:
+            # Pooled connection outlives this request; drop the failed implicit transaction
+            conn.rollback()
         return error_response("UNKNOWN_ERROR", status.HTTP_500_INTERNAL_SERVER_ERROR, "An unknown error occurred.", request, {"error": str(e)})
 
 @router.get("/feedback/aggregate")
@@ -55,7 +60,6 @@ async def aggregate_feedback():
     cur = conn.cursor()
     cur.execute("SELECT feedback_content FROM feedback")
     rows = cur.fetchall()
-    conn.close()
     if not rows:
         return {"status": "success", "message": "No feedback available", "negative_count": 0, "total": 0}
     negative_keywords = ["error", "fail", "bad", "issue", "problem"]
@@ -75,6 +79,7 @@ async def aggregate_feedback():
 
 @router.post("/adaptation_event")
 async def log_adaptation_event(event: AdaptationEvent, request: Request):
+    conn = None
     try:
         conn = get_db_conn()
         cur = conn.cursor()
@@ -83,10 +88,12 @@ async def log_adaptation_event(event: AdaptationEvent, request: Request):
             (event.user_id, event.event_type, event.event_data, event.triggered_by)
         )
         conn.commit()
-        conn.close()
         # TODO: Trigger agent workflow update based on adaptation event
         return {"status": "success", "message": "Adaptation event logged"}
     except Exception as e:
+        if conn is not None:
+            # Pooled connection outlives this request; drop the failed implicit transaction
+            conn.rollback()
         return error_response("UNKNOWN_ERROR", status.HTTP_500_INTERNAL_SERVER_ERROR, "An unknown error occurred.", request, {"error": str(e)})
 
 @router.get("/adaptation_events/{user_id}")
@@ -95,7 +102,6 @@ async def get_adaptation_events(user_id: str):
     cur = conn.cursor()
     cur.execute("SELECT event_type, event_data, triggered_by, created_at FROM adaptation_events WHERE user_id = ?", (user_id,))
     rows = cur.fetchall()
-    conn.close()
     return [
         {
             "event_type": row[0],
@@ -0,0 +1,49 @@
+"""
+VERN Backend - LLM Router Admin API
+-----------------------------------
+Operational views over the LLM routing layer (src/mvp/llm_router.py).
+
+- GET /admin/llm/stats      all router metrics in one payload (cache, single-flight, scheduler queues, backend pools,
+                            last warmup)
+- POST /admin/llm/warmup    load configured models and prime persona prefixes now
+- GET /admin/llm/cache      response-cache metrics (hits by level, misses, evictions, hit rate)
+- DELETE /admin/llm/cache   drop every cached response (memory and SQLite tiers)
+"""
+
+from fastapi import APIRouter, Request, status
+
+from vern_backend.app.errors import error_response
+
+router = APIRouter(prefix="/admin/llm", tags=["admin"])
+
+
+@router.get("/stats")
+def llm_router_stats():
+    from src.mvp.llm_residency import last_warmup
+    from src.mvp.llm_router import llm_cache, llm_flights, llm_pools, llm_scheduler
+    return {"ok": True, "cache": llm_cache.stats(), "singleflight": llm_flights.stats(),
+            "scheduler": llm_scheduler.stats(), "backends": llm_pools.stats(), "warmup": dict(last_warmup)}
+
+
+@router.post("/warmup")
+async def llm_warmup():
+    from src.mvp.llm_residency import warmup
+    from src.mvp.llm_router import LLM_CONFIG, llm_pools
+    results = await warmup(LLM_CONFIG, llm_pools)
+    return {"ok": all(r["ok"] for r in results.values()), "results": results}
+
+
+@router.get("/cache")
+def llm_cache_stats():
+    from src.mvp.llm_router import llm_cache
+    return {"ok": True, **llm_cache.stats()}
+
+
+@router.delete("/cache")
+def clear_llm_cache(request: Request):
+    from src.mvp.llm_router import llm_cache
+    try:
+        llm_cache.clear()
+    except Exception as e:
+        return error_response("DB_UNAVAILABLE", status.HTTP_503_SERVICE_UNAVAILABLE, "Failed to clear LLM cache.", request, {"error": str(e)})
+    return {"ok": True, "cleared": True}
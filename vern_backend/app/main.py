@@ -13,12 +13,21 @@ from vern_backend.app.rag import RAGMemory
 # Added for deterministic admin_db_verify responses
 from starlette.responses import Response
 import json
+import os
+import sqlite3
+from typing import Any, Dict
 
 from src.mvp.agent_registry import orchestrate
 from src.mvp.privacy_agent import PrivacyAgent
 
+from vern_backend.app.db_path import get_sqlite_path
+
 memory = MemoryGraph()
-vector_memory = VectorMemory()
+# Persistent by default, beside the main database (index saved on shutdown, journaled in between)
+vector_memory = VectorMemory(
+    persistent=os.environ.get("VECTOR_MEMORY_PERSISTENT", "1") == "1",
+    db_path=os.environ.get("VECTOR_MEMORY_DB_PATH") or os.path.join(os.path.dirname(get_sqlite_path()), "vector_memory.sqlite"),
+)
 rag_memory = RAGMemory()
 privacy_agent = PrivacyAgent()
 
@@ -53,25 +62,94 @@ app.add_middleware(
 
 # Run lightweight SQLite migrations at startup
 try:
-    from src.db.migrate import migrate as run_db_migrations
-    run_db_migrations()
-    print("[startup] Applied pending DB migrations")
-    # DB startup verification: ensure agents table exists
-    from vern_backend.app.db_path import get_sqlite_path
-    import sqlite3
-    db_path = get_sqlite_path()
-    with sqlite3.connect(db_path) as _con:
-        cur = _con.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='agents'")
-        row = cur.fetchone()
-        if row and row[0] == "agents":
-            print("[startup] DB check: agents table OK")
-        else:
-            print("[startup][WARN] DB check: agents table MISSING")
+    from src.db.migrate import migrate as run_db_migrations, table_exists
+    applied = run_db_migrations()
+    if applied:
+        print(f"[startup] Applied {len(applied)} pending DB migrations")
+    else:
+        print("[startup] DB schema up to date")
+    # DB startup verification: ensure agents table exists (reuses the pooled connection)
+    if table_exists("agents"):
+        print("[startup] DB check: agents table OK")
+    else:
+        print("[startup][WARN] DB check: agents table MISSING")
     # TODO: Automate agent registration and plugin enable at startup if not present
     # Example: call registry.heartbeat("admin", "Admin", "[]", "{}") and set_tool_enabled("espeak-tts", True)
 except Exception as _e:
     print(f"[startup][WARN] DB migrations failed or unavailable: {_e}")
 
+@app.on_event("startup")
+def start_audit_maintenance():
+    # Background rotation/archival/VACUUM of the audit tables (see src/db/retention.py)
+    if os.environ.get("AUDIT_MAINTENANCE_ENABLED", "1") != "1":
+        return
+    try:
+        from src.db.retention import maintenance
+        maintenance.start()
+    except Exception as _e:
+        print(f"[startup][WARN] Audit maintenance unavailable: {_e}")
+
+@app.on_event("startup")
+def start_llm_health_checks():
+    # Periodic probes of every configured Ollama endpoint (see src/mvp/llm_pool.py)
+    try:
+        from src.mvp.llm_router import llm_pools
+        llm_pools.start()
+    except Exception as _e:
+        print(f"[startup][WARN] LLM health checks unavailable: {_e}")
+
+@app.on_event("startup")
+def warm_llm_models():
+    # Preload models and prime persona prefixes on the LLM bridge loop; startup does not wait for it
+    if os.environ.get("LLM_WARMUP", "1") != "1":
+        return
+    try:
+        from src.mvp.llm_residency import warmup
+        from src.mvp.llm_router import LLM_CONFIG, llm_bridge, llm_pools
+        if (LLM_CONFIG.get("residency") or {}).get("warmup", True):
+            llm_bridge.submit(warmup(LLM_CONFIG, llm_pools))
+    except Exception as _e:
+        print(f"[startup][WARN] LLM warmup unavailable: {_e}")
+
+@app.on_event("shutdown")
+def flush_db_on_shutdown():
+    # Drain pending heartbeats and the background audit-log writer, then release pooled SQLite connections
+    try:
+        from src.db.logger import shutdown_logger
+        from src.db.connection import close_all
+        from src.db.retention import maintenance
+        from vern_backend.app.registry_service import registry
+        maintenance.stop()
+        registry.stop()
+        shutdown_logger()
+        close_all()
+    except Exception as _e:
+        print(f"[shutdown][WARN] Failed to flush audit log: {_e}")
+
+@app.on_event("shutdown")
+def save_vector_index():
+    # Persist the embeddings index so the next start loads it instead of re-embedding the corpus
+    try:
+        vector_memory.save()
+    except Exception as _e:
+        print(f"[shutdown][WARN] Vector index save failed: {_e}")
+
+@app.on_event("shutdown")
+async def close_llm_clients():
+    # Release pooled keep-alive connections to Ollama (src/mvp/ollama_client.py)
+    try:
+        from src.mvp.llm_router import llm_bridge, llm_pools
+        from src.mvp.ollama_client import aclose_client, close_sync_client
+        llm_pools.stop()
+        if llm_bridge.running:
+            # The sync bridge loop has its own async client
+            llm_bridge.run(aclose_client())
+            llm_bridge.stop()
+        await aclose_client()
+        close_sync_client()
+    except Exception as _e:
+        print(f"[shutdown][WARN] Failed to close LLM clients: {_e}")
+
 # Simple health endpoint for connectivity checks
 @app.get("/health")
 def health():
@@ -201,6 +279,14 @@ app.include_router(privacy_policy_router)
 from vern_backend.app.feedback import router as feedback_router
 app.include_router(feedback_router)
 
+# Include audit log search/export API
+from vern_backend.app.audit import router as audit_router
+app.include_router(audit_router)
+
+# Include LLM router admin API (response cache metrics)
+from vern_backend.app.llm_admin import router as llm_admin_router
+app.include_router(llm_admin_router)
+
 @app.get("/")
 def read_root():
     return {"message": "VERN Backend API is running."}
@@ -254,15 +340,52 @@ def get_events(entity_id: str):
 class VectorMemoryAddRequest(BaseModel):
     docs: list
     metadata: list | None = None
+    ids: list | None = None  # existing ids are replaced (upsert)
+
+class VectorMemoryDeleteRequest(BaseModel):
+    ids: list
 
 @app.post("/vector_memory/add")
-def add_vector_documents(req: VectorMemoryAddRequest):
-    vector_memory.add_documents(req.docs, req.metadata)
-    return {"status": "ok"}
+def add_vector_documents(req: VectorMemoryAddRequest, request: Request):
+    try:
+        ids = vector_memory.add_documents(req.docs, req.metadata, ids=req.ids)
+    except ValueError as e:
+        return error_response("VALIDATION_ERROR", _status.HTTP_400_BAD_REQUEST, str(e), request)
+    return {"status": "ok", "ids": ids}
+
+@app.post("/vector_memory/delete")
+def delete_vector_documents(req: VectorMemoryDeleteRequest):
+    deleted = vector_memory.delete_documents(req.ids)
+    return {"status": "ok", "deleted": deleted}
+
+@app.get("/vector_memory/doc/{doc_id}")
+def get_vector_document(doc_id: str, request: Request):
+    doc = vector_memory.get_document(doc_id)
+    if doc is None:
+        return error_response("NOT_FOUND", _status.HTTP_404_NOT_FOUND, f"Document '{doc_id}' not found", request)
+    return doc
+
+def _memory_filters(filters: str | None, user_id: str | None, type: str | None) -> Dict[str, Any] | None:
+    """
+    Metadata filter from the `filters` query parameter (JSON, see vector_memory.compile_filter)
+    plus the user_id/type shorthands.
+    """
+    expr = json.loads(filters) if filters else {}
+    if not isinstance(expr, dict):
+        raise ValueError("filters must be a JSON object")
+    if user_id is not None:
+        expr["user_id"] = user_id
+    if type is not None:
+        expr["type"] = type
+    return expr or None
 
 @app.get("/vector_memory/query")
-def query_vector_memory(text: str, top_k: int = 5):
-    results = vector_memory.query(text, top_k)
+def query_vector_memory(request: Request, text: str, top_k: int = 5, filters: str | None = None,
+                        user_id: str | None = None, type: str | None = None):
+    try:
+        results = vector_memory.query(text, top_k, filters=_memory_filters(filters, user_id, type))
+    except ValueError as e:
+        return error_response("VALIDATION_ERROR", _status.HTTP_400_BAD_REQUEST, f"Invalid filters: {e}", request)
     return {"results": results}
 
 # --- RAG API ---
@@ -272,17 +395,25 @@ class RAGAddRequest(BaseModel):
     meta: list | None = None
 
 @app.post("/rag/add")
-def add_rag_documents(req: RAGAddRequest):
+def add_rag_documents(req: RAGAddRequest, request: Request):
     # Ensure meta is a list of dicts, fallback to [{}] per doc when None
     meta = req.meta if isinstance(req.meta, list) else None
     if meta is None:
         meta = [{} for _ in req.docs]
-    rag_memory.add_documents(req.docs, meta)
-    return {"status": "ok"}
+    try:
+        ids = rag_memory.add_documents(req.docs, meta)
+    except ValueError as e:
+        return error_response("VALIDATION_ERROR", _status.HTTP_400_BAD_REQUEST, str(e), request)
+    return {"status": "ok", "ids": ids}
 
 @app.get("/rag/query")
-def query_rag_memory(query: str, top_k: int = 5):
-    results = rag_memory.query(query, top_k)
+def query_rag_memory(request: Request, query: str, top_k: int = 5, filters: str | None = None,
+                     user_id: str | None = None, type: str | None = None, mode: str = "hybrid"):
+    # mode: hybrid (BM25 + dense, rank-fused), bm25 or dense
+    try:
+        results = rag_memory.query(query, top_k, filters=_memory_filters(filters, user_id, type), mode=mode)
+    except ValueError as e:
+        return error_response("VALIDATION_ERROR", _status.HTTP_400_BAD_REQUEST, f"Invalid query: {e}", request)
     return {"results": results}
 
 # /secure-status endpoint is now public
@@ -20,6 +20,8 @@ import datetime
 
 import logging
 
+from vern_backend.app.retrieval import bm25_scores
+
 class MemoryGraph:
     def __init__(self):
         # In-memory graph store (recommended default for resource-constrained setups)
@@ -69,18 +71,28 @@ class MemoryGraph:
     def rag_retrieve(self, query: str, top_k: int = 5) -> Dict[str, List[Any]]:
         """
         Semantic retrieval for RAG. Returns top_k relevant entities, relationships, and events.
+        Items sharing terms with the query are ranked by BM25; items that only contain the query
+        as a substring (e.g. "agent" in "agentic") follow.
         """
-        # TODO: Replace with embedding-based similarity for production.
-        # Simple keyword match (placeholder for semantic search)
-        entities = [eid for eid, props in self.entities.items() if query.lower() in str(props).lower()]
-        relationships = [rel for rel in self.relationships if query.lower() in str(rel).lower()]
-        events = [evt for evt in self.events if query.lower() in str(evt).lower()]
+        # TODO: Replace with embedding-based similarity for production (see rag.RAGMemory for hybrid retrieval).
+        entity_ids = list(self.entities)
+        entities = self._rank_matches(query, entity_ids, [str(self.entities[eid]) for eid in entity_ids])
+        relationships = self._rank_matches(query, self.relationships, [str(rel) for rel in self.relationships])
+        events = self._rank_matches(query, self.events, [str(evt) for evt in self.events])
         return {
             "entities": entities[:top_k],
             "relationships": relationships[:top_k],
             "events": events[:top_k]
         }
 
+    @staticmethod
+    def _rank_matches(query: str, items: List[Any], texts: List[str]) -> List[Any]:
+        scores = bm25_scores(query, texts)
+        needle = query.lower()
+        matched = [i for i, (text, score) in enumerate(zip(texts, scores)) if score > 0 or needle in text.lower()]
+        matched.sort(key=lambda i: -scores[i])
+        return [items[i] for i in matched]
+
     # Long-term log storage
     def add_log(self, log_entry: Dict[str, Any]) -> None:
         """
@@ -7,79 +7,94 @@ References:
 Provides document ingestion and retrieval for agentic RAG workflows.
 """
 
-try:
-    from txtai.embeddings import Embeddings
-    TXT_AI_AVAILABLE = True
-except ImportError:
-    Embeddings = None
-    TXT_AI_AVAILABLE = False
-
 import sqlite3
-import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
-class RAGMemory:
-    def __init__(self, path: str = "sentence-transformers/all-MiniLM-L6-v2", persistent: bool = False, db_path: str = "data/rag_memory.sqlite"):
-        self.docs = []
-        self.persistent = persistent
-        self.db_path = db_path
-        if TXT_AI_AVAILABLE:
-            self.embeddings = Embeddings({"path": path})
-        elif persistent:
-            self.embeddings = None
-            self._init_sqlite()
-        else:
-            self.embeddings = None
+from vern_backend.app.retrieval import fts_match_query, reciprocal_rank_fusion
+from vern_backend.app.vector_memory import VectorMemory, compile_filter
 
-    def _init_sqlite(self):
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        self.conn = sqlite3.connect(self.db_path)
-        self.conn.execute(
-            "CREATE TABLE IF NOT EXISTS documents (id INTEGER PRIMARY KEY, doc TEXT, meta TEXT)"
-        )
-        self.conn.commit()
+class RAGMemory(VectorMemory):
+    """
+    Document store for RAG: a VectorMemory (txtai, or the built-in NumPy engine without it) with its
+    own database, queried by hybrid retrieval.
 
-    def add_documents(self, docs: List[str], meta: List[Dict[str, Any]] = None):
-        if meta is None:
-            meta = [{} for _ in docs]
-        self.docs = docs
-        if TXT_AI_AVAILABLE and self.embeddings:
-            self.embeddings.index([(str(i), doc, m) for i, (doc, m) in enumerate(zip(docs, meta))])
-        elif self.persistent:
-            for doc, m in zip(docs, meta):
-                self.conn.execute(
-                    "INSERT INTO documents (doc, meta) VALUES (?, ?)",
-                    (doc, str(m))
-                )
+    An SQLite FTS5 index (documents_fts, external content kept in sync by triggers, so every
+    add/upsert/delete updates it incrementally) ranks documents by BM25; the vector index ranks them
+    by embedding similarity. Both rankings (`candidates` deep each) are merged by reciprocal-rank
+    fusion, so exact keywords (names, ids) stay precise while paraphrases are still found.
+    Results are {"content", "score"} dicts (plus "id", "metadata" and the per-retriever "scores").
+    """
+    def __init__(self, path: str = "sentence-transformers/all-MiniLM-L6-v2", persistent: bool = False, db_path: str = "data/rag_memory.sqlite",
+                 embedder: Any = None, ann: Optional[Dict[str, Any]] = None, candidates: int = 50,
+                 weights: Optional[Dict[str, float]] = None):
+        self.candidates = candidates
+        self.weights = dict(weights or {"bm25": 1.0, "dense": 1.0})
+        self.fts = False
+        super().__init__(path=path, persistent=persistent, db_path=db_path, embedder=embedder, ann=ann)
+
+    def _init_sqlite(self, db_path: Optional[str] = None):
+        super()._init_sqlite(db_path)
+        try:
+            created = not self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'documents_fts'").fetchone()
+            self.conn.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(doc, content='documents', content_rowid='rowid');
+                CREATE TRIGGER IF NOT EXISTS documents_fts_insert AFTER INSERT ON documents BEGIN
+                    INSERT INTO documents_fts(rowid, doc) VALUES (new.rowid, new.doc);
+                END;
+                CREATE TRIGGER IF NOT EXISTS documents_fts_delete AFTER DELETE ON documents BEGIN
+                    INSERT INTO documents_fts(documents_fts, rowid, doc) VALUES ('delete', old.rowid, old.doc);
+                END;
+                CREATE TRIGGER IF NOT EXISTS documents_fts_update AFTER UPDATE OF doc ON documents BEGIN
+                    INSERT INTO documents_fts(documents_fts, rowid, doc) VALUES ('delete', old.rowid, old.doc);
+                    INSERT INTO documents_fts(rowid, doc) VALUES (new.rowid, new.doc);
+                END;
+            """)
+            if created:
+                # Index documents stored before the FTS table existed
+                self.conn.execute("INSERT INTO documents_fts(documents_fts) VALUES ('rebuild')")
             self.conn.commit()
-        else:
-            raise RuntimeError("RAG vector store unavailable: txtai not installed and persistence not enabled.")
+            self.fts = True
+        except sqlite3.OperationalError as e:
+            print(f"[rag][WARN] SQLite FTS5 unavailable, RAG retrieval is dense-only: {e}")
 
-    def query(self, text: str, top_k: int = 5):
-        if TXT_AI_AVAILABLE and self.embeddings:
-            results = self.embeddings.search(text, top_k)
-            print("[RAG DEBUG] txtai search results:", results)
-            out = []
-            for r in results:
-                if isinstance(r, tuple) and len(r) == 2:
-                    idx, score = r
-                    try:
-                        doc_text = self.docs[int(idx)]
-                    except Exception:
-                        doc_text = str(idx)
-                    out.append({"content": doc_text, "score": score})
-                elif isinstance(r, str):
-                    out.append({"content": r, "score": None})
-                elif isinstance(r, float):
-                    out.append({"content": str(r), "score": r})
-                else:
-                    out.append({"content": str(r), "score": None})
-            return out
-        elif self.persistent:
-            cursor = self.conn.execute("SELECT doc FROM documents ORDER BY id ASC LIMIT ?", (top_k,))
-            return [{"content": row[0], "score": None} for row in cursor.fetchall()]
-        else:
-            raise RuntimeError("RAG vector store unavailable: txtai not installed and persistence not enabled.")
+    def add_documents(self, docs: List[str], meta: List[Dict[str, Any]] = None, ids: Optional[List[str]] = None) -> List[str]:
+        return super().add_documents(docs, meta, ids=ids)
+
+    def _bm25_hits(self, text: str, limit: int, filters: Optional[Dict[str, Any]] = None) -> List[tuple]:
+        match = fts_match_query(text)
+        if not self.fts or not match:
+            return []
+        where, params = compile_filter(filters)
+        # bm25() is lower-is-better; report it negated (higher is better, like the dense score)
+        rows = self.conn.execute(
+            "SELECT documents.id, -bm25(documents_fts) FROM documents_fts "
+            "JOIN documents ON documents.rowid = documents_fts.rowid "
+            f"WHERE documents_fts MATCH ? AND ({where}) ORDER BY bm25(documents_fts) LIMIT ?",
+            [match, *params, limit]
+        ).fetchall()
+        return [(doc_id, score) for doc_id, score in rows]
+
+    def query(self, text: str, top_k: int = 5, filters: Optional[Dict[str, Any]] = None, mode: str = "hybrid") -> List[Dict[str, Any]]:
+        """
+        Top-k documents for `text`; `mode` is "hybrid" (default), "bm25" or "dense".
+        """
+        if mode not in ("hybrid", "bm25", "dense"):
+            raise ValueError(f"Unknown retrieval mode: {mode}")
+        self._require_store()
+        depth = max(top_k, self.candidates)
+        with self._lock:
+            lexical = self._bm25_hits(text, depth, filters) if mode != "dense" else []
+            dense = self._dense_hits(text, depth, filters) if mode != "bm25" else []
+            scores = {"bm25": dict(lexical), "dense": {str(doc_id): score for doc_id, score in dense}}
+            fused = reciprocal_rank_fusion({
+                "bm25": [doc_id for doc_id, _ in lexical],
+                "dense": [str(doc_id) for doc_id, _ in dense],
+            }, self.weights)[:top_k]
+            results = self._results(fused)
+        for result in results:
+            result["scores"] = {name: found.get(result["id"]) for name, found in scores.items()}
+        return results
 
 class NoOpRAGMemory:
     """
@@ -1,9 +1,16 @@
+import atexit
+import heapq
+import itertools
+import json
 import os
-import sqlite3
 import threading
 import time
-from dataclasses import dataclass, asdict
-from typing import Dict, List, Optional, Tuple
+from bisect import bisect_right
+from collections import deque
+from dataclasses import dataclass, asdict, replace
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from src.db.connection import ensure_schema, get_connection
 
 # Persistence path centralized via helper (env SQLITE_DB_PATH or default './data/vern.sqlite')
 from vern_backend.app.db_path import get_sqlite_path
@@ -13,6 +20,33 @@ DB_PATH = os.environ.get("SQLITE_DB_PATH") or get_sqlite_path()
 # Dual thresholds for agent TTL/heartbeat
 DEFAULT_ONLINE_TTL = int(os.environ.get("AGENT_ONLINE_TTL", "60"))    # online if age < 60s
 DEFAULT_OFFLINE_TTL = int(os.environ.get("AGENT_OFFLINE_TTL", "300")) # offline if age ≥ 300s
+# Heartbeats are write-behind: cached immediately, persisted in coalesced batches
+HEARTBEAT_FLUSH_INTERVAL_S = float(os.environ.get("AGENT_HEARTBEAT_FLUSH_INTERVAL_S", "2.0"))
+# Change feed: number of recent events kept for resuming /agents/stream clients
+FEED_BUFFER = int(os.environ.get("AGENT_FEED_BUFFER", "1000"))
+
+AGENTS_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS agents (
+    name TEXT PRIMARY KEY,
+    cluster TEXT,
+    status TEXT,
+    capabilities TEXT,
+    last_seen REAL,
+    meta TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_agents_cluster ON agents(cluster);
+"""
+
+UPSERT_AGENT_SQL = """
+INSERT INTO agents (name, cluster, status, capabilities, last_seen, meta)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(name) DO UPDATE SET
+    cluster=excluded.cluster,
+    status=excluded.status,
+    capabilities=COALESCE(excluded.capabilities, agents.capabilities),
+    last_seen=excluded.last_seen,
+    meta=COALESCE(excluded.meta, agents.meta)
+"""
 
 
 @dataclass
@@ -25,47 +59,153 @@ class AgentRecord:
     meta: Optional[str] = None          # JSON/text metadata
 
 
+def _decode_json(raw: Optional[str]) -> Any:
+    if raw is None:
+        return None
+    try:
+        return json.loads(raw)
+    except Exception:
+        return raw  # fall back to raw string
+
+
+def capability_keys(capabilities: Any) -> FrozenSet[str]:
+    """
+    Normalized capability names for indexing: list items (or their "name"), dict keys, or
+    comma-separated text. Matching is case-insensitive.
+    """
+    if capabilities is None:
+        return frozenset()
+    if isinstance(capabilities, dict):
+        items: Iterable[Any] = capabilities.keys()
+    elif isinstance(capabilities, list):
+        items = [c.get("name") if isinstance(c, dict) else c for c in capabilities]
+    else:
+        items = str(capabilities).split(",")
+    return frozenset(str(c).strip().lower() for c in items if c is not None and str(c).strip())
+
+
+class _Entry:
+    """
+    Cached view of one stored record, built once per write. JSON fields are decoded up front and
+    the per-status AgentRecord copies / API payloads are memoized, so reads never copy or parse.
+    Payload dicts are shared between callers and must be treated as read-only.
+    """
+    __slots__ = ("record", "capabilities", "meta", "capability_keys", "_records", "_payloads")
+
+    def __init__(self, rec: AgentRecord, prev: Optional["_Entry"] = None):
+        self.record = rec
+        if prev is not None and prev.record.capabilities == rec.capabilities and prev.record.meta == rec.meta:
+            # Heartbeats usually resend identical JSON; reuse the decoded values
+            self.capabilities, self.meta = prev.capabilities, prev.meta
+            self.capability_keys = prev.capability_keys
+        else:
+            self.capabilities = _decode_json(rec.capabilities)
+            self.meta = _decode_json(rec.meta)
+            self.capability_keys = capability_keys(self.capabilities)
+        self._records: Dict[str, AgentRecord] = {rec.status: rec}
+        self._payloads: Dict[str, Dict[str, Any]] = {}
+
+    def as_status(self, status: str) -> AgentRecord:
+        rec = self._records.get(status)
+        if rec is None:
+            rec = self._records[status] = replace(self.record, status=status)
+        return rec
+
+    def payload(self, status: str) -> Dict[str, Any]:
+        d = self._payloads.get(status)
+        if d is None:
+            rec = self.record
+            d = self._payloads[status] = {
+                "name": rec.name,
+                "cluster": rec.cluster,
+                "status": status,
+                "capabilities": self.capabilities,
+                "last_seen": float(rec.last_seen) if rec.last_seen is not None else None,
+                "meta": self.meta,
+            }
+        return d
+
+
+class _Partition:
+    """
+    Entries with a last_seen sorted ascending (keys holds the timestamps for bisection),
+    plus entries that were never seen and keep their stored status.
+    """
+    __slots__ = ("entries", "keys", "unseen")
+
+    def __init__(self, entries: List[_Entry]):
+        seen = sorted((e for e in entries if e.record.last_seen is not None), key=lambda e: float(e.record.last_seen))
+        self.entries = seen
+        self.keys = [float(e.record.last_seen) for e in seen]
+        self.unseen = [e for e in entries if e.record.last_seen is None]
+
+
+class _Snapshot:
+    """
+    Immutable copy-on-write view of the registry, rebuilt lazily after writes.
+    """
+    __slots__ = ("version", "all", "clusters")
+
+    def __init__(self, version: int, entries: List[_Entry]):
+        self.version = version
+        self.all = _Partition(entries)
+        grouped: Dict[str, List[_Entry]] = {}
+        for e in entries:
+            grouped.setdefault(e.record.cluster, []).append(e)
+        self.clusters = {cluster: _Partition(group) for cluster, group in grouped.items()}
+
+
 class AgentRegistry:
     """
     In-memory cache with optional SQLite persistence for agent status/metadata.
     Thread-safe with a simple lock. Intended to be used as a singleton per-process.
+
+    Heartbeats only touch the cache and a dirty map (latest record per agent); a daemon
+    thread upserts the dirty records every flush_interval seconds in one transaction.
+    flush() forces a write; stop() performs the final flush (atexit and backend shutdown).
+
+    Reads are lock-free: writers bump a version and the next reader rebuilds an immutable
+    snapshot ordered by last_seen, so online/stale/offline come from two bisections.
+
+    Change feed: join/update/status/leave events get increasing sequence numbers and are kept
+    in a bounded buffer (changes(since) to resume). Plain heartbeats from an online agent emit
+    nothing; TTL transitions come from a deadline heap checked by sweep_ttl().
     """
-    def __init__(self, db_path: str = DB_PATH, online_ttl: int = DEFAULT_ONLINE_TTL, offline_ttl: int = DEFAULT_OFFLINE_TTL):
+    def __init__(self, db_path: str = DB_PATH, online_ttl: int = DEFAULT_ONLINE_TTL, offline_ttl: int = DEFAULT_OFFLINE_TTL,
+                 flush_interval: float = HEARTBEAT_FLUSH_INTERVAL_S):
         self.db_path = db_path
         # Ensure sane ordering of thresholds
         self.online_ttl = max(1, int(online_ttl))
         self.offline_ttl = max(self.online_ttl + 1, int(offline_ttl))
+        self.flush_interval = max(0.05, float(flush_interval))
         self._lock = threading.RLock()
-        self._agents: Dict[str, AgentRecord] = {}
+        self._agents: Dict[str, _Entry] = {}
+        # Inverted indexes (capability / cluster -> names); sets are replaced, never mutated,
+        # so lock-free readers can iterate them safely
+        self._by_capability: Dict[str, FrozenSet[str]] = {}
+        self._by_cluster: Dict[str, FrozenSet[str]] = {}
+        self._version = 0
+        self._snapshot = _Snapshot(0, [])
+        # Change feed state (guarded by self._lock)
+        self._seq = 0
+        self._feed: "deque[Dict[str, Any]]" = deque(maxlen=max(1, FEED_BUFFER))
+        self._published: Dict[str, str] = {}          # last status announced per agent
+        self._deadlines: List[Tuple[float, str, int]] = []  # heap of (due, name, token)
+        self._scheduled: Dict[str, int] = {}          # name -> token of its live heap item
+        self._tokens = itertools.count()
+        # Write-behind state: records awaiting persistence, serialized by _flush_lock
+        self._dirty: Dict[str, AgentRecord] = {}
+        self._flush_lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        self._flusher_pid: Optional[int] = None
+        self._stop_event = threading.Event()
         self._ensure_db()
 
     # --- SQLite setup & helpers ---
 
-    def _ensure_parent_dir(self, path: str):
-        parent = os.path.dirname(path or "")
-        if parent and not os.path.exists(parent):
-            os.makedirs(parent, exist_ok=True)
-
     def _ensure_db(self):
-        self._ensure_parent_dir(self.db_path)
-        con = sqlite3.connect(self.db_path)
-        try:
-            con.execute(
-                """
-                CREATE TABLE IF NOT EXISTS agents (
-                    name TEXT PRIMARY KEY,
-                    cluster TEXT,
-                    status TEXT,
-                    capabilities TEXT,
-                    last_seen REAL,
-                    meta TEXT
-                )
-                """
-            )
-            con.execute("CREATE INDEX IF NOT EXISTS idx_agents_cluster ON agents(cluster)")
-            con.commit()
-        finally:
-            con.close()
+        # Schema runs once per DB path for the whole process (shared pooled connection manager)
+        ensure_schema(self.db_path, "agents", AGENTS_SCHEMA_SQL)
         # Warm in-memory cache from DB
         self._load_from_db()
 
@@ -74,6 +214,11 @@ class AgentRegistry:
             cur = con.execute("SELECT name, cluster, status, capabilities, last_seen, meta FROM agents")
             rows = cur.fetchall()
             self._agents.clear()
+            self._by_capability.clear()
+            self._by_cluster.clear()
+            self._published.clear()
+            self._deadlines.clear()
+            self._scheduled.clear()
             for name, cluster, status, capabilities, last_seen, meta in rows:
                 rec = AgentRecord(
                     name=name,
@@ -83,88 +228,363 @@ class AgentRegistry:
                     last_seen=last_seen,
                     meta=meta,
                 )
-                # Cache raw; status is derived on read via _apply_ttl
-                self._agents[name] = rec
+                # Cache raw; status is derived on read from last_seen
+                self._put(_Entry(rec), publish=False)
+            self._version += 1
 
     def _connect(self):
-        return sqlite3.connect(self.db_path)
+        # Pooled per-thread connection; `with con:` commits but does not close it
+        return get_connection(self.db_path)
 
     # --- Public API ---
 
     def heartbeat(self, name: str, cluster: str, capabilities: Optional[str] = None, meta: Optional[str] = None) -> AgentRecord:
         """
         Upsert an agent on heartbeat, setting status to 'online' and updating last_seen.
+        The cache is updated immediately; the DB write is deferred to the next flush.
         """
         ts = time.time()
-        rec = AgentRecord(name=name, cluster=cluster, status="online", capabilities=capabilities, last_seen=ts, meta=meta)
-        with self._connect() as con, self._lock:
-            con.execute(
-                """
-                INSERT INTO agents (name, cluster, status, capabilities, last_seen, meta)
-                VALUES (?, ?, ?, ?, ?, ?)
-                ON CONFLICT(name) DO UPDATE SET
-                    cluster=excluded.cluster,
-                    status=excluded.status,
-                    capabilities=COALESCE(excluded.capabilities, agents.capabilities),
-                    last_seen=excluded.last_seen,
-                    meta=COALESCE(excluded.meta, agents.meta)
-                """,
-                (rec.name, rec.cluster, rec.status, rec.capabilities, rec.last_seen, rec.meta),
-            )
-            con.commit()
-            self._agents[rec.name] = rec
+        with self._lock:
+            prev = self._agents.get(name)
+            # Mirror the DB upsert: omitted capabilities/meta keep their previous values
+            if prev is not None:
+                capabilities = capabilities if capabilities is not None else prev.record.capabilities
+                meta = meta if meta is not None else prev.record.meta
+            rec = AgentRecord(name=name, cluster=cluster, status="online", capabilities=capabilities, last_seen=ts, meta=meta)
+            self._put(_Entry(rec, prev))
+            self._dirty[rec.name] = rec
+            self._version += 1
+        self._ensure_flusher()
         return rec
 
+    # --- Write-behind flushing ---
+
+    def _ensure_flusher(self):
+        # Restart after fork (worker processes inherit the object but not the thread)
+        if self._flusher is not None and self._flusher.is_alive() and self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher is not None and self._flusher.is_alive() and self._flusher_pid == os.getpid():
+                return
+            self._stop_event.clear()
+            self._flusher_pid = os.getpid()
+            self._flusher = threading.Thread(target=self._run_flusher, name="vern-registry-flusher", daemon=True)
+            self._flusher.start()
+
+    def _run_flusher(self):
+        while not self._stop_event.wait(self.flush_interval):
+            try:
+                self.sweep_ttl()
+                self.flush()
+            except Exception as e:
+                print(f"[registry][WARN] Heartbeat flush failed: {e}")
+
+    def flush(self) -> int:
+        """
+        Persist pending heartbeats in one transaction. Returns the number of agents written.
+        """
+        with self._flush_lock:
+            with self._lock:
+                if not self._dirty:
+                    return 0
+                batch, self._dirty = self._dirty, {}
+            rows = [(r.name, r.cluster, r.status, r.capabilities, r.last_seen, r.meta) for r in batch.values()]
+            try:
+                with self._connect() as con:
+                    con.executemany(UPSERT_AGENT_SQL, rows)
+            except Exception:
+                # Put records back unless a newer heartbeat (or a delete) superseded them
+                with self._lock:
+                    for name, rec in batch.items():
+                        entry = self._agents.get(name)
+                        if entry is not None and entry.record is rec and name not in self._dirty:
+                            self._dirty[name] = rec
+                raise
+            return len(rows)
+
+    def pending_writes(self) -> int:
+        with self._lock:
+            return len(self._dirty)
+
+    def stop(self):
+        """
+        Stop the flusher thread and write any pending heartbeats.
+        """
+        self._stop_event.set()
+        thread = self._flusher
+        if thread is not None and thread.is_alive():
+            thread.join(max(1.0, self.flush_interval * 2))
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"[registry][WARN] Final heartbeat flush failed: {e}")
+
     def set_status(self, name: str, status: str):
         """
         Manually set an agent's status (online/offline/stale). Updates DB and cache.
         """
+        self.flush()
         with self._connect() as con, self._lock:
             con.execute("UPDATE agents SET status=? WHERE name=?", (status, name))
             con.commit()
-            if name in self._agents:
-                self._agents[name].status = status
+            entry = self._agents.get(name)
+            if entry is not None:
+                self._put(_Entry(replace(entry.record, status=status), entry))
+                self._version += 1
 
     def get(self, name: str) -> Optional[AgentRecord]:
-        with self._lock:
-            rec = self._agents.get(name)
-            if not rec:
-                return None
-            return self._apply_ttl(rec)
+        entry = self._agents.get(name)
+        if entry is None:
+            return None
+        return entry.as_status(self._derive_status(entry.record, time.time()))
 
     def list(self, cluster: Optional[str] = None) -> List[AgentRecord]:
+        """
+        Agents with TTL-derived status, most recently seen first.
+        """
+        return [entry.as_status(status) for entry, status in self._view(cluster)]
+
+    def status_payloads(self, cluster: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Same order as list(), as JSON-ready dicts with capabilities/meta already decoded.
+        """
+        return [entry.payload(status) for entry, status in self._view(cluster)]
+
+    def status_counts(self, cluster: Optional[str] = None) -> Dict[str, int]:
+        part = self._partition(cluster)
+        counts = {"online": 0, "stale": 0, "offline": 0}
+        if part is None:
+            return counts
+        off, on = self._bounds(part, time.time())
+        counts["offline"], counts["stale"], counts["online"] = off, on - off, len(part.keys) - on
+        for entry in part.unseen:
+            counts[entry.record.status] = counts.get(entry.record.status, 0) + 1
+        return counts
+
+    def find(self, capability: Optional[str] = None, cluster: Optional[str] = None,
+             status: Optional[str] = None) -> List[AgentRecord]:
+        """
+        Agents matching every given filter, most recently seen first. Candidates come from the
+        inverted indexes, so cost is proportional to the matches, not the registry size.
+        """
+        return [entry.as_status(st) for entry, st in self._find(capability, cluster, status)]
+
+    def find_payloads(self, capability: Optional[str] = None, cluster: Optional[str] = None,
+                      status: Optional[str] = None) -> List[Dict[str, Any]]:
+        return [entry.payload(st) for entry, st in self._find(capability, cluster, status)]
+
+    def _find(self, capability: Optional[str], cluster: Optional[str], status: Optional[str]) -> List[Tuple[_Entry, str]]:
+        candidates: List[FrozenSet[str]] = []
+        if capability:
+            candidates.append(self._by_capability.get(capability.strip().lower(), frozenset()))
+        if cluster:
+            candidates.append(self._by_cluster.get(cluster, frozenset()))
+        if not candidates:
+            names: Iterable[str] = list(self._agents)
+        else:
+            candidates.sort(key=len)
+            names = candidates[0].intersection(*candidates[1:]) if len(candidates) > 1 else candidates[0]
+        now = time.time()
+        matches: List[Tuple[_Entry, str]] = []
+        for name in names:
+            entry = self._agents.get(name)
+            if entry is None:
+                continue
+            st = self._derive_status(entry.record, now)
+            if status is None or st == status:
+                matches.append((entry, st))
+        matches.sort(key=lambda m: m[0].record.last_seen or 0.0, reverse=True)
+        return matches
+
+    # --- Change feed ---
+
+    @property
+    def current_seq(self) -> int:
+        return self._seq
+
+    def changes(self, since: int) -> Tuple[List[Dict[str, Any]], int, bool]:
+        """
+        Events with seq > since, the latest seq, and whether the client must resync from a
+        snapshot because `since` fell out of the buffer (or comes from another process).
+        """
+        self.sweep_ttl()
+        with self._lock:
+            latest = self._seq
+            oldest = self._feed[0]["seq"] if self._feed else latest + 1
+            if since > latest or since < oldest - 1:
+                return [], latest, True
+            start = len(self._feed) - (latest - since)
+            return list(itertools.islice(self._feed, start, None)), latest, False
+
+    def snapshot(self) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Current seq plus status payloads consistent with it (starting point for changes()).
+        """
+        self.sweep_ttl()
         with self._lock:
-            records = list(self._agents.values())
-            if cluster:
-                records = [r for r in records if r.cluster == cluster]
-            # Apply TTL on the fly
-            return [self._apply_ttl(r) for r in records]
+            return self._seq, self.status_payloads()
 
-    def _apply_ttl(self, rec: AgentRecord) -> AgentRecord:
+    def sweep_ttl(self, now: Optional[float] = None):
+        """
+        Publish online->stale->offline transitions whose deadline has passed.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            heap = self._deadlines
+            while heap and heap[0][0] <= now:
+                _, name, token = heapq.heappop(heap)
+                if self._scheduled.get(name) != token:
+                    continue  # superseded
+                del self._scheduled[name]
+                entry = self._agents.get(name)
+                if entry is None:
+                    continue
+                status = self._derive_status(entry.record, now)
+                if status != self._published.get(name):
+                    self._published[name] = status
+                    self._publish("status", name, entry.payload(status))
+                # Heartbeats since the deadline was set just push it back
+                self._schedule(entry, now)
+
+    def _publish(self, kind: str, name: str, agent: Optional[Dict[str, Any]]):
+        self._seq += 1
+        self._feed.append({"seq": self._seq, "type": kind, "name": name, "agent": agent})
+
+    def _schedule(self, entry: _Entry, now: float):
+        rec = entry.record
         if rec.last_seen is None:
-            return rec
-        age = time.time() - float(rec.last_seen)
-        status: str
-        if age < self.online_ttl:
-            status = "online"
-        elif age < self.offline_ttl:
-            status = "stale"
+            return
+        status = self._derive_status(rec, now)
+        if status == "online":
+            due = float(rec.last_seen) + self.online_ttl
+        elif status == "stale":
+            due = float(rec.last_seen) + self.offline_ttl
+        else:
+            return
+        token = next(self._tokens)
+        self._scheduled[rec.name] = token
+        heapq.heappush(self._deadlines, (due, rec.name, token))
+
+    def _track(self, entry: _Entry, prev: Optional[_Entry], publish: bool):
+        name = entry.record.name
+        now = time.time()
+        status = self._derive_status(entry.record, now)
+        if publish:
+            if prev is None:
+                self._publish("join", name, entry.payload(status))
+            elif (prev.record.cluster, prev.record.capabilities, prev.record.meta, prev.record.status) != (
+                entry.record.cluster, entry.record.capabilities, entry.record.meta, entry.record.status
+            ):
+                self._publish("update", name, entry.payload(status))
+            elif self._published.get(name) != status:
+                self._publish("status", name, entry.payload(status))
+        self._published[name] = status
+        if name not in self._scheduled:
+            self._schedule(entry, now)
+
+    # --- Index maintenance (callers hold self._lock) ---
+
+    def _put(self, entry: _Entry, publish: bool = True):
+        name = entry.record.name
+        prev = self._agents.get(name)
+        self._agents[name] = entry
+        self._track(entry, prev, publish)
+        old_caps = prev.capability_keys if prev is not None else frozenset()
+        old_cluster = prev.record.cluster if prev is not None else None
+        for cap in old_caps - entry.capability_keys:
+            self._unindex(self._by_capability, cap, name)
+        for cap in entry.capability_keys - old_caps:
+            self._by_capability[cap] = self._by_capability.get(cap, frozenset()) | {name}
+        if old_cluster != entry.record.cluster:
+            if old_cluster is not None:
+                self._unindex(self._by_cluster, old_cluster, name)
+            self._by_cluster[entry.record.cluster] = self._by_cluster.get(entry.record.cluster, frozenset()) | {name}
+
+    def _remove(self, name: str):
+        prev = self._agents.pop(name, None)
+        self._published.pop(name, None)
+        self._scheduled.pop(name, None)
+        if prev is None:
+            return
+        for cap in prev.capability_keys:
+            self._unindex(self._by_capability, cap, name)
+        self._unindex(self._by_cluster, prev.record.cluster, name)
+
+    @staticmethod
+    def _unindex(index: Dict[str, FrozenSet[str]], key: str, name: str):
+        remaining = index.get(key, frozenset()) - {name}
+        if remaining:
+            index[key] = remaining
         else:
-            status = "offline"
-        # Return a copy with derived status
-        return AgentRecord(**{**asdict(rec), "status": status})
+            index.pop(key, None)
+
+    # --- Read path (snapshot + bisection) ---
+
+    def _current(self) -> _Snapshot:
+        snap = self._snapshot
+        if snap.version == self._version:
+            return snap
+        with self._lock:
+            if self._snapshot.version != self._version:
+                self._snapshot = _Snapshot(self._version, list(self._agents.values()))
+            return self._snapshot
+
+    def _partition(self, cluster: Optional[str]) -> Optional[_Partition]:
+        snap = self._current()
+        return snap.clusters.get(cluster) if cluster else snap.all
+
+    def _bounds(self, part: _Partition, now: float) -> Tuple[int, int]:
+        # keys[:off] are offline (age >= offline_ttl), keys[off:on] stale, keys[on:] online
+        off = bisect_right(part.keys, now - self.offline_ttl)
+        on = bisect_right(part.keys, now - self.online_ttl, lo=off)
+        return off, on
+
+    def _view(self, cluster: Optional[str]) -> List[Tuple[_Entry, str]]:
+        part = self._partition(cluster)
+        if part is None:
+            return []
+        off, on = self._bounds(part, time.time())
+        entries = part.entries
+        view: List[Tuple[_Entry, str]] = []
+        for lo, hi, status in ((on, len(entries), "online"), (off, on, "stale"), (0, off, "offline")):
+            view.extend((entries[i], status) for i in range(hi - 1, lo - 1, -1))
+        view.extend((entry, entry.record.status) for entry in part.unseen)
+        return view
+
+    def _derive_status(self, rec: AgentRecord, now: float) -> str:
+        if rec.last_seen is None:
+            return rec.status
+        age = now - float(rec.last_seen)
+        if age < self.online_ttl:
+            return "online"
+        if age < self.offline_ttl:
+            return "stale"
+        return "offline"
 
     def delete(self, name: str):
-        with self._connect() as con, self._lock:
+        with self._flush_lock, self._connect() as con, self._lock:
             con.execute("DELETE FROM agents WHERE name=?", (name,))
             con.commit()
-            self._agents.pop(name, None)
+            if name in self._agents:
+                self._publish("leave", name, None)
+            self._remove(name)
+            self._dirty.pop(name, None)
+            self._version += 1
 
     def clear(self):
-        with self._connect() as con, self._lock:
+        with self._flush_lock, self._connect() as con, self._lock:
             con.execute("DELETE FROM agents")
             con.commit()
+            for name in list(self._agents):
+                self._publish("leave", name, None)
             self._agents.clear()
+            self._by_capability.clear()
+            self._by_cluster.clear()
+            self._published.clear()
+            self._deadlines.clear()
+            self._scheduled.clear()
+            self._dirty.clear()
+            self._version += 1
 
     # Convenience for API JSON
     @staticmethod
@@ -177,4 +597,5 @@ class AgentRegistry:
 
 
 # Singleton instance
-registry = AgentRegistry()
\ No newline at end of file
+registry = AgentRegistry()
+atexit.register(registry.stop)
\ No newline at end of file
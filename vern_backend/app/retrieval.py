@@ -0,0 +1,71 @@
+"""
+VERN Retrieval Helpers (lexical ranking and rank fusion)
+
+- fts_match_query(text): a safe SQLite FTS5 MATCH expression (any query term, each quoted).
+- bm25_scores(query, texts): in-process Okapi BM25 for small in-memory collections.
+- reciprocal_rank_fusion(rankings): merge ranked id lists (e.g. BM25 and dense) by
+  sum(weight / (k + rank)), so a document ranked well by either retriever surfaces and one
+  ranked well by both wins, without having to calibrate their raw scores against each other.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence
+
+RRF_K = 60
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TERM = re.compile(r"\w+")
+
+
+def terms(text: str) -> List[str]:
+    return _TERM.findall(text.lower())
+
+
+def fts_match_query(text: str) -> Optional[str]:
+    """
+    FTS5 query matching documents that contain any term of `text` (None if it has no terms).
+    Terms are quoted, so user input cannot inject FTS operators.
+    """
+    unique = list(dict.fromkeys(terms(text)))
+    if not unique:
+        return None
+    return " OR ".join(f'"{term}"' for term in unique)
+
+
+def bm25_scores(query: str, texts: Sequence[str]) -> List[float]:
+    """
+    BM25 score of each text for `query` (0.0 for texts sharing no term with it).
+    """
+    query_terms = set(terms(query))
+    docs = [Counter(terms(text)) for text in texts]
+    if not query_terms or not docs:
+        return [0.0] * len(docs)
+    avg_len = sum(sum(doc.values()) for doc in docs) / len(docs) or 1.0
+    df = {term: sum(1 for doc in docs if term in doc) for term in query_terms}
+    scores = []
+    for doc in docs:
+        length = sum(doc.values())
+        score = 0.0
+        for term in query_terms:
+            tf = doc.get(term, 0)
+            if tf:
+                idf = math.log(1 + (len(docs) - df[term] + 0.5) / (df[term] + 0.5))
+                score += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_len))
+        scores.append(score)
+    return scores
+
+
+def reciprocal_rank_fusion(rankings: Dict[str, Iterable[str]], weights: Optional[Dict[str, float]] = None,
+                           k: int = RRF_K) -> List[tuple]:
+    """
+    [(id, fused score)] best first, from named rankings (best first). Ties keep first-seen order.
+    """
+    fused: Dict[str, float] = {}
+    for name, ranking in rankings.items():
+        weight = (weights or {}).get(name, 1.0)
+        for rank, doc_id in enumerate(ranking, start=1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + weight / (k + rank)
+    return sorted(fused.items(), key=lambda item: -item[1])
@@ -4,6 +4,7 @@ import sqlite3
 import os
 
 from vern_backend.app.errors import error_response
+from src.db.connection import get_connection
 
 try:
     from vern_backend.app.db_path import get_sqlite_path
@@ -20,7 +21,8 @@ class UserProfile(BaseModel):
     profile_data: dict = {}
 
 def get_db_conn():
-    return sqlite3.connect(DB_PATH)
+    # Pooled per-thread connection (do not close); see src/db/connection.py
+    return get_connection(DB_PATH)
 
 @router.get("/{user_id}", response_model=UserProfile)
 def get_user_profile(user_id: str):
@@ -28,7 +30,6 @@ def get_user_profile(user_id: str):
     cur = conn.cursor()
     cur.execute("SELECT user_id, username, preferences FROM user_profiles WHERE user_id = ?", (user_id,))
     row = cur.fetchone()
-    conn.close()
     if row:
         return UserProfile(user_id=row[0], username=row[1], preferences=row[2], profile_data={})
     # TODO: Load profile_data from preferences JSON if needed
@@ -44,9 +45,9 @@ def create_user(profile: UserProfile, request: Request):
         cur.execute("INSERT INTO user_profiles (user_id, preferences) VALUES (?, ?)", (profile.user_id, str(profile.profile_data)))
         conn.commit()
     except sqlite3.IntegrityError:
-        conn.close()
+        # Pooled connection outlives this request; drop the failed implicit transaction
+        conn.rollback()
         return error_response("CONFLICT", status.HTTP_409_CONFLICT, f"user_id '{profile.user_id}' already exists", request)
-    conn.close()
     return {"status": "created", "user_id": profile.user_id}
 
 @router.put("/{user_id}")
@@ -55,7 +56,6 @@ def update_user_profile(user_id: str, profile: UserProfile, request: Request):
     cur = conn.cursor()
     cur.execute("UPDATE user_profiles SET preferences = ? WHERE user_id = ?", (str(profile.profile_data), user_id))
     conn.commit()
-    conn.close()
     return {"status": "updated", "user_id": user_id}
 
 @router.get("/")
@@ -64,7 +64,6 @@ def list_user_profiles():
     cur = conn.cursor()
     cur.execute("SELECT user_id, username, preferences FROM user_profiles")
     rows = cur.fetchall()
-    conn.close()
     return [UserProfile(user_id=row[0], username=row[1], preferences=row[2], profile_data={}) for row in rows]
 
 # TODO: Add delete endpoint and improve profile_data handling.
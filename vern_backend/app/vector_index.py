@@ -0,0 +1,481 @@
+"""
+VERN Vector Index (built-in NumPy engine)
+
+Dependency-light semantic search used by VectorMemory/RAGMemory when txtai is not installed.
+
+- Embeddings: a pluggable local embedding function. The default is a hashing-trick embedder
+  (word unigrams/bigrams and character trigrams hashed into a fixed number of dimensions), which
+  needs nothing beyond NumPy. A small local model (sentence-transformers) can be used by name.
+- Storage: float32 unit vectors in a memory-mapped file (<index dir>/vectors.f32) that grows by
+  doubling, so an add writes only its own rows; ids.json maps rows to document ids and is
+  written by save().
+- Search: cosine similarity (dot product of unit vectors) over blocks of the matrix, with
+  top-k per block via argpartition, so memory use stays bounded for large corpora.
+- ANN (`ann`, VECTOR_ANN env): from `min_rows` documents on, an IVF index (spherical k-means
+  coarse quantizer, inverted lists of rows) limits the scan to the `nprobe` nearest lists.
+  Rows changed since the IVF was built are always scanned exactly, and once they exceed
+  `rebuild_fraction` of it a new IVF is built on a background thread and swapped in;
+  queries never wait for a build. Recall/latency trade-off: nprobe (and nlist).
+  The IVF is saved with the index (ivf.npz); see scripts/bench_vector_index.py for recall@k/QPS.
+
+The engine exposes the subset of the txtai Embeddings API that VectorMemory uses
+(upsert/delete/search/save/load/count), so both engines sit behind the same interface, plus
+search_ids() for metadata-filtered queries.
+"""
+
+import json
+import os
+import re
+import threading
+import zlib
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_DIM = 384
+SEARCH_BLOCK_ROWS = 65536
+
+# nlist 0 = sqrt(rows); train_size 0 = 64 rows per list
+ANN_DEFAULTS = {"type": "ivf", "nlist": 0, "nprobe": 16, "min_rows": 20000, "rebuild_fraction": 0.2,
+                "iterations": 10, "train_size": 0, "ef": 64, "m": 16}
+
+_TOKEN = re.compile(r"\w+")
+
+
+class HashingEmbedder:
+    """
+    Hashing-trick text embedder: sparse features hashed (crc32, stable across processes) into `dim`
+    signed buckets, sublinear term frequency, L2-normalized.
+    """
+    def __init__(self, dim: int = DEFAULT_DIM):
+        self.dim = int(dim)
+        self.name = f"hashing-{self.dim}"
+
+    def features(self, text: str) -> List[str]:
+        words = _TOKEN.findall(text.lower())
+        feats = list(words)
+        feats += [f"{a} {b}" for a, b in zip(words, words[1:])]
+        for word in words:
+            padded = f"#{word}#"
+            feats += [padded[i:i + 3] for i in range(len(padded) - 2)]
+        return feats
+
+    def __call__(self, texts: List[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts: Dict[int, float] = {}
+            for feat in self.features(text or ""):
+                h = zlib.crc32(feat.encode("utf-8"))
+                bucket = h % self.dim
+                counts[bucket] = counts.get(bucket, 0.0) + (1.0 if (h >> 31) & 1 else -1.0)
+            for bucket, value in counts.items():
+                out[row, bucket] = np.sign(value) * (1.0 + np.log(abs(value))) if value else 0.0
+        return normalize(out)
+
+
+class SentenceTransformerEmbedder:
+    """
+    A small local model (e.g. sentence-transformers/all-MiniLM-L6-v2); requires sentence-transformers.
+    """
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+        self.dim = int(self.model.get_sentence_embedding_dimension())
+        self.name = model_name
+
+    def __call__(self, texts: List[str]) -> np.ndarray:
+        return np.asarray(self.model.encode(texts, normalize_embeddings=True), dtype=np.float32)
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32, copy=False)
+
+
+def get_embedder(embedder: Any = None) -> Callable[[List[str]], np.ndarray]:
+    """
+    Resolve an embedder: a callable is used as is; "hashing" (default, VECTOR_EMBEDDER env) or
+    "hashing-<dim>" selects the hashing embedder; any other name is loaded as a sentence-transformers model.
+    """
+    if callable(embedder):
+        return embedder
+    name = embedder or os.environ.get("VECTOR_EMBEDDER", "hashing")
+    if name == "hashing" or name.startswith("hashing-"):
+        return HashingEmbedder(int(name.split("-", 1)[1]) if "-" in name else DEFAULT_DIM)
+    try:
+        return SentenceTransformerEmbedder(name)
+    except Exception as e:
+        print(f"[vector_index][WARN] Embedding model {name} unavailable, using hashing embedder: {e}")
+        return HashingEmbedder()
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores, best first.
+    """
+    if k <= 0 or scores.size == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < scores.size:
+        idx = np.argpartition(-scores, k - 1)[:k]
+    else:
+        idx = np.arange(scores.size)
+    return idx[np.argsort(-scores[idx], kind="stable")]
+
+
+def ann_config(overrides: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """
+    ANN settings from the environment (VECTOR_ANN=ivf|hnsw|off, VECTOR_ANN_NLIST, VECTOR_ANN_NPROBE,
+    VECTOR_ANN_EF, VECTOR_ANN_MIN_ROWS) and `overrides`; None when ANN is off.
+    """
+    conf = dict(ANN_DEFAULTS)
+    conf["type"] = os.environ.get("VECTOR_ANN", conf["type"])
+    for key in ("nlist", "nprobe", "ef", "min_rows"):
+        value = os.environ.get(f"VECTOR_ANN_{key.upper()}")
+        if value:
+            conf[key] = int(value)
+    conf.update(overrides or {})
+    if conf["type"] in (None, "", "off", "none", "brute"):
+        return None
+    return conf
+
+
+class IVFIndex:
+    """
+    Inverted-file index over rows [0, rows): spherical k-means centroids and, per centroid, the
+    (ascending) rows assigned to it, stored as one array with offsets.
+    """
+    def __init__(self, centroids: np.ndarray, list_rows: np.ndarray, offsets: np.ndarray, rows: int):
+        self.centroids = centroids
+        self.list_rows = list_rows
+        self.offsets = offsets
+        self.rows = int(rows)
+
+    @property
+    def nlist(self) -> int:
+        return self.centroids.shape[0]
+
+    @staticmethod
+    def _assign(vectors: np.ndarray, rows: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        out = np.empty(rows.size, dtype=np.int64)
+        for start in range(0, rows.size, SEARCH_BLOCK_ROWS):
+            block = np.asarray(vectors[rows[start:start + SEARCH_BLOCK_ROWS]])
+            out[start:start + block.shape[0]] = np.argmax(block @ centroids.T, axis=1)
+        return out
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, live: np.ndarray, nlist: int = 0, iterations: int = 10,
+              train_size: int = 0, seed: int = 0) -> "IVFIndex":
+        rows = np.flatnonzero(live)
+        nlist = max(1, min(nlist or int(np.sqrt(rows.size)), rows.size))
+        rng = np.random.default_rng(seed)
+        train_rows = np.sort(rng.choice(rows, size=min(rows.size, train_size or nlist * 64), replace=False))
+        train = np.asarray(vectors[train_rows], dtype=np.float32)
+        centroids = train[rng.choice(train.shape[0], size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(train @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, train)
+            empty = ~sums.any(axis=1)
+            if empty.any():
+                # Re-seed empty lists with random training rows
+                sums[empty] = train[rng.choice(train.shape[0], size=int(empty.sum()), replace=False)]
+            centroids = normalize(sums)
+        assign = cls._assign(vectors, rows, centroids)
+        order = np.argsort(assign, kind="stable")
+        offsets = np.zeros(nlist + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(assign, minlength=nlist))
+        return cls(centroids, rows[order], offsets, live.size)
+
+    def candidates(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        probe = top_k(self.centroids @ query, min(nprobe, self.nlist))
+        return np.concatenate([self.list_rows[self.offsets[c]:self.offsets[c + 1]] for c in probe])
+
+    def save(self, path: str, fresh: np.ndarray):
+        tmp = os.path.join(path, "ivf.tmp.npz")
+        np.savez(tmp, centroids=self.centroids, list_rows=self.list_rows, offsets=self.offsets,
+                 rows=np.array(self.rows), fresh=fresh)
+        os.replace(tmp, os.path.join(path, "ivf.npz"))
+
+    @classmethod
+    def load(cls, path: str) -> Tuple["IVFIndex", np.ndarray]:
+        with np.load(os.path.join(path, "ivf.npz")) as data:
+            return cls(data["centroids"], data["list_rows"], data["offsets"], int(data["rows"])), data["fresh"]
+
+
+class NumpyVectorIndex:
+    """
+    Row-per-document vector store. With `path`, vectors live in a memory-mapped file that is updated
+    in place (save() only flushes it and writes ids.json); without, everything stays in memory.
+    `ann` (see ann_config) enables the IVF index for large corpora.
+    """
+    persists_in_place = True
+
+    def __init__(self, path: Optional[str] = None, embedder: Any = None, ann: Optional[Dict[str, Any]] = None):
+        self.path = path
+        self.embedder = get_embedder(embedder)
+        self.dim: Optional[int] = getattr(self.embedder, "dim", None)
+        self.name = getattr(self.embedder, "name", type(self.embedder).__name__)
+        self.vectors: Optional[np.ndarray] = None
+        self.live = np.zeros(0, dtype=bool)
+        self.ids: List[Optional[str]] = []
+        self.slots: Dict[str, int] = {}
+        self.free: List[int] = []
+        self.ann = dict(ann) if ann else None
+        if self.ann and self.ann.get("type") != "ivf":
+            print(f"[vector_index][WARN] ANN type {self.ann.get('type')} needs txtai; using ivf")
+            self.ann["type"] = "ivf"
+        self.ivf: Optional[IVFIndex] = None
+        # Rows written since the current IVF was built (scanned exactly), and since a running build started
+        self._fresh: set = set()
+        self._build_fresh: Optional[set] = None
+        self._builder: Optional[threading.Thread] = None
+        self._ann_lock = threading.Lock()
+
+    # --- Storage ---
+
+    @property
+    def capacity(self) -> int:
+        return 0 if self.vectors is None else self.vectors.shape[0]
+
+    def _vectors_file(self, path: Optional[str] = None) -> str:
+        return os.path.join(path or self.path, "vectors.f32")
+
+    def _reserve(self, rows: int):
+        if rows <= self.capacity:
+            return
+        capacity = max(rows, self.capacity * 2, 1024)
+        if self.path:
+            if self.vectors is None:
+                os.makedirs(self.path, exist_ok=True)
+                mode = "wb"  # fresh index: drop whatever an older index left behind
+            else:
+                self.vectors.flush()
+                mode = "r+b"
+            # Growing the file is O(1) data movement: existing rows stay where they are
+            # (a running IVF build keeps reading the previous mapping)
+            with open(self._vectors_file(), mode) as f:
+                f.truncate(capacity * self.dim * 4)
+            self.vectors = np.memmap(self._vectors_file(), dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        else:
+            grown = np.zeros((capacity, self.dim), dtype=np.float32)
+            if self.vectors is not None:
+                grown[:len(self.ids)] = self.vectors[:len(self.ids)]
+            self.vectors = grown
+        live = np.zeros(capacity, dtype=bool)
+        live[:self.live.size] = self.live
+        self.live = live
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.asarray(self.embedder(texts), dtype=np.float32)
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        return vectors
+
+    # --- Embeddings API ---
+
+    def count(self) -> int:
+        return len(self.slots)
+
+    def upsert(self, documents: Iterable[Tuple[str, str, Any]]):
+        documents = list(documents)
+        if not documents:
+            return
+        vectors = self._embed([text for _, text, _ in documents])
+        self._reserve(len(self.ids) + len(documents))
+        touched = []
+        for (doc_id, _, _), vector in zip(documents, vectors):
+            slot = self.slots.get(doc_id)
+            if slot is None:
+                if self.free:
+                    slot = self.free.pop()
+                else:
+                    slot = len(self.ids)
+                    self.ids.append(None)
+                self.ids[slot] = doc_id
+                self.slots[doc_id] = slot
+                self.live[slot] = True
+            self.vectors[slot] = vector
+            touched.append(slot)
+        self._touch(touched)
+
+    def delete(self, ids: Iterable[str]):
+        for doc_id in ids:
+            slot = self.slots.pop(doc_id, None)
+            if slot is None:
+                continue
+            self.ids[slot] = None
+            self.live[slot] = False
+            self.free.append(slot)
+
+    def search(self, text: str, limit: int = 5) -> List[Tuple[str, float]]:
+        """
+        [(id, cosine score)] of the `limit` nearest documents, best first (approximate once the IVF is built).
+        """
+        if not self.slots or limit <= 0:
+            return []
+        query = self._embed([text])[0]
+        k = min(limit, len(self.slots))
+        with self._ann_lock:
+            ivf, fresh = self.ivf, np.fromiter(self._fresh, dtype=np.int64, count=len(self._fresh))
+        if ivf is None:
+            return self._search_exact(query, k)
+        # Lists are disjoint; only the exactly-scanned rows can repeat a candidate (same score)
+        extra = np.union1d(fresh, np.arange(ivf.rows, len(self.ids), dtype=np.int64))
+        rows = np.concatenate([ivf.candidates(query, self.ann["nprobe"]), extra])
+        scores = np.asarray(self.vectors[rows]) @ query
+        scores[~self.live[rows]] = -np.inf
+        hits, seen = [], set()
+        for i in top_k(scores, k + extra.size):
+            if np.isfinite(scores[i]) and rows[i] not in seen and len(hits) < k:
+                seen.add(rows[i])
+                hits.append((self.ids[rows[i]], float(scores[i])))
+        return hits
+
+    def search_ids(self, text: str, ids: Iterable[str], limit: int = 5) -> List[Tuple[str, float]]:
+        """
+        Exact search restricted to the given document ids (e.g. pre-filtered by metadata).
+        """
+        slots = np.fromiter((self.slots[i] for i in ids if i in self.slots), dtype=np.int64)
+        if not slots.size or limit <= 0:
+            return []
+        query = self._embed([text])[0]
+        k = min(limit, slots.size)
+        best_rows: List[np.ndarray] = []
+        best_scores: List[np.ndarray] = []
+        for start in range(0, slots.size, SEARCH_BLOCK_ROWS):
+            rows = slots[start:start + SEARCH_BLOCK_ROWS]
+            scores = np.asarray(self.vectors[rows]) @ query
+            idx = top_k(scores, k)
+            best_rows.append(rows[idx])
+            best_scores.append(scores[idx])
+        rows = np.concatenate(best_rows)
+        scores = np.concatenate(best_scores)
+        order = top_k(scores, k)
+        return [(self.ids[r], float(s)) for r, s in zip(rows[order], scores[order])]
+
+    def _search_exact(self, query: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        rows = len(self.ids)
+        best_idx: List[np.ndarray] = []
+        best_scores: List[np.ndarray] = []
+        for start in range(0, rows, SEARCH_BLOCK_ROWS):
+            end = min(rows, start + SEARCH_BLOCK_ROWS)
+            scores = self.vectors[start:end] @ query
+            scores[~self.live[start:end]] = -np.inf
+            idx = top_k(scores, k)
+            best_idx.append(idx + start)
+            best_scores.append(scores[idx])
+        idx = np.concatenate(best_idx)
+        scores = np.concatenate(best_scores)
+        order = top_k(scores, k)
+        return [(self.ids[i], float(s)) for i, s in zip(idx[order], scores[order]) if np.isfinite(s)]
+
+    # --- ANN (IVF) maintenance ---
+
+    def _touch(self, slots: List[int]):
+        if not self.ann:
+            return
+        with self._ann_lock:
+            self._fresh.update(slots)
+            if self._build_fresh is not None:
+                self._build_fresh.update(slots)
+        self._maybe_rebuild()
+
+    def _maybe_rebuild(self):
+        if len(self.slots) < self.ann["min_rows"]:
+            return
+        with self._ann_lock:
+            stale = self.ivf is None or len(self._fresh) > self.ann["rebuild_fraction"] * max(1, self.ivf.rows)
+        if stale:
+            self.rebuild()
+
+    def rebuild(self, wait: bool = False) -> bool:
+        """
+        Build a new IVF on a background thread and swap it in when done; queries keep using the
+        current one (or the exact scan) meanwhile. Returns False if a build is already running.
+        """
+        if not self.ann or not self.slots:
+            return False
+        with self._ann_lock:
+            if self._builder is not None and self._builder.is_alive():
+                started = False
+            else:
+                self._build_fresh = set()
+                rows = len(self.ids)
+                snapshot = (self.vectors, self.live[:rows].copy())
+                self._builder = threading.Thread(target=self._build, args=snapshot, name="vern-vector-ivf", daemon=True)
+                self._builder.start()
+                started = True
+            builder = self._builder
+        if wait:
+            builder.join()
+        return started
+
+    def _build(self, vectors: np.ndarray, live: np.ndarray):
+        try:
+            ivf = IVFIndex.build(vectors, live, nlist=self.ann["nlist"], iterations=self.ann["iterations"],
+                                 train_size=self.ann["train_size"])
+        except Exception as e:
+            print(f"[vector_index][WARN] IVF build failed: {e}")
+            with self._ann_lock:
+                self._build_fresh = None
+            return
+        with self._ann_lock:
+            self.ivf = ivf
+            self._fresh = self._build_fresh
+            self._build_fresh = None
+
+    def wait_for_build(self, timeout: Optional[float] = None):
+        builder = self._builder
+        if builder is not None:
+            builder.join(timeout)
+
+    # --- Persistence ---
+
+    def save(self, path: Optional[str] = None):
+        path = path or self.path
+        if path is None:
+            raise ValueError("In-memory vector index has no path to save to")
+        os.makedirs(path, exist_ok=True)
+        if self.vectors is not None:
+            if path == self.path and isinstance(self.vectors, np.memmap):
+                self.vectors.flush()
+            else:
+                np.asarray(self.vectors[:len(self.ids)]).tofile(self._vectors_file(path))
+        tmp = os.path.join(path, "ids.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump({"dim": self.dim, "embedder": self.name, "ids": self.ids}, f)
+        os.replace(tmp, os.path.join(path, "ids.json"))
+        with self._ann_lock:
+            ivf, fresh = self.ivf, np.fromiter(self._fresh, dtype=np.int64, count=len(self._fresh))
+        if ivf is not None:
+            ivf.save(path, fresh)
+        elif os.path.exists(os.path.join(path, "ivf.npz")):
+            os.remove(os.path.join(path, "ivf.npz"))
+
+    def load(self, path: Optional[str] = None):
+        """
+        Memory-map a saved index. Raises ValueError when it was built with a different embedder.
+        """
+        path = path or self.path
+        with open(os.path.join(path, "ids.json")) as f:
+            saved = json.load(f)
+        if saved.get("embedder") != self.name or (self.dim is not None and saved.get("dim") != self.dim):
+            raise ValueError(f"index built with {saved.get('embedder')} (dim {saved.get('dim')}), not {self.name}")
+        ids = saved.get("ids") or []
+        dim = int(saved["dim"])
+        capacity = os.path.getsize(self._vectors_file(path)) // (dim * 4)
+        if capacity < len(ids):
+            raise ValueError(f"index at {path} is truncated")
+        self.path, self.dim = path, dim
+        self.vectors = np.memmap(self._vectors_file(path), dtype=np.float32, mode="r+", shape=(capacity, dim)) if capacity else None
+        self.ids = ids
+        self.slots = {doc_id: slot for slot, doc_id in enumerate(ids) if doc_id is not None}
+        self.free = [slot for slot, doc_id in enumerate(ids) if doc_id is None]
+        self.live = np.zeros(capacity, dtype=bool)
+        self.live[list(self.slots.values())] = True
+        if self.ann:
+            if os.path.exists(os.path.join(path, "ivf.npz")):
+                self.ivf, fresh = IVFIndex.load(path)
+                self._fresh = set(fresh.tolist())
+            self._maybe_rebuild()
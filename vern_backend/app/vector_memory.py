@@ -5,16 +5,16 @@ References:
 - txtai: https://github.com/neuml/txtai
 - Haystack: https://github.com/deepset-ai/haystack
 
-This module provides add/query functions for semantic memory using txtai.
+This module provides add/query functions for semantic memory using txtai, or the built-in
+NumPy engine (vector_index.py) when txtai is not installed.
 """
 """
 VERN Vector Memory Subsystem (Semantic Search)
 """
 # Supports RAG (retrieval-augmented generation), semantic search, and long-term logs.
-# TODO: Integrate with external document stores for hybrid RAG.
-# TODO: Add metadata-based filtering for semantic search.
+# Hybrid (BM25 + dense) retrieval lives in rag.py.
 
-# TODO: Ensure txtai is installed in the environment for semantic search.
+# txtai is optional: without it the built-in NumPy engine is used
 try:
     from txtai.embeddings import Embeddings
     TXT_AI_AVAILABLE = True
@@ -22,57 +22,376 @@ except ImportError:
     Embeddings = None
     TXT_AI_AVAILABLE = False
 
-import sqlite3
+import ast
+import json
 import os
-from typing import List, Dict, Any, Optional
+import re
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+
+from vern_backend.app.vector_index import NumpyVectorIndex, ann_config
+
+# Metadata fields copied into indexed columns (secondary index for filters)
+INDEXED_FIELDS = ("user_id", "type", "timestamp")
+FILTER_OPS = {"$eq": "=", "$ne": "!=", "$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+RESULT_BATCH = 500  # ids per lookup query when materializing search hits
+_FIELD = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$")
+
+def to_timestamp(value: Any) -> Optional[float]:
+    """
+    Epoch seconds from a number or an ISO-8601 string (None if neither).
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
+    return None
+
+def _filter_value(field: str, value: Any) -> Any:
+    if field == "timestamp":
+        ts = to_timestamp(value)
+        if ts is None:
+            raise ValueError(f"timestamp filter needs a number or ISO-8601 string, got {value!r}")
+        return ts
+    if isinstance(value, (dict, list)):
+        raise ValueError(f"Unsupported filter value for {field}: {value!r}")
+    return value
+
+def compile_filter(expr: Optional[Dict[str, Any]]) -> Tuple[str, List[Any]]:
+    """
+    SQL condition and parameters for a metadata filter over the documents table.
+
+    `expr` maps fields to a value (equality) or to {"$op": value} with ops $eq $ne $gt $gte $lt $lte
+    $in $nin; all entries must match. {"$or": [expr, ...]} matches any. Indexed fields (user_id, type,
+    timestamp) use their indexed columns; other fields (dotted paths allowed) are read from the JSON.
+    """
+    if not expr:
+        return "1", []
+    if not isinstance(expr, dict):
+        raise ValueError("Filter must be a JSON object")
+    clauses: List[str] = []
+    params: List[Any] = []
+    for field, cond in expr.items():
+        if field == "$or":
+            if not isinstance(cond, list) or not cond:
+                raise ValueError("$or needs a non-empty list of filters")
+            parts = [compile_filter(sub) for sub in cond]
+            clauses.append("(" + " OR ".join(f"({sql})" for sql, _ in parts) + ")")
+            params += [p for _, sub_params in parts for p in sub_params]
+            continue
+        if not _FIELD.match(field):
+            raise ValueError(f"Invalid filter field: {field!r}")
+        column = field if field in INDEXED_FIELDS else f"CASE WHEN json_valid(meta) THEN json_extract(meta, '$.{field}') END"
+        ops = cond if isinstance(cond, dict) else {"$eq": cond}
+        for op, value in ops.items():
+            if op in ("$in", "$nin"):
+                if not isinstance(value, list) or not value:
+                    raise ValueError(f"{op} needs a non-empty list")
+                values = [_filter_value(field, v) for v in value]
+                neg = "NOT " if op == "$nin" else ""
+                clauses.append(f"{column} {neg}IN ({', '.join('?' for _ in values)})")
+                params += values
+            elif op in FILTER_OPS:
+                clauses.append(f"{column} {FILTER_OPS[op]} ?")
+                params.append(_filter_value(field, value))
+            else:
+                raise ValueError(f"Unsupported filter operator: {op}")
+    return " AND ".join(clauses) or "1", params
+
+def _meta_json(meta: Any) -> str:
+    """
+    JSON text for stored metadata (legacy rows were written as str(dict)).
+    """
+    if isinstance(meta, str):
+        try:
+            json.loads(meta)
+            return meta
+        except ValueError:
+            try:
+                meta = ast.literal_eval(meta)
+            except (ValueError, SyntaxError):
+                meta = {"raw": meta}
+    return json.dumps(meta if isinstance(meta, dict) else {"value": meta}, default=str)
+
+def _indexed_values(meta: Dict[str, Any]) -> Tuple[Any, Any, float]:
+    user_id = meta.get("user_id")
+    doc_type = meta.get("type")
+    timestamp = to_timestamp(meta.get("timestamp"))
+    return (None if user_id is None else str(user_id), None if doc_type is None else str(doc_type),
+            time.time() if timestamp is None else timestamp)
+
+def txtai_config(path: str, mmap: bool = True, ann: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    txtai Embeddings config; `ann` selects faiss IVF (nlist/nprobe) or the hnsw backend (m/ef).
+    """
+    config: Dict[str, Any] = {"path": path, "content": False, "faiss": {"mmap": mmap}}
+    if ann and ann.get("type") == "hnsw":
+        config["backend"] = "hnsw"
+        config["hnsw"] = {"m": ann["m"], "efconstruction": max(ann["ef"], 100), "efsearch": ann["ef"]}
+    elif ann:
+        config["backend"] = "faiss"
+        config["faiss"]["nprobe"] = ann["nprobe"]
+        if ann.get("nlist"):
+            config["faiss"]["components"] = f"IVF{ann['nlist']},Flat"
+    return config
 
 class VectorMemory:
-    def __init__(self, path: str = "sentence-transformers/all-MiniLM-L6-v2", persistent: bool = False, db_path: str = "data/vector_memory.sqlite"):
+    """
+    Semantic document store with stable document ids.
+
+    Documents (id, text, metadata) live in SQLite at `db_path` (in memory unless `persistent`). The
+    embeddings index is updated incrementally (upsert/delete of just the batch) and saved beside the
+    database: data/vector_memory.index with txtai, data/vector_memory.vectors with the NumPy engine
+    (`embedder` selects its embedding function, see vector_index.get_embedder). Changes made since
+    the last save are journaled in SQLite and replayed when the index is loaded, so an add costs
+    O(batch) and a crash between saves loses nothing. On startup the saved index is memory-mapped
+    (faiss `mmap` with txtai; the NumPy engine always maps its vector file) rather than read into RAM.
+    `ann` (default: vector_index.ann_config(), i.e. the VECTOR_ANN* env) configures approximate search.
+
+    Metadata is stored as JSON; user_id, type and timestamp (epoch seconds; the add time if absent)
+    are also kept in indexed columns. query(filters=...) selects candidates through those indexes
+    (see compile_filter) before the similarity pass.
+    """
+    def __init__(self, path: str = "sentence-transformers/all-MiniLM-L6-v2", persistent: bool = False, db_path: str = "data/vector_memory.sqlite",
+                 index_path: Optional[str] = None, mmap: bool = True, embedder: Any = None, ann: Optional[Dict[str, Any]] = None):
         self.logs = []
         self.persistent = persistent
         self.db_path = db_path
+        self.index_path = index_path or os.path.splitext(db_path)[0] + (".index" if TXT_AI_AVAILABLE else ".vectors")
+        self._lock = threading.RLock()
+        self.conn = None
+        self._init_sqlite(None if persistent else ":memory:")
+        ann = ann_config() if ann is None else ann_config(ann)
         if TXT_AI_AVAILABLE:
-            self.embeddings = Embeddings({"path": path})
-        elif persistent:
-            # Use SQLite for persistence if txtai is unavailable
-            self.embeddings = None
-            self._init_sqlite()
+            self.embeddings = Embeddings(txtai_config(path, mmap, ann))
         else:
-            self.embeddings = None
+            self.embeddings = NumpyVectorIndex(self.index_path if persistent else None, embedder=embedder, ann=ann)
+        if persistent:
+            self._load_index()
 
-    def _init_sqlite(self):
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        self.conn = sqlite3.connect(self.db_path)
+    def _init_sqlite(self, db_path: Optional[str] = None):
+        db_path = db_path or self.db_path
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        # Endpoints run on a threadpool; access is serialized by self._lock
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        columns = {row[1]: row[2] for row in self.conn.execute("PRAGMA table_info(documents)")}
+        if columns.get("id", "").upper() == "INTEGER":
+            # Pre-id schema (positional integer ids): keep the rows, ids become their string form
+            self.conn.execute("ALTER TABLE documents RENAME TO documents_v0")
         self.conn.execute(
-            "CREATE TABLE IF NOT EXISTS documents (id INTEGER PRIMARY KEY, doc TEXT, meta TEXT)"
+            "CREATE TABLE IF NOT EXISTS documents (id TEXT PRIMARY KEY, doc TEXT, meta TEXT, indexed INTEGER NOT NULL DEFAULT 0)"
         )
+        # Ids deleted since the last index save (replayed against the saved index on load)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS index_deletes (id TEXT PRIMARY KEY)")
+        if columns.get("id", "").upper() == "INTEGER":
+            self.conn.execute("INSERT INTO documents (id, doc, meta) SELECT CAST(id AS TEXT), doc, meta FROM documents_v0 ORDER BY id")
+            self.conn.execute("DROP TABLE documents_v0")
+        existing = {row[1] for row in self.conn.execute("PRAGMA table_info(documents)")}
+        missing = [field for field in INDEXED_FIELDS if field not in existing]
+        for field in missing:
+            self.conn.execute(f"ALTER TABLE documents ADD COLUMN {field} {'REAL' if field == 'timestamp' else 'TEXT'}")
+        if missing:
+            # Backfill: metadata as JSON and its indexed fields
+            rows = self.conn.execute("SELECT id, meta FROM documents").fetchall()
+            updates = []
+            for doc_id, meta in rows:
+                meta_json = _meta_json(meta or "{}")
+                updates.append((meta_json, *_indexed_values(json.loads(meta_json)), doc_id))
+            self.conn.executemany("UPDATE documents SET meta = ?, user_id = ?, type = ?, timestamp = ? WHERE id = ?", updates)
+        for field in INDEXED_FIELDS:
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_documents_{field} ON documents({field})")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_user_time ON documents(user_id, timestamp)")
         self.conn.commit()
 
-    def add_documents(self, docs: List[str], metadata: List[Dict[str, Any]] | None = None):
+    def _require_store(self):
+        if self.conn is None:
+            raise RuntimeError("Vector store unavailable: it has been closed.")
+
+    def _load_index(self):
+        """
+        Load the saved index (if any) and replay the journal; without a saved index, index everything.
+        """
+        loaded = os.path.isdir(self.index_path)
+        if loaded:
+            try:
+                self.embeddings.load(self.index_path)
+            except Exception as e:
+                print(f"[vector_memory][WARN] Could not load index at {self.index_path}, rebuilding: {e}")
+                loaded = False
+        with self._lock:
+            if loaded:
+                deletes = [row[0] for row in self.conn.execute("SELECT id FROM index_deletes")]
+                if deletes:
+                    self.embeddings.delete(deletes)
+                pending = self.conn.execute("SELECT id, doc FROM documents WHERE indexed = 0 ORDER BY rowid").fetchall()
+            else:
+                pending = self.conn.execute("SELECT id, doc FROM documents ORDER BY rowid").fetchall()
+            if pending:
+                self.embeddings.upsert([(doc_id, doc, None) for doc_id, doc in pending])
+
+    def add_documents(self, docs: List[str], metadata: List[Dict[str, Any]] | None = None, ids: List[str] | None = None) -> List[str]:
+        """
+        Add documents and return their ids. Documents whose id already exists are replaced (upsert);
+        without `ids`, new unique ids are generated. Only this batch is (re)indexed.
+        """
         if metadata is None:
             metadata = [{} for _ in docs]
-        if TXT_AI_AVAILABLE and self.embeddings:
-            self.embeddings.index([(str(i), doc, meta) for i, (doc, meta) in enumerate(zip(docs, metadata))])
-        elif self.persistent:
-            for doc, meta in zip(docs, metadata):
-                self.conn.execute(
-                    "INSERT INTO documents (doc, meta) VALUES (?, ?)",
-                    (doc, str(meta))
+        ids = [uuid.uuid4().hex for _ in docs] if ids is None else [str(i) for i in ids]
+        if not (len(ids) == len(docs) == len(metadata)):
+            raise ValueError("docs, metadata and ids must have the same length")
+        if any(meta is not None and not isinstance(meta, dict) for meta in metadata):
+            raise ValueError("each metadata item must be an object (dict) or null")
+        self._require_store()
+        with self._lock:
+            try:
+                self.conn.executemany(
+                    "INSERT INTO documents (id, doc, meta, user_id, type, timestamp, indexed) VALUES (?, ?, ?, ?, ?, ?, 0) "
+                    "ON CONFLICT(id) DO UPDATE SET doc = excluded.doc, meta = excluded.meta, user_id = excluded.user_id, "
+                    "type = excluded.type, timestamp = excluded.timestamp, indexed = 0",
+                    [(i, doc, json.dumps(meta or {}, default=str), *_indexed_values(meta or {}))
+                     for i, doc, meta in zip(ids, docs, metadata)]
                 )
+                self.embeddings.upsert([(i, doc, None) for i, doc in zip(ids, docs)])
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+        return ids
+
+    def upsert_documents(self, ids: List[str], docs: List[str], metadata: List[Dict[str, Any]] | None = None) -> List[str]:
+        return self.add_documents(docs, metadata, ids=ids)
+
+    def delete_documents(self, ids: List[str]) -> int:
+        """
+        Delete documents by id; returns how many existed.
+        """
+        ids = [str(i) for i in ids]
+        self._require_store()
+        with self._lock:
+            try:
+                # rowcount, unlike total_changes, leaves out rows written by triggers (e.g. RAG's FTS sync)
+                deleted = self.conn.executemany("DELETE FROM documents WHERE id = ?", [(i,) for i in ids]).rowcount
+                if ids:
+                    self.embeddings.delete(ids)
+                    if self.persistent:
+                        self.conn.executemany("INSERT OR IGNORE INTO index_deletes (id) VALUES (?)", [(i,) for i in ids])
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+        return deleted
+
+    def get_document(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        self._require_store()
+        with self._lock:
+            row = self.conn.execute("SELECT id, doc, meta FROM documents WHERE id = ?", (str(doc_id),)).fetchone()
+        return self._result(row) if row else None
+
+    def count(self) -> int:
+        self._require_store()
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    @staticmethod
+    def _result(row, score: Optional[float] = None) -> Dict[str, Any]:
+        doc_id, doc, meta = row
+        try:
+            meta = json.loads(meta) if meta else {}
+        except ValueError:
+            meta = {"raw": meta}  # rows written before metadata was stored as JSON
+        return {"id": doc_id, "content": doc, "score": score, "metadata": meta}
+
+    def query(self, text: str, top_k: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Top-k documents as {"id", "content", "score", "metadata"} dicts, best first.
+        With `filters` (see compile_filter), only matching documents are ranked.
+        """
+        self._require_store()
+        with self._lock:
+            return self._results(self._dense_hits(text, top_k, filters))
+
+    def _dense_hits(self, text: str, top_k: int, filters: Optional[Dict[str, Any]] = None) -> List[Tuple[str, float]]:
+        where, params = compile_filter(filters)
+        if not filters:
+            if not self.conn.execute("SELECT 1 FROM documents LIMIT 1").fetchone():
+                return []
+            return self.embeddings.search(text, top_k)
+        candidates = [row[0] for row in self.conn.execute(f"SELECT id FROM documents WHERE {where}", params)]
+        if not candidates:
+            return []
+        return self._search_candidates(text, candidates, top_k)
+
+    def _results(self, hits: List[Tuple[str, float]]) -> List[Dict[str, Any]]:
+        # One IN (...) query per chunk (kept under SQLite's bound-parameter limit); hit order is restored below
+        ids = list(dict.fromkeys(str(doc_id) for doc_id, _ in hits))
+        rows = {}
+        for start in range(0, len(ids), RESULT_BATCH):
+            chunk = ids[start:start + RESULT_BATCH]
+            placeholders = ", ".join("?" * len(chunk))
+            for row in self.conn.execute(f"SELECT id, doc, meta FROM documents WHERE id IN ({placeholders})", chunk):
+                rows[row[0]] = row
+        return [self._result(rows[str(doc_id)], score) for doc_id, score in hits if str(doc_id) in rows]
+
+    def _search_candidates(self, text: str, candidates: List[str], top_k: int) -> List[Tuple[str, float]]:
+        if hasattr(self.embeddings, "search_ids"):
+            # NumPy engine: score only the pre-filtered rows
+            return self.embeddings.search_ids(text, candidates, top_k)
+        # txtai (no content store): widen the search until enough candidates are among the hits
+        allowed = set(candidates)
+        total = self.count()
+        limit = max(top_k * 4, 32)
+        while True:
+            hits = [(doc_id, score) for doc_id, score in self.embeddings.search(text, limit) if str(doc_id) in allowed]
+            if len(hits) >= top_k or limit >= total:
+                return hits[:top_k]
+            limit *= 4
+
+    def save(self) -> bool:
+        """
+        Write the index beside the database and clear the journal. Returns False when there is nothing to save.
+        """
+        if not self.persistent:
+            return False
+        with self._lock:
+            dirty = (self.conn.execute("SELECT 1 FROM documents WHERE indexed = 0 LIMIT 1").fetchone()
+                     or self.conn.execute("SELECT 1 FROM index_deletes LIMIT 1").fetchone())
+            if not dirty:
+                return False
+            if getattr(self.embeddings, "persists_in_place", False):
+                # NumPy engine: the vector file is already current, flush it and write the id map
+                self.embeddings.save(self.index_path)
+            else:
+                # Save to a sibling directory first so a crash never leaves a half-written index
+                tmp_path = self.index_path + ".tmp"
+                shutil.rmtree(tmp_path, ignore_errors=True)
+                self.embeddings.save(tmp_path)
+                shutil.rmtree(self.index_path, ignore_errors=True)
+                os.replace(tmp_path, self.index_path)
+            self.conn.execute("UPDATE documents SET indexed = 1 WHERE indexed = 0")
+            self.conn.execute("DELETE FROM index_deletes")
             self.conn.commit()
-        else:
-            raise RuntimeError("Vector store unavailable: txtai not installed and persistence not enabled.")
+        return True
 
-    def query(self, text: str, top_k: int = 5):
-        if TXT_AI_AVAILABLE and self.embeddings:
-            results = self.embeddings.search(text, top_k)
-            return results
-        elif self.persistent:
-            # Deterministic fallback: return top_k docs in insertion order
-            cursor = self.conn.execute("SELECT doc FROM documents ORDER BY id ASC LIMIT ?", (top_k,))
-            return [row[0] for row in cursor.fetchall()]
-        else:
-            raise RuntimeError("Vector store unavailable: txtai not installed and persistence not enabled.")
+    def close(self):
+        if self.conn is None:
+            return
+        try:
+            self.save()
+        finally:
+            with self._lock:
+                self.conn.close()
+                self.conn = None
 
 def rag_retrieve(self, query: str, top_k: int = 5):
     """
@@ -128,8 +447,11 @@ class NoOpVectorMemory:
 
 # Example usage:
 # vector_memory = VectorMemory(persistent=True)
-# vector_memory.add_documents(["Hello world", "VERN is modular"], [{"type": "greeting"}, {"type": "info"}])
+# ids = vector_memory.add_documents(["Hello world", "VERN is modular"], [{"type": "greeting"}, {"type": "info"}])
 # print(vector_memory.query("modular system"))
+# print(vector_memory.query("modular system", filters={"type": {"$in": ["info", "note"]}}))
+# vector_memory.delete_documents(ids[:1])
+# vector_memory.save()
 # no_op_vec = NoOpVectorMemory()
 # no_op_vec.add_documents(["A", "B", "C"])
 # print(no_op_vec.query("anything"))
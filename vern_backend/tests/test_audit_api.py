@@ -0,0 +1,71 @@
+import json
+import uuid
+
+from fastapi.testclient import TestClient
+from vern_backend.app.main import app
+from src.db.logger import log_action, flush_logs
+
+client = TestClient(app)
+
+
+def _seed(n: int) -> str:
+    agent = f"audit_test_{uuid.uuid4().hex[:8]}"
+    for i in range(n):
+        log_action(agent, "user_a" if i % 2 == 0 else "user_b", "test_event", {"i": i})
+    assert flush_logs()
+    return agent
+
+
+def test_audit_keyset_pagination_and_filters():
+    agent = _seed(7)
+    seen = []
+    cursor = None
+    while True:
+        params = {"agent_id": agent, "limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        body = client.get("/admin/audit", params=params).json()
+        assert body["ok"] is True
+        seen.extend(item["payload"]["i"] for item in body["items"])
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+    # Newest first, no duplicates or gaps across pages
+    assert seen == list(range(6, -1, -1))
+
+    only_a = client.get("/admin/audit", params={"agent_id": agent, "user_id": "user_a"}).json()["items"]
+    assert {item["user_id"] for item in only_a} == {"user_a"}
+    assert len(only_a) == 4
+
+
+def test_audit_export_streams_ndjson():
+    agent = _seed(5)
+    resp = client.get("/admin/audit/export", params={"agent_id": agent})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in resp.text.splitlines() if line]
+    assert [row["payload"]["i"] for row in lines] == [4, 3, 2, 1, 0]
+
+
+def test_audit_invalid_cursor_and_table_envelopes():
+    resp = client.get("/admin/audit", params={"cursor": "not-a-cursor"})
+    assert resp.status_code == 400
+    assert resp.json().get("error_code") == "VALIDATION_ERROR"
+    resp = client.get("/admin/audit", params={"table": "users"})
+    assert resp.status_code == 400
+    assert resp.json().get("ok") is False
+
+
+def test_large_payload_strings_are_deduplicated_and_resolved():
+    from src.db.logger import get_conn
+    agent = f"audit_blob_{uuid.uuid4().hex[:8]}"
+    prompt = f"You are the VERN {agent} agent. " + "context " * 200
+    log_action(agent, "user_a", "blob_request", {"prompt": prompt})
+    log_action(agent, "user_a", "llm_response", {"prompt": prompt, "response": "ok"})
+    assert flush_logs()
+    stored = get_conn().execute("SELECT payload FROM actions WHERE agent_id = ?", (agent,)).fetchall()
+    assert all(prompt not in row[0] for row in stored)
+    blobs = get_conn().execute("SELECT size, length(data) FROM payload_blobs WHERE size = ?", (len(prompt),)).fetchall()
+    assert len(blobs) == 1 and blobs[0][1] < blobs[0][0]
+    items = client.get("/admin/audit", params={"agent_id": agent}).json()["items"]
+    assert [item["payload"]["prompt"] for item in items] == [prompt, prompt]
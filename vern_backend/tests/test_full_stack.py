@@ -24,6 +24,12 @@ def test_rag_add_and_query():
     results = query_resp.json()["results"]
     assert any("VERN supports RAG" in r["content"] for r in results)
 
+def test_memory_add_rejects_non_object_metadata():
+    for path, key in (("/vector_memory/add", "metadata"), ("/rag/add", "meta")):
+        resp = client.post(path, json={"docs": ["x"], key: ["not a dict"]})
+        assert resp.status_code == 400
+        assert resp.json()["error_code"] == "VALIDATION_ERROR"
+
 def test_privacy_agent_endpoints():
     # Check permission
     resp = client.post("/privacy/check_permission", json={
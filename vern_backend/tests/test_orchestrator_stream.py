@@ -0,0 +1,71 @@
+"""
+Test: token streaming from the LLM router through the orchestrator to /agents/orchestrator/respond/stream.
+"""
+
+import json
+
+from fastapi.testclient import TestClient
+
+from src.mvp import llm_router
+from vern_backend.app import agents as agents_api
+from vern_backend.app.main import app
+
+client = TestClient(app)
+
+
+def _events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_stream_endpoint_forwards_tokens_and_persists_response(monkeypatch):
+    seen = {}
+
+    async def fake_route(prompt, **kwargs):
+        seen.update(kwargs)
+        for token in ["Hel", "lo", "!"]:
+            yield token
+
+    monkeypatch.setattr(llm_router, "route_llm_call_async", fake_route)
+    resp = client.post("/agents/orchestrator/respond/stream",
+                       json={"user_input": "hi", "user_id": "stream_user", "context": {"error": "upstream"}})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    events = _events(resp.text)
+    assert [e for e, _ in events[:3]] == ["token"] * 3
+    assert "".join(d["text"] for e, d in events if e == "token").startswith("Hello!\nWarning: Upstream error")
+    assert events[-1][0] == "done" and events[-1][1]["response"].startswith("Hello!")
+    assert seen["stream"] is True and seen["agent_name"] == "orchestrator" and seen["priority"] == "interactive"
+    stored = [e for e in agents_api.memory.get_events("stream_user") if e["type"] == "agent_response"]
+    assert stored[-1]["properties"]["response"] == events[-1][1]["response"]
+
+
+def test_stream_endpoint_validates_before_streaming():
+    resp = client.post("/agents/orchestrator/respond/stream", json={"user_input": "  "})
+    assert resp.status_code == 200
+    assert resp.json() == {"response": "Error: user_input cannot be empty."}
+
+
+def test_stream_adjusts_parameters_off_the_event_loop(monkeypatch):
+    import threading
+    from src.mvp import orchestrator
+
+    async def fake_route(prompt, **kwargs):
+        yield "ok"
+
+    threads = []
+
+    def fake_adjust(feedback_data, user_id="default_user"):
+        threads.append(threading.current_thread())
+        return "tune"
+
+    monkeypatch.setattr(llm_router, "route_llm_call_async", fake_route)
+    monkeypatch.setattr(orchestrator, "adjust_agent_parameters", fake_adjust)
+    resp = client.post("/agents/orchestrator/respond/stream",
+                       json={"user_input": "hi", "user_id": "feedback_user", "context": {"feedback": {"negative_ratio": 0.9}}})
+    events = _events(resp.text)
+    assert events[-1][1]["response"] == "ok\nParameter Recommendation: tune"
+    assert threads and threads[0] is not threading.main_thread()
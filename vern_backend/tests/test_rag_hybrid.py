@@ -0,0 +1,68 @@
+from vern_backend.app.memory import MemoryGraph
+from vern_backend.app.rag import RAGMemory
+from vern_backend.app.retrieval import bm25_scores, fts_match_query, reciprocal_rank_fusion
+from vern_backend.app.vector_memory import VectorMemory
+
+
+DOCS = [
+    "Invoice INV-4711 for the March consulting work",
+    "Invoice INV-4712 for the April consulting work",
+    "Invoice INV-5813 for hardware",
+    "The relational databases store audit events",
+    "Grace Hopper popularized the term debugging",
+]
+
+
+def test_rrf_and_fts_query_helpers():
+    fused = reciprocal_rank_fusion({"bm25": ["a", "b"], "dense": ["b", "c"]})
+    assert [doc_id for doc_id, _ in fused] == ["b", "a", "c"]
+    assert fts_match_query('INV-4711 "OR" x*') == '"inv" OR "4711" OR "or" OR "x"'
+    assert fts_match_query("?!") is None
+    scores = bm25_scores("tea", ["green tea tea", "black tea", "coffee"])
+    assert scores[0] > scores[1] > scores[2] == 0.0
+
+
+def test_exact_keywords_stay_precise():
+    rag = RAGMemory()
+    ids = rag.add_documents(DOCS)
+    for mode in ("bm25", "hybrid"):
+        top = rag.query("INV-4711", top_k=3, mode=mode)
+        assert top[0]["id"] == ids[0], mode
+    top = rag.query("Hopper", top_k=1)[0]
+    assert top["content"] == DOCS[4] and top["scores"]["bm25"] > 0
+
+
+def test_dense_recall_without_shared_terms():
+    rag = RAGMemory()
+    ids = rag.add_documents(DOCS)
+    # "database" is not a BM25 term of "databases"; the dense (trigram) ranking still finds it
+    assert rag.query("database", top_k=5, mode="bm25") == []
+    hybrid = rag.query("database", top_k=1)
+    assert hybrid[0]["id"] == ids[3] and hybrid[0]["scores"]["bm25"] is None
+
+
+def test_lexical_index_follows_upserts_deletes_and_filters():
+    rag = RAGMemory()
+    rag.add_documents(["alpha report", "beta report"], [{"user_id": "u1"}, {"user_id": "u2"}], ids=["a", "b"])
+    rag.add_documents(["gamma summary"], [{"user_id": "u1"}], ids=["a"])
+    assert [r["id"] for r in rag.query("gamma", mode="bm25")] == ["a"]
+    assert rag.query("alpha", mode="bm25") == []
+    assert [r["id"] for r in rag.query("report", mode="bm25", filters={"user_id": "u2"})] == ["b"]
+    assert rag.delete_documents(["b", "missing"]) == 1  # FTS trigger writes are not counted
+    assert rag.query("report", mode="bm25") == []
+
+
+def test_fts_index_is_built_for_existing_documents(tmp_path):
+    db_path = str(tmp_path / "rag_memory.sqlite")
+    VectorMemory(persistent=True, db_path=db_path).add_documents(DOCS)
+    rag = RAGMemory(persistent=True, db_path=db_path)
+    assert rag.query("INV-5813", top_k=1, mode="bm25")[0]["content"] == DOCS[2]
+
+
+def test_memory_graph_ranks_term_matches_before_substrings():
+    mem = MemoryGraph()
+    mem.add_entity("substring", {"text": "Agentic workflows"})
+    mem.add_entity("weak", {"text": "one agent among many other words in a long description"})
+    mem.add_entity("strong", {"text": "agent agent"})
+    mem.add_entity("unrelated", {"text": "nothing here"})
+    assert mem.rag_retrieve("agent", top_k=5)["entities"] == ["strong", "weak", "substring"]
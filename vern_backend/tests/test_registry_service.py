@@ -0,0 +1,170 @@
+from src.db.connection import close_all, get_connection
+from vern_backend.app.registry_service import AgentRegistry
+
+
+def _rows(db):
+    return get_connection(db).execute("SELECT name, last_seen, capabilities FROM agents ORDER BY name").fetchall()
+
+
+def test_heartbeats_are_coalesced_and_flushed(tmp_path):
+    db = str(tmp_path / "agents.sqlite")
+    reg = AgentRegistry(db_path=db, flush_interval=3600)
+    reg.heartbeat("research", "Research", '["search"]', "{}")
+    reg.heartbeat("research", "Research")
+    last = reg.heartbeat("research", "Research")
+    reg.heartbeat("finance", "Finance")
+
+    # Cache is updated immediately, DB only on flush
+    assert reg.get("research").status == "online"
+    assert reg.get("research").capabilities == '["search"]'
+    assert _rows(db) == []
+    assert reg.pending_writes() == 2
+
+    assert reg.flush() == 2
+    assert _rows(db) == [("finance", reg.get("finance").last_seen, None), ("research", last.last_seen, '["search"]')]
+    assert reg.flush() == 0
+
+    # Deleting drops the pending write too; stop() performs the final flush
+    reg.heartbeat("finance", "Finance")
+    reg.delete("finance")
+    reg.heartbeat("admin", "Admin")
+    reg.stop()
+    assert [r[0] for r in _rows(db)] == ["admin", "research"]
+    assert AgentRegistry(db_path=db).get("admin").cluster == "Admin"
+    close_all()
+
+
+def test_status_buckets_come_from_last_seen_order(tmp_path, monkeypatch):
+    db = str(tmp_path / "agents.sqlite")
+    reg = AgentRegistry(db_path=db, online_ttl=60, offline_ttl=300, flush_interval=3600)
+    clock = [1000.0]
+    monkeypatch.setattr("vern_backend.app.registry_service.time.time", lambda: clock[0])
+    reg.heartbeat("old", "Research", '["search"]', '{"v": 1}')
+    clock[0] = 1400.0
+    reg.heartbeat("mid", "Finance")
+    clock[0] = 1450.0
+    reg.heartbeat("new", "Research", "not json")
+    clock[0] = 1480.0
+
+    assert [(r.name, r.status) for r in reg.list()] == [("new", "online"), ("mid", "stale"), ("old", "offline")]
+    assert [r.name for r in reg.list("Research")] == ["new", "old"]
+    assert reg.status_counts() == {"online": 1, "stale": 1, "offline": 1}
+    payloads = {p["name"]: p for p in reg.status_payloads()}
+    assert payloads["old"]["capabilities"] == ["search"] and payloads["old"]["meta"] == {"v": 1}
+    assert payloads["new"]["capabilities"] == "not json"
+    # Snapshot is reused until the next write
+    snap = reg._current()
+    reg.list()
+    assert reg._current() is snap
+    reg.heartbeat("old", "Research")
+    assert reg._current() is not snap
+    assert reg.get("old").status == "online" and reg.get("old").capabilities == '["search"]'
+    reg.stop()
+    close_all()
+
+
+def test_find_uses_capability_and_cluster_index(tmp_path):
+    reg = AgentRegistry(db_path=str(tmp_path / "agents.sqlite"), flush_interval=3600)
+    reg.heartbeat("research", "Research", '["Search", "summarize"]')
+    reg.heartbeat("finance", "Finance", '{"search": {}, "budget": {}}')
+    reg.heartbeat("writer", "Research", '[{"name": "summarize"}]')
+
+    assert sorted(r.name for r in reg.find(capability="search")) == ["finance", "research"]
+    assert [r.name for r in reg.find(capability="summarize", cluster="Research")] == ["writer", "research"]
+    assert reg.find(capability="search", status="offline") == []
+
+    # Capability changes and deletes keep the index in sync
+    reg.heartbeat("research", "Research", '["translate"]')
+    assert [r.name for r in reg.find(capability="search")] == ["finance"]
+    reg.delete("finance")
+    assert reg.find(capability="search") == []
+    assert [p["name"] for p in reg.find_payloads(capability="translate", status="online")] == ["research"]
+    reg.stop()
+    close_all()
+
+
+def test_find_endpoint():
+    from fastapi.testclient import TestClient
+    from vern_backend.app.main import app
+
+    client = TestClient(app)
+    client.post("/agents/heartbeat", json={"name": "finder_probe", "cluster": "QA", "capabilities": ["probe"]})
+    resp = client.get("/agents/find", params={"capability": "probe", "status": "online"})
+    assert resp.status_code == 200
+    assert [a["name"] for a in resp.json()["items"]] == ["finder_probe"]
+    resp = client.get("/agents/find", params={"status": "bogus"})
+    assert resp.status_code == 400
+    assert resp.json()["error_code"] == "VALIDATION_ERROR"
+    client.delete("/agents/finder_probe")
+
+
+def test_change_feed_sequences_and_ttl_transitions(tmp_path, monkeypatch):
+    reg = AgentRegistry(db_path=str(tmp_path / "agents.sqlite"), online_ttl=60, offline_ttl=300, flush_interval=3600)
+    clock = [1000.0]
+    monkeypatch.setattr("vern_backend.app.registry_service.time.time", lambda: clock[0])
+    start = reg.current_seq
+    reg.heartbeat("research", "Research", '["search"]')
+    reg.heartbeat("research", "Research")  # steady-state heartbeat: no event
+    reg.heartbeat("research", "Research", '["search", "summarize"]')
+    events, latest, reset = reg.changes(start)
+    assert not reset and latest == start + 2
+    assert [(e["type"], e["agent"]["status"]) for e in events] == [("join", "online"), ("update", "online")]
+
+    clock[0] = 1070.0
+    events, seq, _ = reg.changes(latest)
+    assert [(e["type"], e["agent"]["status"]) for e in events] == [("status", "stale")]
+    clock[0] = 1080.0
+    reg.heartbeat("research", "Research")
+    clock[0] = 1100.0
+    events, seq, _ = reg.changes(seq)
+    assert [(e["type"], e["agent"]["status"]) for e in events] == [("status", "online")]
+    # Deadline set before the heartbeat is pushed back, not fired early
+    clock[0] = 1130.0
+    assert reg.changes(seq)[0] == []
+    clock[0] = 1400.0
+    # A sweep reports the current state, so a long gap goes straight to offline
+    events, seq, _ = reg.changes(seq)
+    assert [e["agent"]["status"] for e in events] == ["offline"]
+
+    reg.delete("research")
+    events, seq, _ = reg.changes(seq)
+    assert [(e["type"], e["name"]) for e in events] == [("leave", "research")]
+    # Unknown / future sequence numbers force a resync
+    assert reg.changes(seq + 5)[2] is True
+    reg.stop()
+    close_all()
+
+
+def test_stream_endpoint_emits_snapshot_then_diffs(monkeypatch):
+    import asyncio
+
+    from vern_backend.app import agents as agents_api
+    from vern_backend.app.registry_service import registry
+
+    class _Req:
+        headers = {}
+
+        async def is_disconnected(self):
+            return False
+
+    monkeypatch.setattr(agents_api, "STREAM_POLL_S", 0.01)
+
+    async def read(n):
+        resp = await agents_api.agent_stream(_Req(), since=None)
+        assert resp.media_type == "text/event-stream"
+        chunks = []
+        async for chunk in resp.body_iterator:
+            chunks.append(chunk)
+            if len(chunks) == 1:
+                registry.heartbeat("stream_probe", "QA")
+            if len(chunks) == n:
+                break
+        await resp.body_iterator.aclose()
+        return chunks
+
+    snapshot, joined = asyncio.run(read(2))
+    assert snapshot.startswith("id: ") and "event: snapshot" in snapshot
+    assert "event: join" in joined and '"name": "stream_probe"' in joined
+    seq = int(joined.split("\n", 1)[0][len("id: "):])
+    assert seq == registry.current_seq
+    registry.delete("stream_probe")
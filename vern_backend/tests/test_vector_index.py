@@ -0,0 +1,128 @@
+import numpy as np
+
+from vern_backend.app.rag import RAGMemory
+from vern_backend.app.vector_index import HashingEmbedder, NumpyVectorIndex, get_embedder, top_k
+
+
+DOCS = {
+    "fruit": "Apples and pears are fruit that grow on trees",
+    "db": "SQLite stores the audit log in a single database file",
+    "llm": "Ollama serves local language models over HTTP",
+}
+
+
+def test_hashing_embedder_is_stable_and_normalized():
+    embed = HashingEmbedder(dim=64)
+    vectors = embed(["local language models", "local language models", ""])
+    assert vectors.shape == (3, 64) and vectors.dtype == np.float32
+    assert np.allclose(vectors[0], vectors[1]) and np.isclose(np.linalg.norm(vectors[0]), 1.0)
+    assert not vectors[2].any()
+    assert isinstance(get_embedder("hashing-128"), HashingEmbedder) and get_embedder("hashing-128").dim == 128
+
+
+def test_top_k_orders_best_first():
+    scores = np.array([0.1, 0.9, -1.0, 0.5], dtype=np.float32)
+    assert top_k(scores, 2).tolist() == [1, 3]
+    assert top_k(scores, 10).tolist() == [1, 3, 0, 2]
+
+
+def test_search_upsert_delete_and_memory_mapped_reload(tmp_path):
+    path = str(tmp_path / "index.vectors")
+    index = NumpyVectorIndex(path)
+    index.upsert([(doc_id, text, None) for doc_id, text in DOCS.items()])
+    assert index.search("which database file holds the audit log", 1)[0][0] == "db"
+    assert [doc_id for doc_id, _ in index.search("language models", 3)][0] == "llm"
+
+    index.delete(["llm"])
+    index.upsert([("db", "Pears and apples", None)])
+    assert {doc_id for doc_id, _ in index.search("apples", 5)} == {"fruit", "db"}
+    index.save()
+
+    reloaded = NumpyVectorIndex(path)
+    reloaded.load()
+    assert isinstance(reloaded.vectors, np.memmap) and reloaded.count() == 2
+    assert reloaded.search("apples pears", 2) == index.search("apples pears", 2)
+    # Freed rows are reused
+    reloaded.upsert([("new", "something else", None)])
+    assert len(reloaded.ids) == 3
+
+
+def test_search_spans_blocks(monkeypatch):
+    monkeypatch.setattr("vern_backend.app.vector_index.SEARCH_BLOCK_ROWS", 2)
+    index = NumpyVectorIndex(embedder=HashingEmbedder(dim=128))
+    index.upsert([(str(i), f"document number {i}", None) for i in range(7)])
+    index.upsert([("target", "the quick brown fox", None)])
+    hits = index.search("quick brown fox", 3)
+    assert hits[0][0] == "target" and len(hits) == 3
+    assert hits == sorted(hits, key=lambda h: -h[1])
+
+
+def test_rag_memory_semantic_fallback():
+    rag = RAGMemory()
+    rag.add_documents(list(DOCS.values()), [{"k": k} for k in DOCS])
+    results = rag.query("local models served over http", top_k=2)
+    assert results[0]["content"] == DOCS["llm"] and results[0]["metadata"] == {"k": "llm"}
+    assert results[0]["score"] > results[1]["score"]
+
+
+class ArrayEmbedder:
+    dim = 32
+    name = "array-32"
+
+    def __init__(self, corpus):
+        self.corpus = corpus
+
+    def __call__(self, texts):
+        return np.stack([self.corpus[int(t)] for t in texts])
+
+
+def _clustered(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((20, 32))
+    data = centers[rng.integers(0, 20, rows)] + 0.3 * rng.standard_normal((rows, 32))
+    return (data / np.linalg.norm(data, axis=1, keepdims=True)).astype(np.float32)
+
+
+def test_ivf_background_build_recall_and_fresh_rows(tmp_path):
+    corpus = _clustered(3000)
+    ann = {"type": "ivf", "nlist": 20, "nprobe": 4, "min_rows": 1000, "rebuild_fraction": 0.2,
+           "iterations": 10, "train_size": 0}
+    index = NumpyVectorIndex(str(tmp_path / "ivf.vectors"), embedder=ArrayEmbedder(corpus), ann=ann)
+    exact = NumpyVectorIndex(embedder=ArrayEmbedder(corpus))
+    docs = [(str(i), str(i), None) for i in range(2500)]
+    index.upsert(docs)
+    exact.upsert(docs)
+    index.wait_for_build(10)
+    assert index.ivf is not None and index.ivf.rows == 2500 and not index._fresh
+
+    recall = [len({d for d, _ in index.search(str(q), 10)} & {d for d, _ in exact.search(str(q), 10)}) / 10
+              for q in range(0, 2500, 50)]
+    assert np.mean(recall) >= 0.9
+
+    # Rows added after the build are scanned exactly until the next rebuild
+    index.upsert([("2600", "2600", None)])
+    assert index._fresh == {2500}
+    assert index.search("2600", 1)[0][0] == "2600"
+    index.delete(["2600"])
+    assert all(d != "2600" for d, _ in index.search("2600", 5))
+
+    index.save()
+    reloaded = NumpyVectorIndex(str(tmp_path / "ivf.vectors"), embedder=ArrayEmbedder(corpus), ann=ann)
+    reloaded.load()
+    assert reloaded.ivf.nlist == 20 and reloaded._fresh == {2500}
+    assert reloaded.search("7", 3) == index.search("7", 3)
+
+
+def test_ivf_rebuild_is_triggered_by_fresh_rows_without_blocking_search():
+    corpus = _clustered(3000, seed=1)
+    ann = {"type": "ivf", "nlist": 10, "nprobe": 2, "min_rows": 500, "rebuild_fraction": 0.2,
+           "iterations": 5, "train_size": 0}
+    index = NumpyVectorIndex(embedder=ArrayEmbedder(corpus), ann=ann)
+    index.upsert([(str(i), str(i), None) for i in range(1000)])
+    index.wait_for_build(10)
+    first = index.ivf
+    index.upsert([(str(i), str(i), None) for i in range(1000, 1300)])
+    # 300 fresh rows > 20% of 1000: a new IVF is built in the background
+    assert index.search("1200", 1)[0][0] == "1200"
+    index.wait_for_build(10)
+    assert index.ivf is not first and index.ivf.rows == 1300 and not index._fresh
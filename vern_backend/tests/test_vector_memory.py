@@ -0,0 +1,143 @@
+import json
+import os
+import sqlite3
+
+import pytest
+
+from vern_backend.app import vector_memory as vm
+from vern_backend.app.vector_memory import VectorMemory
+
+
+class FakeEmbeddings:
+    """
+    Stand-in for txtai Embeddings: records index operations and saves/loads its ids as JSON.
+    """
+    def __init__(self, config):
+        self.config = config
+        self.ids = {}
+        self.calls = []
+
+    def upsert(self, documents):
+        self.calls.append(("upsert", [d[0] for d in documents]))
+        for doc_id, text, _ in documents:
+            self.ids[doc_id] = text
+
+    def delete(self, ids):
+        self.calls.append(("delete", list(ids)))
+        for doc_id in ids:
+            self.ids.pop(doc_id, None)
+
+    def search(self, text, limit):
+        hits = [(doc_id, 1.0 if text in doc else 0.0) for doc_id, doc in self.ids.items()]
+        return sorted(hits, key=lambda h: -h[1])[:limit]
+
+    def save(self, path):
+        os.makedirs(path)
+        with open(os.path.join(path, "ids.json"), "w") as f:
+            json.dump(self.ids, f)
+
+    def load(self, path):
+        self.calls.append(("load", path))
+        with open(os.path.join(path, "ids.json")) as f:
+            self.ids = json.load(f)
+
+
+@pytest.fixture
+def fake_txtai(monkeypatch):
+    monkeypatch.setattr(vm, "TXT_AI_AVAILABLE", True)
+    monkeypatch.setattr(vm, "Embeddings", FakeEmbeddings)
+
+
+def test_stable_ids_upsert_delete_and_persistence(tmp_path):
+    db_path = str(tmp_path / "vector_memory.sqlite")
+    mem = VectorMemory(persistent=True, db_path=db_path)
+    first = mem.add_documents(["alpha", "beta"], [{"type": "a"}, {"type": "b"}])
+    second = mem.add_documents(["gamma"])
+    assert len(set(first + second)) == 3 and mem.count() == 3
+
+    mem.add_documents(["beta v2"], [{"type": "b2"}], ids=[first[1]])
+    assert mem.get_document(first[1]) == {"id": first[1], "content": "beta v2", "score": None, "metadata": {"type": "b2"}}
+    assert mem.delete_documents([first[0], "missing"]) == 1
+    mem.close()
+
+    reopened = VectorMemory(persistent=True, db_path=db_path)
+    assert reopened.count() == 2
+    assert [r["id"] for r in reopened.query("gamma", top_k=1)] == [second[0]]
+    with pytest.raises(ValueError):
+        reopened.add_documents(["x"], ids=["1", "2"])
+    with pytest.raises(ValueError):
+        reopened.add_documents(["x"], ["not a dict"])
+    assert reopened.count() == 2
+
+
+def test_legacy_integer_ids_are_migrated(tmp_path):
+    db_path = str(tmp_path / "vector_memory.sqlite")
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE documents (id INTEGER PRIMARY KEY, doc TEXT, meta TEXT)")
+    conn.execute("INSERT INTO documents (doc, meta) VALUES ('old doc', '{''type'': ''x''}')")
+    conn.commit()
+    conn.close()
+    mem = VectorMemory(persistent=True, db_path=db_path)
+    assert mem.get_document("1")["content"] == "old doc"
+    assert mem.add_documents(["new"], ids=["1"]) == ["1"] and mem.count() == 1
+
+
+def test_index_updates_are_incremental_and_journal_is_replayed(tmp_path, fake_txtai):
+    db_path = str(tmp_path / "vector_memory.sqlite")
+    mem = VectorMemory(persistent=True, db_path=db_path)
+    ids = mem.add_documents(["red apple", "green pear"])
+    mem.add_documents(["yellow banana"], ids=["banana"])
+    assert mem.embeddings.calls == [("upsert", ids), ("upsert", ["banana"])]
+    assert mem.save() and not mem.save()
+    assert os.path.isdir(str(tmp_path / "vector_memory.index"))
+
+    # Changes after the last save are journaled and replayed on top of the saved index
+    mem.delete_documents([ids[0]])
+    mem.add_documents(["blue berry"], ids=["berry"])
+    reopened = VectorMemory(persistent=True, db_path=db_path)
+    assert reopened.embeddings.calls[1:] == [("delete", [ids[0]]), ("upsert", ["berry"])]
+    assert [r["id"] for r in reopened.query("berry", top_k=1)] == ["berry"]
+    assert sorted(reopened.embeddings.ids) == sorted([ids[1], "banana", "berry"])
+
+
+def test_metadata_filters_use_indexed_columns(tmp_path):
+    from vern_backend.app.vector_memory import compile_filter
+
+    mem = VectorMemory(persistent=True, db_path=str(tmp_path / "vector_memory.sqlite"))
+    mem.add_documents(
+        ["alice likes green tea", "alice wrote a report on tea", "bob likes green tea", "bob note"],
+        [{"user_id": "alice", "type": "pref", "timestamp": 100},
+         {"user_id": "alice", "type": "doc", "timestamp": "1970-01-01T00:03:20+00:00", "tags": {"lang": "en"}},
+         {"user_id": "bob", "type": "pref", "timestamp": 300},
+         {"user_id": "bob", "type": "note"}],
+        ids=["a1", "a2", "b1", "b2"])
+
+    assert [r["id"] for r in mem.query("green tea", top_k=5, filters={"user_id": "alice"})] == ["a1", "a2"]
+    assert [r["id"] for r in mem.query("tea", filters={"type": {"$in": ["pref"]}, "timestamp": {"$gte": 200}})] == ["b1"]
+    assert [r["id"] for r in mem.query("tea", filters={"tags.lang": "en"})] == ["a2"]
+    assert {r["id"] for r in mem.query("tea", filters={"$or": [{"type": "note"}, {"user_id": "alice", "type": "doc"}]})} == {"a2", "b2"}
+    assert mem.query("tea", filters={"user_id": "carol"}) == []
+    # Hits are materialized in one lookup, in hit order, skipping ids that no longer exist
+    assert [r["id"] for r in mem._results([("b2", 0.9), ("gone", 0.8), ("a1", 0.7)])] == ["b2", "a1"]
+    mem.add_documents(["epoch tea"], [{"timestamp": 0}], ids=["e0"])
+    assert [r["id"] for r in mem.query("tea", filters={"timestamp": {"$lt": 100}})] == ["e0"]
+
+    # Per-user lookups go through the index, not a table scan
+    where, params = compile_filter({"user_id": "alice"})
+    plan = " ".join(str(row) for row in mem.conn.execute(f"EXPLAIN QUERY PLAN SELECT id FROM documents WHERE {where}", params))
+    assert "USING" in plan and "INDEX" in plan
+    for bad in ({"user_id": {"$regex": "a"}}, {"bad field": 1}, {"timestamp": {"$gt": "yesterday"}}, ["user_id"]):
+        with pytest.raises(ValueError):
+            compile_filter(bad)
+
+
+def test_legacy_metadata_is_converted_to_json(tmp_path):
+    db_path = str(tmp_path / "vector_memory.sqlite")
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE documents (id INTEGER PRIMARY KEY, doc TEXT, meta TEXT)")
+    conn.execute("INSERT INTO documents (doc, meta) VALUES ('old doc', ?)", (str({"type": "x", "user_id": "u"}),))
+    conn.commit()
+    conn.close()
+    mem = VectorMemory(persistent=True, db_path=db_path)
+    assert mem.get_document("1")["metadata"] == {"type": "x", "user_id": "u"}
+    assert [r["id"] for r in mem.query("old", filters={"user_id": "u", "type": "x"})] == ["1"]